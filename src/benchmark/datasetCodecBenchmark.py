@@ -0,0 +1,127 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : datasetCodecBenchmark.py
+# Description du fichier : banc d'essai du jeu de données parquet partitionné par rame et par date. Compare, pour chaque
+#   codec de compression, la taille sur disque, le temps d'écriture et le débit de lecture (complète et filtrée sur
+#   une rame et une date) sur une flotte synthétique de dossiers parquet
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Librairies de projet
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SRC_DIR)
+from parquet_processing.preprocessing.ParquetDataset import ParquetDataset   # NOQA
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Colonnes requises (copie de Constants.PARQUET_KEPT_COL, pour ne pas dépendre de la configuration PostgreSQL)
+KEPT_COL = ['time', 'x__IMISSIONTRAINNUMBER'] + [
+    "WC_" + car + "_LCST_" + signal
+    for signal in ["IWCWORKTIMEINCOMSERVICE", "IWSUTANKLEVEL", "IFWTANKCONTENT", "IWWTANKCONTENT", "IWATERTAPCNT",
+                   "FFWTEMPTY", "IFLUSHCYCCNT"]
+    for car in ["CAR01", "CAR03", "CAR05", "CAR07"]]
+
+
+def build_fleet(root, nb_trains, nb_days, nb_folders_per_day, nb_rows):
+    """
+    Génère une flotte synthétique de dossiers parquet "Source". Les signaux imitent les relevés réels : niveaux de
+    réservoirs variant lentement, compteurs croissants et numéro de mission constant par marche.
+
+    :param root: dossier "Source" de la flotte
+    :param nb_trains: nombre de rames
+    :param nb_days: nombre de jours par rame
+    :param nb_folders_per_day: nombre de dossiers (marches de 30 minutes) par jour
+    :param nb_rows: nombre de lignes par fichier (1 Hz)
+    :return: list: noms des dossiers générés
+    """
+
+    rng = np.random.default_rng(0)
+    folders = []
+
+    for train in range(nb_trains):
+        for day in range(nb_days):
+            date = pd.Timestamp("2022-11-07") + pd.Timedelta(days=day)
+            for split in range(nb_folders_per_day):
+                start = date + pd.Timedelta(hours=6, seconds=split * nb_rows)
+                columns = {"time": pd.date_range(start, periods=nb_rows, freq="s"),
+                           "x__IMISSIONTRAINNUMBER": np.repeat(
+                               rng.choice([0, 3836323538382020, 3836323538382021], 4),
+                               -(-nb_rows // 4))[:nb_rows].astype(np.int64)}
+                for column in KEPT_COL[2:]:
+                    if "LEVEL" in column or "CONTENT" in column:
+                        columns[column] = np.clip(np.cumsum(rng.integers(-1, 2, nb_rows)) + 50, 0, 100) \
+                            .astype(np.float64)
+                    else:
+                        columns[column] = np.cumsum(rng.random(nb_rows) < 0.01).astype(np.float64)
+
+                folder = "z55005%02d_%s_%s_%s" % (train, start.strftime("%Y%m%d"), start.strftime("%H%M%S"), split)
+                os.makedirs(os.path.join(root, folder))
+                pq.write_table(pa.table(columns), os.path.join(root, folder, "TT_IP.parquet"))
+                folders.append(folder)
+
+    return folders
+
+
+def get_size(path):
+    """Renvoie la taille totale des fichiers d'un dossier, en octets"""
+    return sum(os.path.getsize(os.path.join(folder, file_name))
+               for folder, _, file_names in os.walk(path) for file_name in file_names)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai des codecs du jeu de données parquet partitionné")
+    parser.add_argument("--trains", type=int, default=4, help="nombre de rames de la flotte synthétique")
+    parser.add_argument("--days", type=int, default=5, help="nombre de jours par rame")
+    parser.add_argument("--folders-per-day", type=int, default=8, help="nombre de dossiers par jour")
+    parser.add_argument("--rows", type=int, default=1800, help="nombre de lignes par fichier TT_IP.parquet")
+    parser.add_argument("--row-group-size", type=int, default=65536, help="nombre de lignes par groupe de lignes")
+    parser.add_argument("--repeat", type=int, default=3, help="nombre de répétitions des mesures de lecture")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as benchmark_root:
+        source_path = os.path.join(benchmark_root, "Source")
+        folder_list = build_fleet(source_path, args.trains, args.days, args.folders_per_day, args.rows)
+        source_size = get_size(source_path)
+
+        print("Synthetic fleet: %s folders, %s rows, %.1f MB of source TT_IP.parquet" %
+              (len(folder_list), len(folder_list) * args.rows, source_size / 2 ** 20))
+        print("%-8s %10s %10s %14s %14s %14s" % ("codec", "size (MB)", "write (s)", "full read (s)",
+                                                 "rows/s", "1 rame/1 day"))
+
+        for compression in ParquetDataset.COMPRESSIONS:
+            dataset_path = os.path.join(benchmark_root, "Dataset_" + compression)
+
+            start_time = time.perf_counter()
+            ParquetDataset.write(source_path, folder_list, dataset_path, KEPT_COL, compression, args.row_group_size)
+            write_time = time.perf_counter() - start_time
+
+            # Lecture complète
+            full_read_times = []
+            for _ in range(args.repeat):
+                start_time = time.perf_counter()
+                nb_rows = ParquetDataset.read(dataset_path).num_rows
+                full_read_times.append(time.perf_counter() - start_time)
+
+            # Lecture filtrée sur une rame et une date : seules les partitions concernées sont ouvertes
+            pruned_read_times = []
+            for _ in range(args.repeat):
+                start_time = time.perf_counter()
+                ParquetDataset.read(dataset_path, rames=["z5500500"], start_date="2022-11-07", end_date="2022-11-07")
+                pruned_read_times.append(time.perf_counter() - start_time)
+
+            full_read_time = min(full_read_times)
+            print("%-8s %10.2f %10.3f %14.3f %14.0f %12.1f ms" %
+                  (compression, get_size(dataset_path) / 2 ** 20, write_time, full_read_time,
+                   nb_rows / full_read_time, min(pruned_read_times) * 1000))
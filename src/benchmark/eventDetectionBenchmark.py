@@ -0,0 +1,185 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : eventDetectionBenchmark.py
+# Description du fichier : banc d'essai et vérification de la détection vectorisée des événements des réservoirs
+#   (EventDetection). Vérifie que les indicateurs sont identiques, bit à bit, à ceux des boucles historiques de
+#   WaterConsumptionAnalysis, puis compare les temps de calcul
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Librairies de projet
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SRC_DIR)
+from parquet_processing.processing.eventDetection import EventDetection   # NOQA
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+"""BOUCLES HISTORIQUES (référence)"""
+
+
+def legacy_remplissage_WSU(x):
+    """Boucle historique de WaterConsumptionAnalysis.is_remplissage_WSU, pour une voiture"""
+    flags = np.zeros(len(x), dtype=np.int64)
+    remplissage_en_cours = 0
+    for t in range(0, len(x)-1):
+        if (x[t] < x[t+1]) and (remplissage_en_cours == 0) and (x[t] <= 25):
+            flags[t] += 1
+            remplissage_en_cours = 1
+        if (x[t] >= x[t+1]):
+            remplissage_en_cours = 0
+    return flags
+
+
+def legacy_vidange_WSU(x):
+    """Boucle historique de WaterConsumptionAnalysis.is_vidange_WSU, pour une voiture"""
+    flags = np.zeros(len(x), dtype=np.int64)
+    vid_en_cours = 0
+    for t in range(0, len(x)-1):
+        if (x[t] >= 95) and (vid_en_cours == 0):
+            flags[t] += 1
+            vid_en_cours = 1
+        if (x[t] < 95):
+            vid_en_cours = 0
+    return flags
+
+
+def legacy_vidange_WWT(x):
+    """Boucle historique de WaterConsumptionAnalysis.is_vidange_WWT, pour une voiture"""
+    flags = np.zeros(len(x), dtype=np.int64)
+    vidange_en_cours = 0
+    for t in range(0, len(x)-1):
+        if (x[t] > x[t+1]) and (vidange_en_cours == 0) and (x[t+1] <= 5):
+            flags[t] = 1
+            vidange_en_cours = 1
+        if (x[t] <= x[t+1]):
+            vidange_en_cours = 0
+    return flags
+
+
+def legacy_remplissage_FWT(x):
+    """Boucle historique de WaterConsumptionAnalysis.is_remplissage_FWT, pour une voiture"""
+    flags = np.zeros(len(x), dtype=np.int64)
+    rempli_en_cours = 0
+    for t in range(0, len(x)-1):
+        if (x[t] < x[t+1]) and (rempli_en_cours == 0) and (x[t+1] == 5):
+            flags[t] = 1
+            rempli_en_cours = 1
+        if (x[t] >= x[t+1]):
+            rempli_en_cours = 0
+    return flags
+
+
+def legacy_dataframe_loop(df, column):
+    """Boucle historique sur DataFrame (indexation df[col][t] et écritures df.loc), pour la mesure du temps"""
+    df['flags'] = 0
+    remplissage_en_cours = 0
+    for t in range(0, len(df)-1):
+        if (df[column][t] < df[column][t+1]) and (remplissage_en_cours == 0) and (df[column][t] <= 25):
+            df.loc[t, 'flags'] += 1
+            remplissage_en_cours = 1
+        if (df[column][t] >= df[column][t+1]):
+            remplissage_en_cours = 0
+    return df['flags'].to_numpy()
+
+
+"""INDICATEURS VECTORISÉS (tels qu'appelés par WaterConsumptionAnalysis)"""
+
+INDICATORS = {
+    "remplissage_WSU": (legacy_remplissage_WSU,
+                        lambda x: EventDetection.hysteresis(x, 25, "<=", direction="rising", threshold_on="current",
+                                                            rearm="direction")),
+    "vidange_WSU": (legacy_vidange_WSU,
+                    lambda x: EventDetection.hysteresis(x, 95, ">=", direction=None, threshold_on="current",
+                                                        rearm="threshold")),
+    "vidange_WWT": (legacy_vidange_WWT,
+                    lambda x: EventDetection.hysteresis(x, 5, "<=", direction="falling", threshold_on="next",
+                                                        rearm="direction")),
+    "remplissage_FWT": (legacy_remplissage_FWT,
+                        lambda x: EventDetection.hysteresis(x, 5, "==", direction="rising", threshold_on="next",
+                                                            rearm="direction")),
+}
+
+
+def generate_levels(rng, nb_rows, with_nan=False):
+    """
+    Génère une série de niveaux de réservoir (0 à 100 %) : paliers, montées, descentes et valeurs aux seuils
+    (5, 25, 95), éventuellement avec des valeurs manquantes.
+    """
+
+    steps = rng.choice([-5, -1, 0, 0, 0, 1, 5], nb_rows)
+    levels = np.clip(np.cumsum(steps) + rng.integers(0, 100), 0, 100).astype(np.float64)
+    # Valeurs imposées aux seuils et sauts de niveau
+    levels[rng.random(nb_rows) < 0.02] = rng.choice([0, 5, 25, 95, 100], 1)[0]
+    if with_nan:
+        levels[rng.random(nb_rows) < 0.01] = np.nan
+    return levels
+
+
+def check_identical(nb_series, nb_rows, seed):
+    """Vérifie l'égalité bit à bit des indicateurs vectorisés et des boucles historiques"""
+    rng = np.random.default_rng(seed)
+    for serie in range(nb_series):
+        levels = generate_levels(rng, int(rng.integers(0, nb_rows)), with_nan=serie % 4 == 0)
+        for name, (legacy, vectorized) in INDICATORS.items():
+            expected = legacy(levels)
+            result = vectorized(levels)
+            assert result.dtype == expected.dtype, name
+            assert np.array_equal(result, expected), "%s differs on serie %s" % (name, serie)
+
+        # Tableau 2-D (pas de temps x voiture) : chaque colonne est identique à la série 1-D correspondante
+        cars = np.stack([levels] + [generate_levels(rng, len(levels), with_nan=serie % 4 == 0) for _ in range(3)],
+                        axis=1)
+        for name, (legacy, vectorized) in INDICATORS.items():
+            result = vectorized(cars)
+            for car in range(cars.shape[1]):
+                assert np.array_equal(result[:, car], legacy(cars[:, car])), \
+                    "%s differs on car %s of serie %s" % (name, car, serie)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai de la détection vectorisée des événements")
+    parser.add_argument("--rows", type=int, default=200000, help="nombre de lignes (1 Hz) de la série mesurée")
+    parser.add_argument("--check-series", type=int, default=400, help="nombre de séries aléatoires vérifiées")
+    parser.add_argument("--seed", type=int, default=0, help="graine du générateur aléatoire")
+    args = parser.parse_args()
+
+    # 1- égalité bit à bit sur des séries aléatoires de longueurs variées (y compris vides et à une ligne)
+    check_identical(args.check_series, 3000, args.seed)
+    print("Identical flags on %s random series (1-D and time x car) for %s indicators" %
+          (args.check_series, len(INDICATORS)))
+
+    # 2- temps de calcul
+    levels = generate_levels(np.random.default_rng(args.seed), args.rows)
+    print("Series of %s rows:" % args.rows)
+    for name, (legacy, vectorized) in INDICATORS.items():
+        start_time = time.perf_counter()
+        expected = legacy(levels)
+        legacy_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        result = vectorized(levels)
+        vectorized_time = time.perf_counter() - start_time
+
+        assert np.array_equal(result, expected)
+        print("  %-16s loop on numpy: %8.3f s   vectorized: %8.4f s   (x%.0f)" %
+              (name, legacy_time, vectorized_time, legacy_time / vectorized_time))
+
+    # Boucle historique sur DataFrame, sur un extrait de la série (indexation pandas élément par élément)
+    nb_rows_dataframe = min(args.rows, 20000)
+    df = pd.DataFrame({"level": levels[:nb_rows_dataframe]})
+    start_time = time.perf_counter()
+    expected = legacy_dataframe_loop(df, "level")
+    dataframe_time = time.perf_counter() - start_time
+    assert np.array_equal(INDICATORS["remplissage_WSU"][1](levels[:nb_rows_dataframe]), expected)
+    print("  DataFrame loop (remplissage_WSU, %s rows): %.3f s, i.e. %.1f s per 1M rows" %
+          (nb_rows_dataframe, dataframe_time, dataframe_time * 1e6 / nb_rows_dataframe))
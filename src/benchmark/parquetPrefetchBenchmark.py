@@ -0,0 +1,103 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : parquetPrefetchBenchmark.py
+# Description du fichier : banc d'essai de la lecture anticipée des fichiers parquet (ParquetPrefetch). Lit et lisse
+#   une suite de fichiers TT_IP.parquet synthétiques, sans puis avec lecture anticipée, et compare les temps totaux
+#   et le recouvrement obtenu entre lectures et calculs
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Librairies de projet
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SRC_DIR)
+from parquet_processing.processing.parquetPrefetch import ParquetPrefetch   # NOQA
+from parquet_processing.processing.rollingMedian import RollingMedian   # NOQA
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Signaux lissés d'une rame (copie de Constants.PARQUET_KEPT_COL[6:], pour ne pas dépendre de la configuration
+# PostgreSQL)
+SIGNALS = ["WC_%s_LCST_%s" % (car, signal)
+           for signal in ["IWSUTANKLEVEL", "IFWTANKCONTENT", "IWWTANKCONTENT", "IWATERTAPCNT", "FFWTEMPTY",
+                          "IFLUSHCYCCNT"]
+           for car in ["CAR01", "CAR03", "CAR05", "CAR07"]]
+
+
+def build_files(root, nb_files, nb_rows):
+    """
+    Génère nb_files fichiers TT_IP.parquet synthétiques de nb_rows lignes (niveaux et compteurs des voitures).
+
+    :param root: dossier des fichiers
+    :param nb_files: nombre de fichiers
+    :param nb_rows: nombre de lignes par fichier (1 Hz)
+    :return: list: chemins d'accès des fichiers, dans l'ordre chronologique
+    """
+
+    rng = np.random.default_rng(0)
+    file_paths = []
+    for number in range(nb_files):
+        columns = {"time": pd.date_range(pd.Timestamp("2022-11-07") + pd.Timedelta(seconds=number * nb_rows),
+                                         periods=nb_rows, freq="s")}
+        for signal in SIGNALS:
+            columns[signal] = np.clip(np.cumsum(rng.integers(-3, 4, nb_rows)) + 50, 0, 100).astype(np.float64)
+        file_path = os.path.join(root, "%04d_TT_IP.parquet" % number)
+        pq.write_table(pa.table(columns), file_path, compression="snappy")
+        file_paths.append(file_path)
+
+    return file_paths
+
+
+def read_file(file_path):
+    """Lecture et décodage d'un fichier (travail effectué d'avance par la lecture anticipée)"""
+    return pq.read_table(file_path, columns=SIGNALS).to_pandas()
+
+
+def run(file_paths, depth, workers, window):
+    """
+    Lit et lisse tous les fichiers avec la lecture anticipée de profondeur donnée.
+
+    :return: tuple: durée totale (en secondes), somme de contrôle des médianes et lecture anticipée (statistiques)
+    """
+
+    prefetch = ParquetPrefetch(depth, workers)
+    checksum = 0.0
+    start_time = time.perf_counter()
+    for df in prefetch.map(read_file, file_paths):
+        checksum += np.nansum(RollingMedian.median(df.to_numpy(), window))
+
+    return time.perf_counter() - start_time, checksum, prefetch
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai de la lecture anticipée des fichiers parquet")
+    parser.add_argument("--files", type=int, default=24, help="nombre de fichiers")
+    parser.add_argument("--rows", type=int, default=200000, help="nombre de lignes par fichier (1 Hz)")
+    parser.add_argument("--depth", type=int, default=2, help="nombre de fichiers lus d'avance")
+    parser.add_argument("--workers", type=int, default=2, help="nombre de threads de lecture")
+    parser.add_argument("--window", type=int, default=15, help="taille de la fenêtre de la médiane roulante")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        file_paths = build_files(root, args.files, args.rows)
+        print("%s files of %s rows x %s signals" % (args.files, args.rows, len(SIGNALS)))
+
+        serial_time, serial_checksum, serial_prefetch = run(file_paths, 0, 1, args.window)
+        prefetch_time, prefetch_checksum, prefetch = run(file_paths, args.depth, args.workers, args.window)
+
+    assert serial_checksum == prefetch_checksum
+    print("  without prefetch:  %8.2f s   (read %.2f s, all waited)" % (serial_time, serial_prefetch.load_time))
+    print("  prefetch depth %s:  %8.2f s   (read %.2f s, waited %.2f s, overlap %.0f %%)   (x%.2f)" %
+          (args.depth, prefetch_time, prefetch.load_time, prefetch.wait_time, 100 * prefetch.get_overlap(),
+           serial_time / prefetch_time))
@@ -0,0 +1,95 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : rollingMedianBenchmark.py
+# Description du fichier : banc d'essai de la médiane roulante de lissage des signaux (RollingMedian) sur un mois de
+#   données d'une rame (1 ligne par seconde, 24 signaux). Vérifie l'égalité avec DataFrame.rolling().median() de
+#   pandas, puis compare les temps de calcul
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Librairies de projet
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SRC_DIR)
+from parquet_processing.processing.rollingMedian import RollingMedian   # NOQA
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Signaux lissés d'une rame (copie de Constants.PARQUET_KEPT_COL[6:], pour ne pas dépendre de la configuration
+# PostgreSQL)
+SIGNALS = ["WC_%s_LCST_%s" % (car, signal)
+           for signal in ["IWSUTANKLEVEL", "IFWTANKCONTENT", "IWWTANKCONTENT", "IWATERTAPCNT", "FFWTEMPTY",
+                          "IFLUSHCYCCNT"]
+           for car in ["CAR01", "CAR03", "CAR05", "CAR07"]]
+
+
+def generate_signals(rng, nb_rows, nan_ratio):
+    """
+    Génère les signaux d'une rame : niveaux de réservoirs (marche aléatoire entre 0 et 100 %), indicateurs (0 ou 1)
+    et compteurs croissants, avec une proportion nan_ratio de valeurs manquantes.
+    """
+
+    values = np.empty((nb_rows, len(SIGNALS)))
+    for column, signal in enumerate(SIGNALS):
+        if "LEVEL" in signal or "CONTENT" in signal:
+            values[:, column] = np.clip(np.cumsum(rng.integers(-3, 4, nb_rows)) + 50, 0, 100)
+        elif "EMPTY" in signal:
+            values[:, column] = rng.random(nb_rows) < 0.1
+        else:
+            values[:, column] = np.cumsum(rng.integers(0, 2, nb_rows))
+    values[rng.random(values.shape) < nan_ratio] = np.nan
+
+    return values
+
+
+def check_identical(nb_series, nb_rows, seed):
+    """Vérifie l'égalité avec pandas sur des tableaux aléatoires, pour des fenêtres paires, impaires et grandes"""
+    rng = np.random.default_rng(seed)
+    for serie in range(nb_series):
+        window = int(rng.choice([1, 2, 3, 15, 16, 48, 49, 60]))
+        values = generate_signals(rng, int(rng.integers(0, nb_rows)), nan_ratio=0.002 * (serie % 2))
+        expected = pd.DataFrame(values).rolling(window).median().to_numpy()
+        result = RollingMedian.median(values, window)
+        assert np.allclose(result, expected, rtol=0, atol=1e-9, equal_nan=True), \
+            "window %s differs on serie %s" % (window, serie)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai de la médiane roulante de lissage des signaux")
+    parser.add_argument("--days", type=float, default=30, help="nombre de jours de données (1 ligne par seconde)")
+    parser.add_argument("--window", type=int, default=15, help="taille de la fenêtre (en nombre de lignes)")
+    parser.add_argument("--nan-ratio", type=float, default=0.0001, help="proportion de valeurs manquantes")
+    parser.add_argument("--check-series", type=int, default=100, help="nombre de tableaux aléatoires vérifiés")
+    parser.add_argument("--seed", type=int, default=0, help="graine du générateur aléatoire")
+    args = parser.parse_args()
+
+    # 1- égalité avec pandas sur des tableaux aléatoires de longueurs variées (y compris vides)
+    check_identical(args.check_series, 5000, args.seed)
+    print("Identical rolling medians on %s random arrays" % args.check_series)
+
+    # 2- temps de calcul sur un mois de données d'une rame
+    nb_rows = int(args.days * 86400)
+    values = generate_signals(np.random.default_rng(args.seed), nb_rows, args.nan_ratio)
+    df = pd.DataFrame(values, columns=SIGNALS)
+    print("%s days of one rame: %s rows x %s signals, window of %s rows" %
+          (args.days, nb_rows, len(SIGNALS), args.window))
+
+    start_time = time.perf_counter()
+    expected = df.rolling(args.window).median().to_numpy()
+    pandas_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    result = RollingMedian.median(values, args.window)
+    engine_time = time.perf_counter() - start_time
+
+    assert np.allclose(result, expected, rtol=0, atol=1e-9, equal_nan=True)
+    print("  pandas rolling().median(): %8.2f s" % pandas_time)
+    print("  RollingMedian.median():    %8.2f s   (x%.1f)" % (engine_time, pandas_time / engine_time))
@@ -0,0 +1,108 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : schemaCheckBenchmark.py
+# Description du fichier : banc d'essai de la vérification des colonnes des fichiers TT_IP.parquet. Compare la lecture
+#   complète du fichier (pd.read_parquet) à la lecture du seul pied de page (ParquetInspection) sur une flotte
+#   synthétique de dossiers parquet
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Librairies de projet
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SRC_DIR)
+from parquet_processing.preprocessing.ParquetInspection import ParquetInspection   # NOQA
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Colonnes requises (copie de Constants.PARQUET_KEPT_COL, pour ne pas dépendre de la configuration PostgreSQL)
+KEPT_COL = ['time', 'x__IMISSIONTRAINNUMBER'] + [
+    "WC_" + car + "_LCST_" + signal
+    for signal in ["IWCWORKTIMEINCOMSERVICE", "IWSUTANKLEVEL", "IFWTANKCONTENT", "IWWTANKCONTENT", "IWATERTAPCNT",
+                   "FFWTEMPTY", "IFLUSHCYCCNT"]
+    for car in ["CAR01", "CAR03", "CAR05", "CAR07"]]
+
+
+def build_fleet(root, nb_folders, nb_rows, nb_extra_columns):
+    """
+    Génère une flotte synthétique de dossiers parquet "Source" contenant chacun un fichier TT_IP.parquet.
+
+    :param root: dossier racine de la flotte
+    :param nb_folders: nombre de dossiers à générer
+    :param nb_rows: nombre de lignes par fichier (1 Hz)
+    :param nb_extra_columns: nombre de signaux non utilisés par l'étude ajoutés à chaque fichier
+    :return: list: chemins d'accès des fichiers TT_IP.parquet générés
+    """
+
+    rng = np.random.default_rng(0)
+    tt_file_paths = []
+
+    for folder_index in range(nb_folders):
+        columns = {"time": pd.date_range("2022-11-07", periods=nb_rows, freq="s"),
+                   "x__IMISSIONTRAINNUMBER": np.full(nb_rows, 3836323538382020, dtype=np.int64)}
+        for column in KEPT_COL[2:]:
+            columns[column] = rng.integers(0, 100, nb_rows).astype(np.float64)
+        for extra_column in range(nb_extra_columns):
+            columns["SIGNAL_%04d" % extra_column] = rng.random(nb_rows)
+
+        folder_path = os.path.join(root, "z5500503_20221107_%06d_0" % folder_index)
+        os.makedirs(folder_path)
+        tt_file_path = os.path.join(folder_path, "TT_IP.parquet")
+        pq.write_table(pa.table(columns), tt_file_path)
+        tt_file_paths.append(tt_file_path)
+
+    return tt_file_paths
+
+
+def check_full_read(tt_file_path):
+    """Vérification historique : décodage complet du fichier puis contrôle des colonnes"""
+    tt_frame = pd.read_parquet(tt_file_path, engine="auto")
+    return all(column in tt_frame.columns for column in KEPT_COL)
+
+
+def check_footer(tt_file_path):
+    """Vérification par le pied de page seulement"""
+    metadata = ParquetInspection.read_footer(tt_file_path)
+    return metadata is not None and not ParquetInspection.get_missing_columns(metadata, KEPT_COL)
+
+
+def time_per_folder(check, tt_file_paths):
+    """Renvoie le temps moyen de vérification par dossier en millisecondes"""
+    start_time = time.perf_counter()
+    for tt_file_path in tt_file_paths:
+        assert check(tt_file_path)
+    return (time.perf_counter() - start_time) * 1000 / len(tt_file_paths)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Banc d'essai de la vérification des colonnes TT_IP.parquet")
+    parser.add_argument("--folders", type=int, default=200, help="nombre de dossiers de la flotte synthétique")
+    parser.add_argument("--rows", type=int, default=1800, help="nombre de lignes par fichier TT_IP.parquet")
+    parser.add_argument("--extra-columns", type=int, default=300, help="nombre de signaux non utilisés par fichier")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as fleet_root:
+        files = build_fleet(fleet_root, args.folders, args.rows, args.extra_columns)
+
+        file_size = np.mean([os.path.getsize(tt_file_path) for tt_file_path in files])
+        footer_size = np.mean([pq.read_metadata(tt_file_path).serialized_size for tt_file_path in files])
+
+        full_read_ms = time_per_folder(check_full_read, files)
+        footer_ms = time_per_folder(check_footer, files)
+
+        print("Synthetic fleet: %s folders, %s rows x %s columns per TT_IP.parquet" %
+              (args.folders, args.rows, len(KEPT_COL) + args.extra_columns))
+        print("Mean file size: %.1f kB, mean footer size: %.1f kB" % (file_size / 1024, footer_size / 1024))
+        print("Full read check:   %8.3f ms / folder" % full_read_ms)
+        print("Footer-only check: %8.3f ms / folder (x%.1f)" % (footer_ms, full_read_ms / footer_ms))
@@ -108,131 +108,9 @@ class Constants:
             ("rempl_WWT_rame", "FLOAT"))
     
 
-    RAMES_PG_TABLE = (
-            ("index", "BIGINT"),
-            ("x_time", "timestamp"),
-            ("x__IMISSIONTRAINNUMBER", "BIGINT"),
-            ("WC_CAR01_LCST_IWCWORKTIMEINCOMSERVICE", "FLOAT"),
-            ("WC_CAR03_LCST_IWCWORKTIMEINCOMSERVICE", "FLOAT"),
-            ("WC_CAR05_LCST_IWCWORKTIMEINCOMSERVICE", "FLOAT"),
-            ("WC_CAR07_LCST_IWCWORKTIMEINCOMSERVICE", "FLOAT"),
-            ("WC_CAR01_LCST_IWSUTANKLEVEL", "FLOAT"),
-            ("WC_CAR03_LCST_IWSUTANKLEVEL", "FLOAT"),
-            ("WC_CAR05_LCST_IWSUTANKLEVEL", "FLOAT"),
-            ("WC_CAR07_LCST_IWSUTANKLEVEL", "FLOAT"),
-            ("WC_CAR01_LCST_IFWTANKCONTENT", "FLOAT"),
-            ("WC_CAR03_LCST_IFWTANKCONTENT", "FLOAT"),
-            ("WC_CAR05_LCST_IFWTANKCONTENT", "FLOAT"),
-            ("WC_CAR07_LCST_IFWTANKCONTENT", "FLOAT"),
-            ("WC_CAR01_LCST_IWWTANKCONTENT", "FLOAT"),
-            ("WC_CAR03_LCST_IWWTANKCONTENT", "FLOAT"),
-            ("WC_CAR05_LCST_IWWTANKCONTENT", "FLOAT"),
-            ("WC_CAR07_LCST_IWWTANKCONTENT", "FLOAT"),
-            ("WC_CAR01_LCST_IWATERTAPCNT", "FLOAT"),
-            ("WC_CAR03_LCST_IWATERTAPCNT", "FLOAT"),
-            ("WC_CAR05_LCST_IWATERTAPCNT", "FLOAT"),
-            ("WC_CAR07_LCST_IWATERTAPCNT", "FLOAT"),
-            ("WC_CAR01_LCST_FFWTEMPTY", "FLOAT"),
-            ("WC_CAR03_LCST_FFWTEMPTY", "FLOAT"),
-            ("WC_CAR05_LCST_FFWTEMPTY", "FLOAT"),
-            ("WC_CAR07_LCST_FFWTEMPTY", "FLOAT"),
-            ("WC_CAR01_LCST_IFLUSHCYCCNT", "FLOAT"),
-            ("WC_CAR03_LCST_IFLUSHCYCCNT", "FLOAT"),
-            ("WC_CAR05_LCST_IFLUSHCYCCNT", "FLOAT"),
-            ("WC_CAR07_LCST_IFLUSHCYCCNT", "FLOAT"),
-            ("nombre_mission", "BIGINT"),
-            ("cpt_mission", "BIGINT"),
-            ("WC_CAR01_LCST_remplissage_WSU", "BIGINT"),
-            ("WC_CAR03_LCST_remplissage_WSU", "BIGINT"),
-            ("WC_CAR05_LCST_remplissage_WSU", "BIGINT"),
-            ("WC_CAR07_LCST_remplissage_WSU", "BIGINT"),
-            ("WC_CAR01_LCST_vidange_WSU", "BIGINT"),
-            ("WC_CAR03_LCST_vidange_WSU", "BIGINT"),
-            ("WC_CAR05_LCST_vidange_WSU", "BIGINT"),
-            ("WC_CAR07_LCST_vidange_WSU", "BIGINT"),
-            ("WC_CAR01_LCST_consommation_FWT", "FLOAT"),
-            ("WC_CAR03_LCST_consommation_FWT", "FLOAT"),
-            ("WC_CAR05_LCST_consommation_FWT", "FLOAT"),
-            ("WC_CAR07_LCST_consommation_FWT", "FLOAT"),
-            ("WC_CAR01_LCST_remplissage_WWT", "FLOAT"),
-            ("WC_CAR03_LCST_remplissage_WWT", "FLOAT"),
-            ("WC_CAR05_LCST_remplissage_WWT", "FLOAT"),
-            ("WC_CAR07_LCST_remplissage_WWT", "FLOAT"),
-            ("WC_CAR01_LCST_vidange_WWT", "BIGINT"),
-            ("WC_CAR03_LCST_vidange_WWT", "BIGINT"),
-            ("WC_CAR05_LCST_vidange_WWT", "BIGINT"),
-            ("WC_CAR07_LCST_vidange_WWT", "BIGINT"),
-            ("WC_CAR01_LCST_remplissage_FWT", "BIGINT"),
-            ("WC_CAR03_LCST_remplissage_FWT", "BIGINT"),
-            ("WC_CAR05_LCST_remplissage_FWT", "BIGINT"),
-            ("WC_CAR07_LCST_remplissage_FWT", "BIGINT"),
-            ("jour", "text"),
-            ("rame", "text"),
-            ("conso_FWT_rame", "FLOAT"),
-            ("rempl_WWT_rame", "FLOAT"))
-    
-    MISSIONS_PG_TABLE = (
-            ("index", "BIGINT"),
-            ("x_time", "TIMESTAMP"),
-            ("x__IMISSIONTRAINNUMBER", "BIGINT"),
-            ("WC_CAR01_LCST_IWCWORKTIMEINCOMSERVICE", "FLOAT"),
-            ("WC_CAR03_LCST_IWCWORKTIMEINCOMSERVICE", "FLOAT"),
-            ("WC_CAR05_LCST_IWCWORKTIMEINCOMSERVICE", "FLOAT"),
-            ("WC_CAR07_LCST_IWCWORKTIMEINCOMSERVICE", "FLOAT"),
-            ("WC_CAR01_LCST_IWSUTANKLEVEL", "FLOAT"),
-            ("WC_CAR03_LCST_IWSUTANKLEVEL", "FLOAT"),
-            ("WC_CAR05_LCST_IWSUTANKLEVEL", "FLOAT"),
-            ("WC_CAR07_LCST_IWSUTANKLEVEL", "FLOAT"),
-            ("WC_CAR01_LCST_IFWTANKCONTENT", "FLOAT"),
-            ("WC_CAR03_LCST_IFWTANKCONTENT", "FLOAT"),
-            ("WC_CAR05_LCST_IFWTANKCONTENT", "FLOAT"),
-            ("WC_CAR07_LCST_IFWTANKCONTENT", "FLOAT"),
-            ("WC_CAR01_LCST_IWWTANKCONTENT", "FLOAT"),
-            ("WC_CAR03_LCST_IWWTANKCONTENT", "FLOAT"),
-            ("WC_CAR05_LCST_IWWTANKCONTENT", "FLOAT"),
-            ("WC_CAR07_LCST_IWWTANKCONTENT", "FLOAT"),
-            ("WC_CAR01_LCST_IWATERTAPCNT", "FLOAT"),
-            ("WC_CAR03_LCST_IWATERTAPCNT", "FLOAT"),
-            ("WC_CAR05_LCST_IWATERTAPCNT", "FLOAT"),
-            ("WC_CAR07_LCST_IWATERTAPCNT", "FLOAT"),
-            ("WC_CAR01_LCST_FFWTEMPTY", "FLOAT"),
-            ("WC_CAR03_LCST_FFWTEMPTY", "FLOAT"),
-            ("WC_CAR05_LCST_FFWTEMPTY", "FLOAT"),
-            ("WC_CAR07_LCST_FFWTEMPTY", "FLOAT"),
-            ("WC_CAR01_LCST_IFLUSHCYCCNT", "FLOAT"),
-            ("WC_CAR03_LCST_IFLUSHCYCCNT", "FLOAT"),
-            ("WC_CAR05_LCST_IFLUSHCYCCNT", "FLOAT"),
-            ("WC_CAR07_LCST_IFLUSHCYCCNT", "FLOAT"),
-            ("nombre_mission", "BIGINT"),
-            ("cpt_mission", "BIGINT"),
-            ("WC_CAR01_LCST_remplissage_WSU", "BIGINT"),
-            ("WC_CAR03_LCST_remplissage_WSU", "BIGINT"),
-            ("WC_CAR05_LCST_remplissage_WSU", "BIGINT"),
-            ("WC_CAR07_LCST_remplissage_WSU", "BIGINT"),
-            ("WC_CAR01_LCST_vidange_WSU", "BIGINT"),
-            ("WC_CAR03_LCST_vidange_WSU", "BIGINT"),
-            ("WC_CAR05_LCST_vidange_WSU", "BIGINT"),
-            ("WC_CAR07_LCST_vidange_WSU", "BIGINT"),
-            ("WC_CAR01_LCST_consommation_FWT", "FLOAT"),
-            ("WC_CAR03_LCST_consommation_FWT", "FLOAT"),
-            ("WC_CAR05_LCST_consommation_FWT", "FLOAT"),
-            ("WC_CAR07_LCST_consommation_FWT", "FLOAT"),
-            ("WC_CAR01_LCST_remplissage_WWT", "FLOAT"),
-            ("WC_CAR03_LCST_remplissage_WWT", "FLOAT"),
-            ("WC_CAR05_LCST_remplissage_WWT", "FLOAT"),
-            ("WC_CAR07_LCST_remplissage_WWT", "FLOAT"),
-            ("WC_CAR01_LCST_vidange_WWT", "BIGINT"),
-            ("WC_CAR03_LCST_vidange_WWT", "BIGINT"),
-            ("WC_CAR05_LCST_vidange_WWT", "BIGINT"),
-            ("WC_CAR07_LCST_vidange_WWT", "BIGINT"),
-            ("WC_CAR01_LCST_remplissage_FWT", "BIGINT"),
-            ("WC_CAR03_LCST_remplissage_FWT", "BIGINT"),
-            ("WC_CAR05_LCST_remplissage_FWT", "BIGINT"),
-            ("WC_CAR07_LCST_remplissage_FWT", "BIGINT"),
-            ("jour", "TEXT"),
-            ("rame", "TEXT"),
-            ("conso_FWT_rame", "FLOAT"),
-            ("rempl_WWT_rame", "FLOAT"))
+    # Vues de la table 'global_data' : les données des rames ne sont stockées et publiées qu'une fois, dans la table
+    # 'global_data', et présentées sous les noms des anciennes tables 'rames' et 'missions' (même contenu)
+    GLOBAL_DATA_PG_VIEWS = ["rames", "missions"]
     
     TRAITE_FWT_PG_TABLE = (
             ("x__imissiontrainnumber", "BIGINT"),
@@ -250,6 +128,87 @@ class Constants:
             ("dirtyMoy", "FLOAT"),
             ("dirtyMed", "FLOAT"))
     
+    # Nombre de threads d'inspection des dossiers parquet (1 : inspection séquentielle)
+    PARQUET_INSPECTION_WORKERS = 8
+
+    # Nombre de processus de fusion des groupes de dossiers parquet (1 : fusion séquentielle)
+    PARQUET_MERGE_WORKERS = os.cpu_count() or 1
+
+    # Calcul en flux de l'analyse de la consommation d'eau : fichiers traités par lots de lignes, avec report de l'état
+    # des calculs d'un lot au suivant (mémoire bornée par la taille d'un lot)
+    WATER_ANALYSIS_STREAMING = False
+
+    # Analyse incrémentale de la consommation d'eau : seuls les dossiers postérieurs au point de reprise de chaque rame
+    # sont calculés (en flux), et leurs lignes sont ajoutées à la table existante
+    WATER_ANALYSIS_INCREMENTAL = False
+
+    # Nombre maximal de lignes lues par lot dans les fichiers TT_IP.parquet en calcul en flux (131072 lignes, soit
+    # environ 36 heures de relevés à 1 Hz)
+    PARQUET_READ_BATCH_SIZE = 131072
+
+    # Cache sur disque des données lissées de chaque fichier TT_IP.parquet : seuls les fichiers nouveaux ou modifiés
+    # (ou lus avec d'autres paramètres) sont lissés de nouveau
+    FEATURE_CACHE_ENABLED = True
+
+    # Lecture anticipée des fichiers TT_IP.parquet pendant le calcul des données déjà lues : nombre de fichiers (ou de
+    # lots de lignes en calcul en flux) lus d'avance (0 : pas de lecture anticipée) et nombre de threads de lecture
+    PARQUET_PREFETCH_DEPTH = 2
+    PARQUET_PREFETCH_WORKERS = 2
+
+    # Types appliqués à la lecture des colonnes des fichiers TT_IP.parquet (alias de type pyarrow par signal, le signal
+    # étant le nom de la colonne sans le préfixe de la voiture "WC_CARxx_LCST_"). Une colonne dont le signal est absent,
+    # ou dont les valeurs ne sont pas représentables dans le type indiqué, est lue avec le type du fichier
+    PARQUET_READ_TYPES = {
+        "x__IMISSIONTRAINNUMBER": "int64",
+        "IWCWORKTIMEINCOMSERVICE": "int64",
+        "IWSUTANKLEVEL": "float32",
+        "IFWTANKCONTENT": "float32",
+        "IWWTANKCONTENT": "float32",
+        "IWATERTAPCNT": "int32",
+        "FFWTEMPTY": "int8",
+        "IFLUSHCYCCNT": "int32"}
+
+    # Types compacts des colonnes des DataFrames de l'analyse de la consommation d'eau, après lissage (type numpy par
+    # signal ou indicateur, sans le préfixe de la voiture "WC_CARxx_LCST_"). Un signal lissé n'est converti que si
+    # aucune de ses valeurs n'est modifiée (il reste en float64 sinon) ; les volumes en litres restent en float64
+    ANALYSIS_TYPES = {
+        "IWCWORKTIMEINCOMSERVICE": "int32",
+        "IWSUTANKLEVEL": "float32",
+        "IFWTANKCONTENT": "float32",
+        "IWWTANKCONTENT": "float32",
+        "IWATERTAPCNT": "int32",
+        "FFWTEMPTY": "int8",
+        "IFLUSHCYCCNT": "int32",
+        "nombre_mission": "int8",
+        "cpt_mission": "int32",
+        "remplissage_WSU": "int8",
+        "vidange_WSU": "int8",
+        "vidange_WWT": "int8",
+        "remplissage_FWT": "int8"}
+
+    # Nombre maximal de lignes publiées par requête d'insertion dans la base de données (la conversion des lignes en
+    # objets Python n'est faite que pour une partie des données à la fois)
+    DATABASE_PUBLISH_CHUNK_ROWS = 100000
+
+    # Lecture des fichiers parquet par projection en mémoire (memory map) plutôt que par lecture de fichier
+    PARQUET_MEMORY_MAP = False
+
+    # Taille de la fenêtre de la médiane roulante de lissage des signaux des capteurs (en secondes, soit en nombre de
+    # lignes)
+    ROLLING_MEDIAN_WINDOW = 15
+
+    # Voitures équipées de toilettes d'une rame, dans l'ordre des colonnes par voiture des tables (préfixe
+    # "WC_CARxx_LCST_" des signaux)
+    RAME_CARS = ["CAR01", "CAR03", "CAR05", "CAR07"]
+
+    # Nombre de processus de calcul des rames de l'analyse de la consommation d'eau (1 : calcul séquentiel)
+    WATER_ANALYSIS_WORKERS = os.cpu_count() or 1
+
+    # Jeu de données parquet partitionné par rame et par date : codec de compression ("zstd", "snappy" ou "gzip") et
+    # nombre de lignes par groupe de lignes
+    PARQUET_DATASET_COMPRESSION = "zstd"
+    PARQUET_DATASET_ROW_GROUP_SIZE = 65536
+
     # Sélection du mode d'utilisation du logiciel de visualisation.
     # Le logiciel peut prendre des données à afficher qui sont sous format pickle
     # en local (DATABASE_MODE = "local") ou récupérer les données à afficher
@@ -2,7 +2,7 @@
 # Nom du fichier : Paths.py
 # Description du fichier : classe "Paths". Gère l'ensemble des chemins d'accès au projet
 # Date de création : 14/11/2022
-# Date de mise à jour : 26/04/2022
+# Date de mise à jour : 18/10/2026
 # Créé par : Mathieu DENGLOS
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -95,27 +95,38 @@ class Paths:
         # ./root/Data/Parquet/Database_extracted_table
         self.__paths["Database_extracted_table_3"] = self.__paths["Parquet_2"].joinpath("Database_extracted_table")
 
+        # Dossier "Dataset", jeu de données parquet partitionné par rame et par date
+        # ./root/Data/Parquet/Dataset
+        self.__paths["Dataset_3"] = self.__paths["Parquet_2"].joinpath("Dataset")
+
+        # Dossier "Feature_cache", cache des données lissées de chaque fichier TT_IP.parquet
+        # ./root/Data/Parquet/Feature_cache
+        self.__paths["Feature_cache_3"] = self.__paths["Parquet_2"].joinpath("Feature_cache")
+
+        # Dossier "Checkpoints", points de reprise de l'analyse incrémentale de la consommation d'eau
+        # ./root/Data/Parquet/Checkpoints
+        self.__paths["Checkpoints_3"] = self.__paths["Parquet_2"].joinpath("Checkpoints")
+
         # Dossier ".Temp_parquet_merge"
         # ./root/Data/Parquet/.Temp_parquet_merge
         self.__paths["Temp_parquet_merge_3"] = self.__paths["Parquet_2"].joinpath(".Temp_parquet_merge")
         # Todo : supporter le dossier caché
         # self.__hide_folder(self.__paths["Temp_parquet_merge_4"])
 
-        """Niveau 4"""
-        # Dossier TT
-        # ./root/Data/Parquet/.Temp_parquet_merge/TT
-        self.__paths["Temp_TT_4"] = self.__paths["Temp_parquet_merge_3"].joinpath("TT")
-
-        # Dossier CTXT
-        # ./root/Data/Parquet/.Temp_parquet_merge/CTXT
-        self.__paths["Temp_CTXT_4"] = self.__paths["Temp_parquet_merge_3"].joinpath("CTXT")
-
         """FICHIERS"""
         """Niveau 3"""
         # Fichier d'exclusion de parquet
         # ./root/Data/Parquet/parquet_exclusion.txt
         self.__paths["parquet_exclusion_3"] = self.__paths["Parquet_2"].joinpath("parquet_exclusion.txt")
 
+        # Base structurée des exclusions de dossiers parquet
+        # ./root/Data/Parquet/parquet_exclusion.sqlite
+        self.__paths["exclusion_store_3"] = self.__paths["Parquet_2"].joinpath("parquet_exclusion.sqlite")
+
+        # Fichier manifeste des inspections de dossiers parquet
+        # ./root/Data/Parquet/parquet_manifest.json
+        self.__paths["parquet_manifest_3"] = self.__paths["Parquet_2"].joinpath("parquet_manifest.json")
+
     def __make_directories(self):
         """
         Crée les dossiers de l'arborescence s'ils n'existent pas.
@@ -125,8 +136,7 @@ class Paths:
         # s'ils n'existent pas
 
         # Liste des dossiers à créer
-        folder_to_create = ["Data_1", "CSV_2", "Parquet_2", "Source_3", "Edited_3", "Temp_parquet_merge_3", "Temp_TT_4",
-                            "Temp_CTXT_4"]
+        folder_to_create = ["Data_1", "CSV_2", "Parquet_2", "Source_3", "Edited_3", "Temp_parquet_merge_3"]
 
         # Génération d'une liste de chemin d'accès
         folder_to_create_path = []
@@ -3,8 +3,9 @@
 # Description du fichier : classe "Database". Gère la connexion et l'envoi des données vers la base de données
 #   postgreSQL 15
 # Date de création : 27/02/2023
-# Date de mise à jour : 26/04/2023
+# Date de mise à jour : 18/10/2026
 # Créé par : Mathieu DENGLOS
+# Mis à jour par : Rémy EVRARD
 # ----------------------------------------------------------------------------------------------------------------------
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -172,8 +173,9 @@ class Database:
                 cur.execute(f"SELECT to_regclass('{table_name}')")
                 table_exists = cur.fetchone()[0] is not None
 
+                # Les vues de la table (voir create_view) sont supprimées avec elle
                 if table_exists and recreate:
-                    cur.execute(f"DROP TABLE {table_name}")
+                    cur.execute(f"DROP TABLE {table_name} CASCADE")
                     self.__logger.info(
                         f"Table {table_name} dropped successfully.")
 
@@ -198,6 +200,62 @@ class Database:
         else:
             self.__logger.warning("Please connect to the database first.")
 
+    def create_view(self, view_name, source_table):
+        """
+        Crée (ou remplace) une vue PostgreSQL présentant toutes les lignes et colonnes d'une table. Les données ne
+        sont stockées qu'une fois, dans la table source.
+        Une table de même nom (publiée par une version précédente) est supprimée au profit de la vue.
+        :param view_name: Nom de la vue à créer
+        :param source_table: Nom de la table présentée par la vue
+        """
+        if self.conn is not None:
+            cur = self.conn.cursor()
+            try:
+                # Vérifie si une table porte déjà le nom de la vue
+                cur.execute(f"SELECT relkind FROM pg_class WHERE oid = to_regclass('{view_name}')")
+                relation = cur.fetchone()
+                if relation is not None and relation[0] == "r":
+                    cur.execute(f"DROP TABLE {view_name}")
+                    self.__logger.info(
+                        f"Table {view_name} dropped successfully.")
+
+                cur.execute(f"CREATE OR REPLACE VIEW {view_name} AS SELECT * FROM {source_table}")
+                self.conn.commit()
+                self.__logger.info(
+                    f"View {view_name} created successfully.")
+            except psycopg2.Error as e:
+                self.__logger.error(f"Error creating view: {e}")
+                self.conn.rollback()
+            cur.close()
+        else:
+            self.__logger.warning("Please connect to the database first.")
+
+    def delete_rows(self, table_name, condition, parameters=()):
+        """
+        Supprime les lignes d'une table PostgreSQL qui vérifient une condition.
+        :param table_name: Nom de la table
+        :param condition: Condition SQL des lignes à supprimer (clause WHERE), avec des paramètres "%s"
+        :param parameters: Valeurs des paramètres de la condition
+        :return: int: nombre de lignes supprimées, None en cas d'erreur
+        """
+        if self.conn is None:
+            self.__logger.warning("Please connect to the database first.")
+            return None
+
+        cur = self.conn.cursor()
+        try:
+            cur.execute(f"DELETE FROM {table_name} WHERE {condition}", parameters)
+            nb_deleted = cur.rowcount
+            self.conn.commit()
+            self.__logger.info(f"{nb_deleted} rows deleted from {table_name}.")
+        except psycopg2.Error as e:
+            self.__logger.error(f"Error deleting rows from {table_name}: {e}")
+            self.conn.rollback()
+            nb_deleted = None
+        cur.close()
+
+        return nb_deleted
+
     def drop_table(self, table_name):
         """
         Supprime une table de la base de données PostgreSQL.
@@ -266,7 +324,8 @@ class Database:
         """
         Insère les données d'un DataFrame dans la base de données PostgreSQL, en utilisant la méthode publish.
         Les données sont insérées dans la table spécifiée par table_name.
-        Si des données existent déjà dans la table, les nouvelles données sont concaténées.
+        Si des données existent déjà dans la table, les nouvelles données y sont ajoutées (INSERT simple), ce qui permet
+        de publier un DataFrame volumineux en plusieurs fois.
         :param df: DataFrame contenant les données à insérer
         :param table_name: Nom de la table dans laquelle insérer les données
         :param truncate_table: Booléen indiquant si la table doit être vidée avant d'insérer de nouvelles données
@@ -281,21 +340,13 @@ class Database:
             if truncate_table:
                 # Vide la table si truncate_table est True
                 cur.execute(f"TRUNCATE {table_name}")
-                # Insère les données directement dans la table vide
-                column_names = ", ".join(df.columns)
-                query = f"INSERT INTO {table_name} ({column_names}) VALUES %s"
-                execute_values(cur, query, data)
-                execute_values(cur, query, data)
-            else:
-                # Concaténation des données existantes avec les nouvelles données
-                cur.execute(f"SELECT * FROM {table_name}")
-                existing_data = cur.fetchall()
-                data = existing_data + data
-                cur.execute(f"TRUNCATE {table_name}")
-                # Utilisation de execute_values pour une insertion rapide de données
-                column_names = ", ".join(df.columns)
-                query = f"INSERT INTO {table_name} ({column_names}) VALUES %s"
-                execute_values(cur, query, data)
+
+            # Ajout des nouvelles données à la suite des données existantes : le coût de l'insertion ne dépend que
+            # du nombre de lignes insérées, et non du contenu de la table
+            # Utilisation de execute_values pour une insertion rapide de données
+            column_names = ", ".join(df.columns)
+            query = f"INSERT INTO {table_name} ({column_names}) VALUES %s"
+            execute_values(cur, query, data)
 
             self.conn.commit()
             self.__logger.info("Data published successfully.")
@@ -2,7 +2,7 @@
 # Nom du fichier : ExclusionList.py
 # Description du fichier : classe "ExclusionList". Gère la liste d'exclusion des dossiers parquet
 # Date de création : 15/11/2022
-# Date de mise à jour : 15/11/2022
+# Date de mise à jour : 18/10/2026
 # Créé par : Rémy EVRARD
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -16,15 +16,27 @@ import os
 # Imports des classes
 from core.paths.ProjectRootPath import ProjectRootPath
 from core.paths.Paths import Paths
+from parquet_processing.preprocessing.ExclusionStore import ExclusionStore
 # ----------------------------------------------------------------------------------------------------------------------
 
 
 class ExclusionList:
     """
     Gère la liste d'exclusion de dossier parquet. Un dossier parquet peut être exclu pour des raisons de continuité,
-    de fichier manquant ou de problème de schéma parquet
+    de fichier manquant ou de problème de schéma parquet.
+    La liste est tenue en mémoire (dictionnaire dossier -> ensemble des raisons d'exclusion). Elle est chargée depuis
+    la base structurée des exclusions (voir ExclusionStore) à la création de l'objet, et n'est écrite qu'à l'appel de
+    flush() : dans la base, et dans le fichier texte d'exclusion à raison d'une ligne "<dossier>: <raison>" par couple
+    (dossier, raison) ajouté.
     """
 
+    # En-tête du fichier d'exclusion
+    HEADER = "Parquet folder exclusion list\nReading: \"<folder name>: <exclude reason>\"\n-- See logs for further " \
+             "details --\n\n"
+
+    # Nombre de lignes de l'en-tête
+    HEADER_LINES = 4
+
     def __init__(self, create_file):
         # Logging
         self.__logger = log.getLogger("ExclusionList")
@@ -37,32 +49,62 @@ class ExclusionList:
         self.__exclusion_list_file_path = self.__paths.get_path(
             "parquet_exclusion")
 
+        # Base structurée des exclusions
+        self.__exclusion_store = ExclusionStore()
+
         # Création du fichier d'exclusion si requis
         if create_file:
             self.__create_exclusion_file()
+            self.__exclusion_store.clear()
+
+        # Dossiers exclus et raisons d'exclusion, dans l'ordre d'ajout : {dossier: {raisons}}
+        # Une base nouvellement créée est initialisée avec le fichier texte d'une exécution précédente
+        if self.__exclusion_store.is_new() and not create_file:
+            self.__excluded_folders = self.__read_exclusion_file()
+            for folder, reasons in self.__excluded_folders.items():
+                for reason in sorted(reasons):
+                    self.__exclusion_store.add(folder, reason)
+            self.__exclusion_store.flush()
+        else:
+            self.__excluded_folders = self.__exclusion_store.get_reasons_by_folder()
 
-        # Liste des dossiers exclus initialisés aux dossiers existants
-        self.__excluded_folder_list = self.get_excluded()
+        # Lignes ajoutées depuis la dernière écriture du fichier
+        self.__pending_lines = []
 
     def __create_exclusion_file(self):
         """
-        Suppression du contenu du fichier
+        Suppression du contenu du fichier et réécriture de l'en-tête
         """
 
-        # Suppression du contenu
         try:
-            open(self.__exclusion_list_file_path, 'w').close()
+            with open(self.__exclusion_list_file_path, "w") as exclusion_list_file:
+                exclusion_list_file.write(ExclusionList.HEADER)
         except IOError:
             self.__logger.error("Unable to clear the parquet exclusion list in \'%s\'" %
                                 self.__exclusion_list_file_path)
 
-        # Réécriture de l'entête
-        with open(self.__exclusion_list_file_path, "a+") as exclusion_listFile:
-            # Ajoute un texte d'entête au fichier à sa création
-            if os.path.getsize(self.__exclusion_list_file_path) == 0:
-                exclusion_listFile.write(
-                    "Parquet folder exclusion list\nReading: \"<folder name>: <exclude reason>\"\n-- See logs for "
-                    "further details --\n\n")
+    def __read_exclusion_file(self):
+        """
+        Lecture du fichier d'exclusion
+        :return: dict: raisons d'exclusion par dossier exclu
+        """
+
+        excluded_folders = {}
+
+        if not os.path.exists(self.__exclusion_list_file_path):
+            return excluded_folders
+
+        with open(self.__exclusion_list_file_path, "r") as exclusion_list_file:
+            # Lecture à partir de la cinquième ligne (en-tête négligée)
+            lines = exclusion_list_file.read().splitlines()[ExclusionList.HEADER_LINES:]
+
+        for line in lines:
+            if not line.strip():
+                continue
+            folder, _, reason = line.partition(": ")
+            excluded_folders.setdefault(folder.strip(), set()).add(reason.strip())
+
+        return excluded_folders
 
     def get_path(self):
         """
@@ -80,94 +122,115 @@ class ExclusionList:
         :return: bool: statut d'exclusion. Vrai si dossier exclu, Faux sinon
         """
 
-        # Lecture du fichier d'exclusion
-        with open(self.__exclusion_list_file_path, "r") as exclusion_list_file:
-            exclusion_list_content = exclusion_list_file.read()
-        exclusion_list_file.close()
-
-        # Chaîne de caractère symbolisant l'exclusion pour une raison précise
-        if reason != "miscellaneous":
-            exclusion_string = folder + ": " + reason
-        # Chaîne de caractère pour n'importe quel motif d'exclusion
-        else:
-            exclusion_string = folder
+        reasons = self.__excluded_folders.get(folder)
 
-        # Si le dossier se trouve dans la liste d'exclusion
-        if exclusion_string in exclusion_list_content:
-            return True
-        else:
+        # Dossier non exclu
+        if reasons is None:
             return False
 
-    def add_folder(self, folder, reason):
+        # N'importe quel motif d'exclusion, ou motif précis
+        return reason == "miscellaneous" or reason in reasons
+
+    def get_reasons(self, folder):
+        """
+        Renvoie les raisons d'exclusion d'un dossier
+        :param folder: dossier exclu
+        :return: set: raisons d'exclusion, ensemble vide si le dossier n'est pas exclu
         """
-        Ajoute un dossier de fichiers parquet au fichier de liste d'exclusion
+
+        return set(self.__excluded_folders.get(folder, ()))
+
+    def add_folder(self, folder, reason, fingerprint=None):
+        """
+        Ajoute un dossier de fichiers parquet à la liste d'exclusion. L'ajout est écrit dans le fichier d'exclusion et
+        dans la base des exclusions à l'appel de flush()
         :param folder: dossier à exclure
         :param reason: raison d'exclusion
+        :param fingerprint: empreinte du dossier (voir ParquetInspection.get_folder_fingerprint), calculée si None
+        """
+
+        reasons = self.__excluded_folders.setdefault(folder, set())
+
+        # Ajout de la raison si elle n'est pas déjà enregistrée pour ce dossier
+        if reason not in reasons:
+            reasons.add(reason)
+            self.__pending_lines.append(folder + ": " + reason + "\n")
+            self.__exclusion_store.add(folder, reason, fingerprint=fingerprint)
+
+    def flush(self):
         """
+        Écrit dans la base et dans le fichier d'exclusion les ajouts effectués depuis la dernière écriture
+        """
+
+        self.__exclusion_store.flush()
 
-        # Ajoute les dossiers s'ils ne sont pas déjà présents dans la liste d'exclusion
-        with open(self.__exclusion_list_file_path, "r+") as exclusion_list_file:
-            # Ajoute un texte d'entête au fichier à sa création
-            if os.path.getsize(self.__exclusion_list_file_path) == 0:
-                exclusion_list_file.write(
-                    "Parquet folder exclusion list\nReading: \"<folder name>: <exclude reason>\"\n-- See logs for "
-                    "further details --\n\n")
+        if not self.__pending_lines:
+            return
 
-                # Lecture du contenu de la liste d'exclusion
-            exclusion_list_content = exclusion_list_file.read()
+        try:
+            with open(self.__exclusion_list_file_path, "a+") as exclusion_list_file:
+                # Ajoute un texte d'entête au fichier à sa création
+                if os.path.getsize(self.__exclusion_list_file_path) == 0:
+                    exclusion_list_file.write(ExclusionList.HEADER)
 
-            # Ajout du dossier s'il n'est pas déjà présent dans le fichier
-            if folder not in exclusion_list_content:
-                exclusion_list_file.write(folder + ": " + reason + "\n")
-                # Ajout du dossier à la liste d'exclusion
-                self.__excluded_folder_list.append(folder)
+                exclusion_list_file.writelines(self.__pending_lines)
+            self.__pending_lines = []
 
-        exclusion_list_file.close()
+        except IOError:
+            self.__logger.error("Unable to write the parquet exclusion list in \'%s\'" %
+                                self.__exclusion_list_file_path)
 
-    def get_excluded(self):
+    def close(self):
         """
-        Lecture des dossiers exclus et stockage de ceux-ci
-        :return: self.__excluded_folder_list: liste d'exclusion des dossiers
+        Écrit les ajouts en attente (voir flush) et ferme la base des exclusions. La liste en mémoire reste
+        consultable (get_excluded sans filtre, get_not_excluded, get_nb_excluded_folder)
         """
 
-        with open(self.__exclusion_list_file_path, "r") as exclusion_list_file:
-            # Lecture à partir de la quatrième ligne (en-tête négligée)
-            lines = exclusion_list_file.readlines()[4:]
+        self.flush()
+        self.__exclusion_store.close()
 
-            # Conservation des 26 premiers caractères reprenant uniquement le nom des dossiers
-            for excluded_folder in range(len(lines)):
-                lines[excluded_folder] = lines[excluded_folder][0:26]
-        exclusion_list_file.close()
+    def get_excluded(self, train_id=None, start_date=None, end_date=None, reasons=None):
+        """
+        Renvoie les dossiers exclus, éventuellement filtrés par rame, par période ou par raison d'exclusion (requête
+        indexée sur la base des exclusions)
+        :param train_id: rame (toutes les rames si None)
+        :param start_date: première date, au format "AAAA-MM-JJ" (pas de borne si None)
+        :param end_date: dernière date, au format "AAAA-MM-JJ" (pas de borne si None)
+        :param reasons: liste des raisons d'exclusion (toutes les raisons si None)
+        :return: list: liste d'exclusion des dossiers, dans l'ordre d'ajout
+        """
 
-        # Affectation à la liste des dossiers exclus
-        self.__excluded_folder_list = lines
+        # Sans filtre, la liste en mémoire suffit
+        if train_id is None and start_date is None and end_date is None and reasons is None:
+            return list(self.__excluded_folders)
 
-        # Renvoi de la liste d'exclusion
-        return self.__excluded_folder_list
+        return self.__exclusion_store.get_excluded(train_id, start_date, end_date, reasons)
+
+    def get_records(self, **filters):
+        """
+        Renvoie le détail des exclusions : dossier, rame, date, heure, indice de séparation, raison, date de détection
+        et empreinte du dossier (voir ExclusionStore.get_records pour les filtres disponibles)
+        :return: list: exclusions, sous forme de dictionnaires
+        """
+
+        return self.__exclusion_store.get_records(**filters)
 
     def get_not_excluded(self):
         """
         Renvoie une liste des dossiers non-exclus
-        :return:
+        :return: list: dossiers du dossier "Source" ôtés des dossiers exclus, triés alphabétiquement
         """
 
-        # Récupère une liste actualisée des dossiers exclus
-        self.__excluded_folder_list = self.get_excluded()
-
         # Récupère une liste actualisée des dossiers
         parquet_folder_list = self.__paths.get_source_parquet()
 
-        for folder in range(len(self.__excluded_folder_list)):
-            if self.__excluded_folder_list[folder] in parquet_folder_list:
-                parquet_folder_list.remove(self.__excluded_folder_list[folder])
-
-        # Retourne la liste des dossiers ôtée des dossiers exclus
-        return parquet_folder_list
+        # Différence ensembliste, en conservant l'ordre de la liste des dossiers
+        return [folder for folder in parquet_folder_list if folder not in self.__excluded_folders]
 
     def get_nb_excluded_folder(self):
         """
         Renvoie le nombre de dossiers exclus
-        :return: len(self.get_excluded()): nombre de dossiers exclus
+        :return: int: nombre de dossiers exclus
         """
 
-        return len(self.get_excluded())
+        return len(self.__excluded_folders)
@@ -0,0 +1,216 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : ExclusionStore.py
+# Description du fichier : classe "ExclusionStore". Base SQLite des dossiers parquet exclus, interrogeable par rame,
+#   par période et par raison d'exclusion
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import json
+import logging as log
+import os
+import sqlite3
+from datetime import datetime
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des classes
+from core.paths.Paths import Paths
+from parquet_processing.preprocessing.ParquetFolderIndex import ParquetFolderIndex
+from parquet_processing.preprocessing.ParquetInspection import ParquetInspection
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ExclusionStore:
+    """
+    Base structurée des exclusions de dossiers parquet. Chaque exclusion est un couple (dossier, raison) accompagné de
+    la rame, de la date, de l'heure et de l'indice de séparation décomposés du nom du dossier, de la date de détection
+    et de l'empreinte du dossier au moment de la détection. Les colonnes rame, date et raison sont indexées.
+    """
+
+    # Schéma de la table des exclusions
+    CREATE_TABLE = """
+        CREATE TABLE IF NOT EXISTS exclusions (
+            folder TEXT NOT NULL,
+            train_id TEXT,
+            date TEXT,
+            time TEXT,
+            split_id INTEGER,
+            reason TEXT NOT NULL,
+            detected_at TEXT NOT NULL,
+            fingerprint TEXT,
+            PRIMARY KEY (folder, reason)
+        )"""
+    CREATE_INDEXES = ["CREATE INDEX IF NOT EXISTS exclusions_train_date ON exclusions (train_id, date)",
+                      "CREATE INDEX IF NOT EXISTS exclusions_date ON exclusions (date)",
+                      "CREATE INDEX IF NOT EXISTS exclusions_reason ON exclusions (reason)"]
+
+    # Colonnes d'un enregistrement
+    COLUMNS = ["folder", "train_id", "date", "time", "split_id", "reason", "detected_at", "fingerprint"]
+
+    def __init__(self):
+        # Logging
+        self.__logger = log.getLogger("ExclusionStore")
+
+        # Chemins d'accès
+        self.__paths = Paths()
+        # Chemin d'accès du dossier "Source" de parquet
+        self.__source_parquet_path = self.__paths.get_path("Source")
+        # Chemin d'accès de la base des exclusions
+        self.__store_file_path = self.__paths.get_path("exclusion_store")
+
+        # Indique si la base existait avant l'ouverture
+        self.__created = not os.path.exists(self.__store_file_path)
+
+        self.__connection = sqlite3.connect(self.__store_file_path)
+        with self.__connection:
+            self.__connection.execute(ExclusionStore.CREATE_TABLE)
+            for create_index in ExclusionStore.CREATE_INDEXES:
+                self.__connection.execute(create_index)
+
+        # Exclusions en attente d'écriture
+        self.__pending_records = []
+
+    def is_new(self):
+        """
+        Indique si la base a été créée à l'ouverture (aucune exclusion enregistrée auparavant)
+        :return: bool: Vrai si la base vient d'être créée
+        """
+
+        return self.__created
+
+    def close(self):
+        """
+        Écrit les exclusions en attente et ferme la base
+        """
+
+        self.flush()
+        self.__connection.close()
+
+    def clear(self):
+        """
+        Supprime toutes les exclusions enregistrées
+        """
+
+        self.__pending_records = []
+        with self.__connection:
+            self.__connection.execute("DELETE FROM exclusions")
+
+    def add(self, folder, reason, detected_at=None, fingerprint=None):
+        """
+        Ajoute une exclusion. L'exclusion est écrite dans la base à l'appel de flush()
+        :param folder: dossier exclu
+        :param reason: raison d'exclusion
+        :param detected_at: date de détection (maintenant si None)
+        :param fingerprint: empreinte du dossier (voir ParquetInspection.get_folder_fingerprint), calculée si None
+        """
+
+        # Décomposition du nom de dossier
+        match = ParquetFolderIndex.FOLDER_NAME_PATTERN.match(folder)
+        if match is not None:
+            train_id = match["trainId"]
+            date = "%s-%s-%s" % (match["date"][0:4], match["date"][4:6], match["date"][6:8])
+            time = "%s:%s:%s" % (match["time"][0:2], match["time"][2:4], match["time"][4:6])
+            split_id = int(match["splitId"])
+        else:
+            train_id, date, time, split_id = None, None, None, None
+
+        if detected_at is None:
+            detected_at = datetime.now()
+
+        self.__pending_records.append([folder, train_id, date, time, split_id, reason,
+                                       detected_at.isoformat(timespec="seconds"), fingerprint])
+
+    def flush(self):
+        """
+        Écrit les exclusions en attente dans la base, en une seule transaction. Une exclusion déjà enregistrée
+        (même dossier, même raison) est remplacée
+        """
+
+        if not self.__pending_records:
+            return
+
+        # Empreinte des dossiers au moment de l'écriture, lorsqu'elle n'a pas été fournie
+        for record in self.__pending_records:
+            if record[7] is None:
+                try:
+                    record[7] = json.dumps(ParquetInspection.get_folder_fingerprint(self.__source_parquet_path,
+                                                                                    record[0]))
+                except OSError:
+                    record[7] = None
+            elif not isinstance(record[7], str):
+                record[7] = json.dumps(record[7])
+
+        try:
+            with self.__connection:
+                self.__connection.executemany(
+                    "INSERT OR REPLACE INTO exclusions (%s) VALUES (%s)" %
+                    (", ".join(ExclusionStore.COLUMNS), ", ".join("?" * len(ExclusionStore.COLUMNS))),
+                    self.__pending_records)
+            self.__pending_records = []
+
+        except sqlite3.Error as error:
+            self.__logger.error("Unable to write the parquet exclusion store \'%s\'. Reason: %s" %
+                                (self.__store_file_path, error))
+
+    def get_records(self, train_id=None, start_date=None, end_date=None, reasons=None, folder=None):
+        """
+        Renvoie les exclusions correspondant aux filtres, dans l'ordre d'enregistrement
+        :param train_id: rame (toutes les rames si None)
+        :param start_date: première date, au format "AAAA-MM-JJ" (pas de borne si None)
+        :param end_date: dernière date, au format "AAAA-MM-JJ" (pas de borne si None)
+        :param reasons: liste des raisons d'exclusion (toutes les raisons si None)
+        :param folder: dossier (tous les dossiers si None)
+        :return: list: exclusions, sous forme de dictionnaires {colonne: valeur}
+        """
+
+        self.flush()
+
+        conditions, parameters = [], []
+        if train_id is not None:
+            conditions.append("train_id = ?")
+            parameters.append(train_id)
+        if start_date is not None:
+            conditions.append("date >= ?")
+            parameters.append(start_date)
+        if end_date is not None:
+            conditions.append("date <= ?")
+            parameters.append(end_date)
+        if reasons is not None:
+            reasons = list(reasons)
+            conditions.append("reason IN (%s)" % ", ".join("?" * len(reasons)))
+            parameters.extend(reasons)
+        if folder is not None:
+            conditions.append("folder = ?")
+            parameters.append(folder)
+
+        query = "SELECT %s FROM exclusions" % ", ".join(ExclusionStore.COLUMNS)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY rowid"
+
+        return [dict(zip(ExclusionStore.COLUMNS, row)) for row in self.__connection.execute(query, parameters)]
+
+    def get_excluded(self, train_id=None, start_date=None, end_date=None, reasons=None):
+        """
+        Renvoie les dossiers exclus correspondant aux filtres (voir get_records)
+        :return: list: dossiers exclus, sans doublon, dans l'ordre d'enregistrement
+        """
+
+        return list(dict.fromkeys(record["folder"] for record in
+                                  self.get_records(train_id, start_date, end_date, reasons)))
+
+    def get_reasons_by_folder(self):
+        """
+        Renvoie les raisons d'exclusion de chaque dossier exclu
+        :return: dict: {dossier: {raisons}}, dans l'ordre d'enregistrement
+        """
+
+        excluded_folders = {}
+        for record in self.get_records():
+            excluded_folders.setdefault(record["folder"], set()).add(record["reason"])
+
+        return excluded_folders
@@ -0,0 +1,151 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : InspectionManifest.py
+# Description du fichier : classe "InspectionManifest". Conserve sur disque les résultats d'inspection des dossiers
+#   parquet, pour ne réinspecter que les dossiers nouveaux ou modifiés
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import json
+import logging as log
+import os
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des classes
+from core.paths.Paths import Paths
+from parquet_processing.preprocessing.ParquetInspection import ParquetInspection
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class InspectionManifest:
+    """
+    Manifeste des inspections de dossiers parquet. Chaque entrée, indexée par le nom du dossier, associe l'empreinte
+    des fichiers du dossier (nom, taille, date de modification) aux informations relevées lors de l'inspection :
+    version de configuration, colonnes manquantes, nombre de lignes et plage temporelle.
+    Une entrée n'est valable que tant que l'empreinte du dossier est inchangée.
+    """
+
+    # Version du format du manifeste. À incrémenter si le contenu des inspections change
+    MANIFEST_VERSION = 1
+
+    def __init__(self, required_columns):
+        # Logging
+        self.__logger = log.getLogger("InspectionManifest")
+
+        # Chemins d'accès
+        self.__paths = Paths()
+        # Chemin d'accès du dossier "Source" de parquet
+        self.__source_parquet_path = self.__paths.get_path("Source")
+        # Chemin d'accès du fichier manifeste
+        self.__manifest_file_path = self.__paths.get_path("parquet_manifest")
+
+        # Colonnes requises dans les fichiers TT_IP.parquet : les colonnes manquantes enregistrées n'ont de sens
+        # que pour cette liste de colonnes
+        self.__required_columns = list(required_columns)
+
+        # Entrées du manifeste : {dossier: {"fingerprint": empreinte, "inspection": informations d'inspection}}
+        self.__entries = self.__load()
+
+    def __load(self):
+        """
+        Lecture du fichier manifeste. Le manifeste est ignoré s'il est illisible, d'une autre version, ou s'il a été
+        constitué pour une autre liste de colonnes requises.
+        :return: dict: entrées du manifeste
+        """
+
+        if not os.path.exists(self.__manifest_file_path):
+            return {}
+
+        try:
+            with open(self.__manifest_file_path, "r") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError) as error:
+            self.__logger.warning("Unable to read the parquet inspection manifest \'%s\'. Reason: %s" %
+                                  (self.__manifest_file_path, error))
+            return {}
+
+        if manifest.get("version") != InspectionManifest.MANIFEST_VERSION or \
+                manifest.get("required_columns") != self.__required_columns:
+            self.__logger.info("Parquet inspection manifest is outdated and will be rebuilt")
+            return {}
+
+        return manifest.get("folders", {})
+
+    def save(self):
+        """
+        Écriture du manifeste sur disque. L'écriture passe par un fichier temporaire renommé, de sorte qu'une
+        interruption ne laisse jamais un manifeste tronqué.
+        """
+
+        manifest = {"version": InspectionManifest.MANIFEST_VERSION,
+                    "required_columns": self.__required_columns,
+                    "folders": self.__entries}
+
+        temp_file_path = str(self.__manifest_file_path) + ".tmp"
+        try:
+            with open(temp_file_path, "w") as manifest_file:
+                json.dump(manifest, manifest_file)
+            os.replace(temp_file_path, self.__manifest_file_path)
+        except OSError as error:
+            self.__logger.error("Unable to write the parquet inspection manifest \'%s\'. Reason: %s" %
+                                (self.__manifest_file_path, error))
+
+    def get_inspection(self, folder, fingerprint):
+        """
+        Renvoie les informations d'inspection d'un dossier si son empreinte est inchangée.
+        :param folder: nom du dossier parquet
+        :param fingerprint: empreinte actuelle du dossier (voir ParquetInspection.get_folder_fingerprint)
+        :return: dict: informations d'inspection, None si le dossier est nouveau ou a été modifié
+        """
+
+        entry = self.__entries.get(folder)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return None
+
+        return entry["inspection"]
+
+    def set_inspection(self, folder, fingerprint, inspection):
+        """
+        Enregistre les informations d'inspection d'un dossier.
+        :param folder: nom du dossier parquet
+        :param fingerprint: empreinte du dossier au moment de l'inspection
+        :param inspection: informations d'inspection (voir ParquetInspection.inspect_folder)
+        """
+
+        self.__entries[folder] = {"fingerprint": fingerprint, "inspection": inspection}
+
+    def prune(self, folder_list):
+        """
+        Supprime du manifeste les dossiers qui ne font plus partie du dossier "Source".
+        :param folder_list: liste des dossiers parquet présents
+        """
+
+        for folder in set(self.__entries) - set(folder_list):
+            del self.__entries[folder]
+
+    def get_missing_columns(self, folder):
+        """
+        Renvoie les colonnes requises manquantes dans le fichier TT_IP.parquet d'un dossier. Le manifeste est utilisé
+        si le dossier n'a pas changé depuis son inspection ; sinon, seul le pied de page du fichier est relu.
+        :param folder: nom du dossier parquet
+        :return: list: colonnes manquantes, None si le fichier est illisible
+        """
+
+        fingerprint = ParquetInspection.get_folder_fingerprint(self.__source_parquet_path, folder)
+        inspection = self.get_inspection(folder, fingerprint)
+
+        # Dossier inchangé depuis son inspection
+        if inspection is not None and inspection["tt_footer_valid"]:
+            return inspection["missing_columns"]
+
+        # Dossier nouveau ou modifié : lecture du pied de page uniquement
+        tt_metadata = ParquetInspection.read_footer(os.path.join(self.__source_parquet_path, folder,
+                                                                 "TT_IP.parquet"))
+        if tt_metadata is None:
+            return None
+
+        return ParquetInspection.get_missing_columns(tt_metadata, self.__required_columns)
@@ -0,0 +1,153 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : ParquetDataset.py
+# Description du fichier : classe "ParquetDataset". Écrit et lit les données nettoyées sous forme d'un jeu de données
+#   parquet partitionné par rame et par date (partitionnement "hive")
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import logging as log
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des classes
+from parquet_processing.preprocessing.ParquetFolderIndex import ParquetFolderIndex
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ParquetDataset:
+    """
+    Jeu de données parquet partitionné, de la forme "<racine>/rame=z5500503/date=2022-11-07/part-0.parquet".
+    Chaque partition regroupe, pour une rame et une date de début d'enregistrement, les relevés des dossiers parquet
+    non-exclus. Un lecteur filtrant sur la rame ou la date n'ouvre que les partitions concernées.
+    """
+
+    # Codecs de compression acceptés
+    COMPRESSIONS = ("zstd", "snappy", "gzip")
+
+    # Schéma des colonnes de partitionnement
+    PARTITIONING = ds.partitioning(pa.schema([("rame", pa.string()), ("date", pa.string())]), flavor="hive")
+
+    # Logging
+    __logger = log.getLogger("ParquetDataset")
+
+    @staticmethod
+    def __read_folder_batches(tt_file_path, columns, schema, rame, date):
+        """
+        Lit un fichier TT_IP.parquet par lots d'enregistrements et y ajoute les colonnes de partitionnement.
+        :param tt_file_path: chemin d'accès du fichier TT_IP.parquet
+        :param columns: colonnes à conserver
+        :param schema: schéma des colonnes conservées, commun à tous les fichiers du jeu de données
+        :param rame: identifiant de la rame
+        :param date: date de début d'enregistrement, au format "AAAA-MM-JJ"
+        :return: generator: lots d'enregistrements (pyarrow.RecordBatch)
+        """
+
+        with pq.ParquetFile(tt_file_path) as tt_file:
+            for batch in tt_file.iter_batches(columns=columns):
+                # Alignement de l'ordre et des types des colonnes sur le schéma commun
+                for aligned_batch in pa.Table.from_batches([batch]).select(columns).cast(schema).to_batches():
+                    yield pa.RecordBatch.from_arrays(
+                        aligned_batch.columns + [pa.repeat(pa.scalar(rame, pa.string()), aligned_batch.num_rows),
+                                                 pa.repeat(pa.scalar(date, pa.string()), aligned_batch.num_rows)],
+                        names=columns + ["rame", "date"])
+
+    @staticmethod
+    def write(source_parquet_path, folder_list, dataset_path, columns, compression="zstd", row_group_size=65536):
+        """
+        Écrit les fichiers TT_IP.parquet d'une liste de dossiers dans un jeu de données partitionné par rame et date.
+        Les fichiers sont lus par lots : la mémoire utilisée est bornée par la taille des groupes de lignes en attente
+        d'écriture, et non par la taille des fichiers. Les partitions écrites remplacent celles d'une exécution
+        précédente ; les autres partitions sont conservées.
+
+        :param source_parquet_path: chemin d'accès du dossier "Source" de parquet
+        :param folder_list: liste des dossiers parquet à écrire
+        :param dataset_path: chemin d'accès de la racine du jeu de données
+        :param columns: colonnes à conserver
+        :param compression: codec de compression ("zstd", "snappy" ou "gzip")
+        :param row_group_size: nombre de lignes par groupe de lignes
+        :return: int: nombre de dossiers écrits
+        """
+
+        if compression not in ParquetDataset.COMPRESSIONS:
+            raise ValueError("Unsupported parquet dataset compression \'%s\'. Expected one of: %s" %
+                             (compression, ", ".join(ParquetDataset.COMPRESSIONS)))
+
+        # Dossiers écrits dans l'ordre de l'index : les lignes d'une partition sont consécutives
+        folder_index = ParquetFolderIndex(folder_list)
+        folders = folder_index.get_folders()
+        train_ids = folder_index.get_column("trainId")
+        dates = folder_index.get_column("date")
+
+        # Fichiers lisibles et contenant toutes les colonnes ; le premier d'entre eux fixe le schéma commun
+        schema = None
+        written_folders = []
+        for folder, train_id, date in zip(folders, train_ids, dates):
+            tt_file_path = os.path.join(source_parquet_path, folder, "TT_IP.parquet")
+            try:
+                file_schema = pq.read_schema(tt_file_path)
+            except (OSError, pa.ArrowException) as error:
+                ParquetDataset.__logger.warning("Unable to read \'%s\'. Reason: %s" % (tt_file_path, error))
+                continue
+            if any(column not in file_schema.names for column in columns):
+                ParquetDataset.__logger.warning("Missing column(s) in \'%s\'" % tt_file_path)
+                continue
+
+            if schema is None:
+                schema = pa.schema([file_schema.field(column) for column in columns])
+            written_folders.append((tt_file_path, str(train_id), "%s-%s-%s" % (str(date)[0:4], str(date)[4:6],
+                                                                                 str(date)[6:8])))
+
+        if schema is None:
+            ParquetDataset.__logger.info("No parquet folder to write to the dataset")
+            return 0
+
+        def batches():
+            for tt_file_path, rame, date in written_folders:
+                yield from ParquetDataset.__read_folder_batches(tt_file_path, columns, schema, rame, date)
+
+        file_format = ds.ParquetFileFormat()
+        ds.write_dataset(batches(), dataset_path,
+                         schema=schema.append(pa.field("rame", pa.string())).append(pa.field("date", pa.string())),
+                         format=file_format,
+                         file_options=file_format.make_write_options(compression=compression),
+                         partitioning=ParquetDataset.PARTITIONING,
+                         basename_template="part-{i}.parquet",
+                         existing_data_behavior="delete_matching",
+                         min_rows_per_group=row_group_size,
+                         max_rows_per_group=row_group_size)
+
+        return len(written_folders)
+
+    @staticmethod
+    def read(dataset_path, columns=None, rames=None, start_date=None, end_date=None):
+        """
+        Lit le jeu de données en ne parcourant que les partitions correspondant aux filtres.
+
+        :param dataset_path: chemin d'accès de la racine du jeu de données
+        :param columns: colonnes à lire (toutes les colonnes si None)
+        :param rames: liste des rames à lire (toutes les rames si None)
+        :param start_date: première date à lire, au format "AAAA-MM-JJ" (pas de borne si None)
+        :param end_date: dernière date à lire, au format "AAAA-MM-JJ" (pas de borne si None)
+        :return: pyarrow.Table: données lues
+        """
+
+        dataset = ds.dataset(dataset_path, format="parquet", partitioning=ParquetDataset.PARTITIONING)
+
+        # Filtre sur les colonnes de partitionnement : les partitions exclues ne sont pas ouvertes
+        partition_filter = None
+        for condition in [pc.field("rame").isin(list(rames)) if rames is not None else None,
+                          pc.field("date") >= start_date if start_date is not None else None,
+                          pc.field("date") <= end_date if end_date is not None else None]:
+            if condition is not None:
+                partition_filter = condition if partition_filter is None else partition_filter & condition
+
+        return dataset.to_table(columns=columns, filter=partition_filter)
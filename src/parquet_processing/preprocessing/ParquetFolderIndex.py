@@ -0,0 +1,157 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : ParquetFolderIndex.py
+# Description du fichier : classe "ParquetFolderIndex". Index trié des noms de dossiers parquet, décomposés en colonnes
+#   typées (rame, date, heure, indice de séparation)
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import logging as log
+import re
+import numpy as np
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ParquetFolderIndex:
+    """
+    Index des dossiers parquet. Les noms de dossiers ("<trainId>_<date>_<heure>_<splitId>", exemple :
+    "z5500503_20221107_131914_0") sont décomposés une seule fois en colonnes typées d'un tableau numpy, trié par
+    (rame, date, heure, indice de séparation). La continuité des relevés et les groupes de fusion sont calculés en
+    une seule passe vectorisée sur ces colonnes, en temps linéaire après le tri.
+    """
+
+    # Format d'un nom de dossier parquet
+    FOLDER_NAME_PATTERN = re.compile(r"^(?P<trainId>[^_]+)_(?P<date>\d{8})_(?P<time>\d{6})_(?P<splitId>\d+)$")
+
+    # Type des colonnes de l'index
+    INDEX_DTYPE = np.dtype([("trainId", "U16"), ("date", np.int32), ("time", np.int32), ("splitId", np.int32)])
+
+    def __init__(self, folder_list):
+        # Logging
+        self.__logger = log.getLogger("ParquetFolderIndex")
+
+        # Décomposition des noms de dossiers
+        parsed_folders = []
+        self.__invalid_folders = []
+        for folder in folder_list:
+            match = ParquetFolderIndex.FOLDER_NAME_PATTERN.match(folder)
+            if match is None:
+                self.__invalid_folders.append(folder)
+            else:
+                parsed_folders.append((folder, match["trainId"], int(match["date"]), int(match["time"]),
+                                       int(match["splitId"])))
+
+        if self.__invalid_folders:
+            self.__logger.warning("Unexpected parquet folder name(s): %s" % ", ".join(self.__invalid_folders))
+
+        # Colonnes typées de l'index
+        index = np.array([parsed_folder[1:] for parsed_folder in parsed_folders], dtype=ParquetFolderIndex.INDEX_DTYPE)
+        names = np.array([parsed_folder[0] for parsed_folder in parsed_folders], dtype=object)
+
+        # Tri par (rame, date, heure, indice de séparation) : la dernière clef de lexsort est la clef primaire
+        order = np.lexsort((index["splitId"], index["time"], index["date"], index["trainId"]))
+        self.__index = index[order]
+        self.__names = names[order]
+
+    def __len__(self):
+        return len(self.__index)
+
+    def get_folders(self):
+        """
+        Renvoie les noms des dossiers, dans l'ordre de l'index.
+        :return: list: noms des dossiers triés par (rame, date, heure, indice de séparation)
+        """
+
+        return self.__names.tolist()
+
+    def get_invalid_folders(self):
+        """
+        Renvoie les dossiers dont le nom ne respecte pas le format "<trainId>_<date>_<heure>_<splitId>".
+        :return: list: noms des dossiers non indexés
+        """
+
+        return list(self.__invalid_folders)
+
+    def get_column(self, column):
+        """
+        Renvoie une colonne de l'index ("trainId", "date", "time" ou "splitId").
+        :param column: nom de la colonne
+        :return: numpy.ndarray: valeurs de la colonne, dans l'ordre de l'index
+        """
+
+        return self.__index[column]
+
+    @staticmethod
+    def __get_segments(train_ids, split_ids):
+        """
+        Découpe une suite de dossiers en segments continus : un dossier prolonge le segment du dossier précédent s'il
+        concerne la même rame et que son indice de séparation est l'indice précédent incrémenté de 1.
+        :param train_ids: identifiants de rame des dossiers
+        :param split_ids: indices de séparation des dossiers
+        :return: tuple: (numpy.ndarray des dossiers prolongeant le précédent, numpy.ndarray de l'identifiant de segment)
+        """
+
+        continuous = np.zeros(len(split_ids), dtype=bool)
+        continuous[1:] = (train_ids[1:] == train_ids[:-1]) & (split_ids[1:] == split_ids[:-1] + 1)
+
+        # Un nouveau segment commence à chaque dossier qui ne prolonge pas le précédent
+        segment_ids = np.cumsum(~continuous)
+
+        return continuous, segment_ids
+
+    def get_continuity(self):
+        """
+        Vérifie la continuité du nommage des dossiers. Une marche commence par un dossier d'indice 0 et se poursuit
+        par des dossiers d'indices incrémentés de 1. Un dossier qui ne prolonge pas le précédent et dont l'indice
+        n'est pas 0 constitue une rupture de continuité : il est exclu, ainsi que les dossiers qui le prolongent
+        (exemple : si on a A_1, suivi par B_1 et C_2, alors B_1 et C_2 sont exclus).
+        :return: tuple: (numpy.ndarray des ruptures de continuité, numpy.ndarray des dossiers à exclure), dans l'ordre
+            de l'index
+        """
+
+        split_ids = self.__index["splitId"]
+        continuous, segment_ids = self.__get_segments(self.__index["trainId"], split_ids)
+
+        # Ruptures : début de segment dont l'indice de séparation n'est pas 0
+        breaks = ~continuous & (split_ids != 0)
+
+        # Segments commençant par une rupture
+        broken_segments = np.zeros(segment_ids[-1] + 1 if len(segment_ids) else 1, dtype=bool)
+        broken_segments[segment_ids[breaks]] = True
+
+        return breaks, broken_segments[segment_ids]
+
+    def get_merge_groups(self, excluded_folders=()):
+        """
+        Constitue les groupes de dossiers à fusionner : chaque groupe est une marche complète, d'un dossier d'indice 0
+        aux dossiers d'indices consécutifs qui le suivent. Les dossiers exclus sont retirés avant la constitution des
+        groupes ; une marche interrompue par un dossier exclu est tronquée à ce dossier.
+        :param excluded_folders: noms des dossiers exclus
+        :return: list: groupes de dossiers à fusionner (listes de noms de dossiers)
+        """
+
+        # Retrait des dossiers exclus
+        excluded_folders = set(excluded_folders)
+        kept = np.array([name not in excluded_folders for name in self.__names], dtype=bool)
+        names = self.__names[kept]
+        split_ids = self.__index["splitId"][kept]
+        if not len(names):
+            return []
+
+        continuous, segment_ids = self.__get_segments(self.__index["trainId"][kept], split_ids)
+
+        # Seuls les segments commençant par un dossier d'indice 0 sont des marches complètes
+        segment_starts = np.flatnonzero(~continuous)
+        segment_ends = np.append(segment_starts[1:], len(names))
+        complete_segments = split_ids[segment_starts] == 0
+
+        dropped_folders = np.count_nonzero(~complete_segments[segment_ids - 1])
+        if dropped_folders:
+            self.__logger.warning("%s parquet folder(s) do not follow a folder of index 0 and will not be merged" %
+                                  dropped_folders)
+
+        return [names[start:end].tolist() for start, end, complete in
+                zip(segment_starts, segment_ends, complete_segments) if complete]
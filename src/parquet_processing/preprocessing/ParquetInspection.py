@@ -0,0 +1,238 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : ParquetInspection.py
+# Description du fichier : classe "ParquetInspection". Inspecte les métadonnées (pied de page) des fichiers .parquet
+#   sans en décoder les données
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import logging as log
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ParquetInspection:
+    """
+    Inspecte les fichiers .parquet en ne lisant que leur pied de page (schéma et métadonnées des groupes de lignes).
+    Le coût d'une inspection est de quelques kilo-octets par fichier, quelle que soit la taille des données.
+    Les méthodes sont statiques et sans état afin de pouvoir être exécutées dans un pool de threads ou de processus.
+    """
+
+    # Nombre magique présent en début et en fin de tout fichier parquet valide
+    PARQUET_MAGIC = b"PAR1"
+
+    # Logging
+    __logger = log.getLogger("ParquetInspection")
+
+    @staticmethod
+    def read_footer(file_path):
+        """
+        Lit le pied de page d'un fichier parquet et en vérifie l'intégrité, sans lire les données.
+
+        L'intégrité est vérifiée par :
+        - la présence du nombre magique "PAR1" en début et en fin de fichier ;
+        - le décodage des métadonnées du pied de page ;
+        - la cohérence entre le nombre de lignes déclaré et celui des groupes de lignes.
+
+        :param file_path: chemin d'accès du fichier parquet
+        :return: pyarrow.parquet.FileMetaData: métadonnées du fichier, None si le pied de page est illisible ou corrompu
+        """
+
+        try:
+            # Vérification des nombres magiques d'en-tête et de fin de fichier
+            with open(file_path, "rb") as parquet_file:
+                header_magic = parquet_file.read(len(ParquetInspection.PARQUET_MAGIC))
+                parquet_file.seek(-len(ParquetInspection.PARQUET_MAGIC), 2)
+                footer_magic = parquet_file.read(len(ParquetInspection.PARQUET_MAGIC))
+
+            if header_magic != ParquetInspection.PARQUET_MAGIC or footer_magic != ParquetInspection.PARQUET_MAGIC:
+                ParquetInspection.__logger.warning("Invalid parquet magic number in \'%s\'" % file_path)
+                return None
+
+            # Lecture des métadonnées du pied de page uniquement
+            metadata = pq.read_metadata(file_path)
+
+        except (OSError, pa.ArrowException) as error:
+            ParquetInspection.__logger.warning("Unable to read parquet footer of \'%s\'. Reason: %s" %
+                                               (file_path, error))
+            return None
+
+        # Le nombre de lignes déclaré doit correspondre à la somme des lignes des groupes de lignes
+        row_group_rows = sum(metadata.row_group(row_group).num_rows for row_group in range(metadata.num_row_groups))
+        if row_group_rows != metadata.num_rows:
+            ParquetInspection.__logger.warning("Inconsistent parquet footer in \'%s\': %s rows declared, %s rows in row "
+                                               "groups" % (file_path, metadata.num_rows, row_group_rows))
+            return None
+
+        return metadata
+
+    @staticmethod
+    def get_missing_columns(metadata, required_columns):
+        """
+        Renvoie les colonnes requises absentes du schéma d'un fichier parquet.
+
+        :param metadata: pyarrow.parquet.FileMetaData, métadonnées du fichier (voir read_footer)
+        :param required_columns: liste des colonnes requises
+        :return: list: colonnes requises manquantes, dans l'ordre de required_columns
+        """
+
+        # Noms des colonnes de premier niveau du schéma arrow
+        available_columns = set(metadata.schema.to_arrow_schema().names)
+
+        return [column for column in required_columns if column not in available_columns]
+
+    @staticmethod
+    def get_row_group_ranges(metadata, column):
+        """
+        Renvoie les valeurs minimale et maximale d'une colonne pour chaque groupe de lignes, d'après les statistiques
+        du pied de page.
+
+        :param metadata: pyarrow.parquet.FileMetaData, métadonnées du fichier (voir read_footer)
+        :param column: nom de la colonne
+        :return: list: tuples (min, max) par groupe de lignes, (None, None) si les statistiques sont absentes
+        """
+
+        # Indice de la colonne dans le schéma parquet
+        names = metadata.schema.names
+        if column not in names:
+            return [(None, None)] * metadata.num_row_groups
+        column_index = names.index(column)
+
+        ranges = []
+        for row_group in range(metadata.num_row_groups):
+            statistics = metadata.row_group(row_group).column(column_index).statistics
+            if statistics is not None and statistics.has_min_max:
+                ranges.append((statistics.min, statistics.max))
+            else:
+                ranges.append((None, None))
+
+        return ranges
+
+    @staticmethod
+    def get_row_group_runs(metadata, column, context_rows=0, tail_rows=0):
+        """
+        Sélectionne, d'après les statistiques du pied de page, les groupes de lignes à lire pour obtenir toutes les
+        lignes dont la colonne est non nulle. Un groupe de lignes dont le minimum et le maximum valent 0 n'est lu que
+        s'il fait partie des context_rows lignes qui précèdent un groupe à lire (calculs sur fenêtre glissante), ou
+        des tail_rows dernières lignes du fichier (reprise du calcul dans le fichier suivant).
+        Un groupe sans statistiques est toujours lu.
+
+        :param metadata: pyarrow.parquet.FileMetaData, métadonnées du fichier (voir read_footer)
+        :param column: nom de la colonne (exemple : numéro de mission)
+        :param context_rows: nombre de lignes précédentes nécessaires au calcul d'une ligne
+        :param tail_rows: nombre de lignes de fin de fichier à lire dans tous les cas
+        :return: list: suites d'indices de groupes de lignes consécutifs à lire, liste vide si aucun groupe n'est à lire
+        """
+
+        row_group_rows = [metadata.row_group(row_group).num_rows for row_group in range(metadata.num_row_groups)]
+
+        # Groupes de lignes contenant au moins une valeur non nulle (ou dont on ne peut rien affirmer)
+        has_data = [not (column_min == 0 and column_max == 0) for column_min, column_max in
+                    ParquetInspection.get_row_group_ranges(metadata, column)]
+
+        # Ajout des groupes de lignes précédents nécessaires au calcul des premières lignes d'un groupe à lire
+        to_read = list(has_data)
+        for row_group in range(metadata.num_row_groups):
+            if has_data[row_group]:
+                previous_group, needed_rows = row_group - 1, context_rows
+                while previous_group >= 0 and needed_rows > 0:
+                    to_read[previous_group] = True
+                    needed_rows -= row_group_rows[previous_group]
+                    previous_group -= 1
+
+        # Ajout des groupes de lignes de fin de fichier
+        previous_group, needed_rows = metadata.num_row_groups - 1, tail_rows
+        while previous_group >= 0 and needed_rows > 0:
+            to_read[previous_group] = True
+            needed_rows -= row_group_rows[previous_group]
+            previous_group -= 1
+
+        # Regroupement en suites de groupes de lignes consécutifs
+        runs = []
+        for row_group in range(metadata.num_row_groups):
+            if to_read[row_group]:
+                if runs and runs[-1][-1] == row_group - 1:
+                    runs[-1].append(row_group)
+                else:
+                    runs.append([row_group])
+
+        return runs
+
+    @staticmethod
+    def get_folder_fingerprint(source_parquet_path, folder):
+        """
+        Renvoie l'empreinte d'un dossier parquet : nom, taille et date de modification de chacun de ses fichiers.
+        Une empreinte inchangée indique que le dossier n'a pas à être inspecté de nouveau.
+
+        :param source_parquet_path: chemin d'accès du dossier "Source" de parquet
+        :param folder: nom du dossier parquet
+        :return: list: liste triée de [nom, taille, date de modification en nanosecondes] par fichier
+        """
+
+        with os.scandir(os.path.join(source_parquet_path, folder)) as entries:
+            return sorted([entry.name, entry.stat().st_size, entry.stat().st_mtime_ns]
+                          for entry in entries if entry.is_file())
+
+    @staticmethod
+    def inspect_folder(source_parquet_path, folder, required_columns):
+        """
+        Relève les informations d'un dossier parquet nécessaires à sa vérification : présence des fichiers, version
+        de configuration du fichier contextuel, intégrité du pied de page et colonnes du fichier "time table".
+        Aucune décision d'exclusion n'est prise ici : la fonction ne dépend que du dossier inspecté et peut donc être
+        exécutée en parallèle sur plusieurs dossiers.
+
+        :param source_parquet_path: chemin d'accès du dossier "Source" de parquet
+        :param folder: nom du dossier parquet à inspecter
+        :param required_columns: liste des colonnes requises dans le fichier TT_IP.parquet
+        :return: dict: informations du dossier
+        """
+
+        folder_path = os.path.join(source_parquet_path, folder)
+        inspection = {"folder": folder}
+
+        # Présence des fichiers "time table" et "contextual"
+        inspection["has_tt"] = os.path.isfile(os.path.join(folder_path, "tt_IP.parquet"))
+        inspection["has_ctxt"] = os.path.isfile(os.path.join(folder_path, "ctxt_IP.parquet"))
+
+        # Liste des fichiers du dossier, pour le signalement des fichiers manquants
+        inspection["files_in_folder"] = []
+        if not (inspection["has_tt"] and inspection["has_ctxt"]):
+            inspection["files_in_folder"] = [f for f in os.listdir(folder_path)
+                                             if os.path.isfile(os.path.join(folder_path, f))]
+
+        # Version de configuration du fichier contextuel (ctxt_IP.parquet)
+        ctxt_file_path = os.path.join(folder_path, "ctxt_IP.parquet")
+        inspection["ctxt_exists"] = os.path.exists(ctxt_file_path)
+        inspection["version"] = None
+        if inspection["ctxt_exists"]:
+            conf_frame = pd.read_parquet(ctxt_file_path, columns=["conf"], engine="auto")
+            inspection["version"] = str(conf_frame._get_value(0, "conf"))
+
+        # Pied de page et colonnes du fichier "time table" (TT_IP.parquet)
+        tt_file_path = os.path.join(folder_path, "TT_IP.parquet")
+        inspection["tt_exists"] = os.path.exists(tt_file_path)
+        inspection["tt_footer_valid"] = False
+        inspection["missing_columns"] = []
+        inspection["num_rows"] = None
+        inspection["time_range"] = [None, None]
+        if inspection["tt_exists"]:
+            tt_metadata = ParquetInspection.read_footer(tt_file_path)
+            if tt_metadata is not None:
+                inspection["tt_footer_valid"] = True
+                inspection["missing_columns"] = ParquetInspection.get_missing_columns(tt_metadata, required_columns)
+                inspection["num_rows"] = tt_metadata.num_rows
+
+                # Plage temporelle des relevés, d'après les statistiques de la colonne "time"
+                time_ranges = [time_range for time_range in ParquetInspection.get_row_group_ranges(tt_metadata, "time")
+                               if None not in time_range]
+                if time_ranges:
+                    inspection["time_range"] = [str(min(time_range[0] for time_range in time_ranges)),
+                                                str(max(time_range[1] for time_range in time_ranges))]
+
+        return inspection
@@ -0,0 +1,139 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : ParquetMerge.py
+# Description du fichier : classe "ParquetMerge". Fusionne des fichiers .parquet par flux de groupes de lignes, sans
+#   copie intermédiaire ni chargement complet des tables en mémoire
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import os
+import shutil as shu
+import pyarrow.parquet as pq
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ParquetMerge:
+    """
+    Fusion de fichiers parquet par flux : chaque groupe de lignes d'un fichier source est lu en place puis ajouté
+    directement au fichier de destination. Au plus un groupe de lignes est présent en mémoire à un instant donné,
+    quelle que soit la longueur de la marche fusionnée.
+    Les méthodes sont statiques et sans état afin de pouvoir être exécutées dans un pool de processus.
+    """
+
+    # Fichiers parquet d'un dossier à fusionner : "time table" et "contextual"
+    PARQUET_FILES = ["tt_IP.parquet", "ctxt_IP.parquet"]
+
+    # Options d'écriture des fichiers fusionnés
+    WRITER_OPTIONS = {"version": "2.6",
+                      "compression": "gzip",
+                      "use_dictionary": True,
+                      "data_page_size": 2097152,
+                      "write_statistics": True}
+
+    @staticmethod
+    def get_merge_folder_name(merge_group):
+        """
+        Renvoie le nom du dossier de destination d'un groupe fusionné, sous la forme
+        "idTrain_dateDebut_heureDebut_0TnbFichiersFusionnés" où :
+        - idTrain : identifiant du train (ex : z5500503) ;
+        - dateDebut, heureDebut : date et heure du premier dossier du groupe ;
+        - 0TnbFichiersFusionnés : à lire "0 To n", où n est l'indice du dernier dossier fusionné.
+
+        :param merge_group: liste des dossiers du groupe, dans l'ordre de la marche
+        :return: str: nom du dossier de destination
+        """
+
+        first_folder = merge_group[0]
+
+        return first_folder[0:8] + "_" + first_folder[9:17] + "_" + first_folder[18:24] + "_0T" + \
+            str(len(merge_group) - 1)
+
+    @staticmethod
+    def stream_files(source_file_paths, target_file_path):
+        """
+        Concatène des fichiers parquet de même schéma dans un fichier de destination, groupe de lignes par groupe de
+        lignes. Le schéma de destination est celui du premier fichier source ; un fichier de schéma différent lève
+        une exception de pyarrow.
+
+        :param source_file_paths: chemins d'accès des fichiers à concaténer, dans l'ordre
+        :param target_file_path: chemin d'accès du fichier de destination
+        :return: int: nombre de lignes écrites
+        """
+
+        nb_rows = 0
+        schema = pq.read_schema(source_file_paths[0])
+
+        with pq.ParquetWriter(target_file_path, schema, **ParquetMerge.WRITER_OPTIONS) as writer:
+            for source_file_path in source_file_paths:
+                with pq.ParquetFile(source_file_path) as source_file:
+                    for row_group in range(source_file.num_row_groups):
+                        # Seul le groupe de lignes courant est décodé
+                        row_group_table = source_file.read_row_group(row_group)
+                        writer.write_table(row_group_table)
+                        nb_rows += row_group_table.num_rows
+                        del row_group_table
+
+        return nb_rows
+
+    @staticmethod
+    def merge_group(source_parquet_path, merge_group, target_folder_path):
+        """
+        Fusionne les fichiers "time table" et "contextual" des dossiers d'un groupe dans un dossier de destination.
+        Un groupe d'un seul dossier est simplement copié depuis le dossier "Source".
+
+        :param source_parquet_path: chemin d'accès du dossier "Source" de parquet
+        :param merge_group: liste des dossiers du groupe, dans l'ordre de la marche
+        :param target_folder_path: chemin d'accès du dossier de destination, existant
+        """
+
+        for file_name in ParquetMerge.PARQUET_FILES:
+            source_file_paths = [os.path.join(source_parquet_path, folder, file_name) for folder in merge_group]
+            target_file_path = os.path.join(target_folder_path, file_name)
+
+            if len(source_file_paths) >= 2:
+                ParquetMerge.stream_files(source_file_paths, target_file_path)
+            else:
+                shu.copy(source_file_paths[0], target_file_path)
+
+    @staticmethod
+    def merge_group_to_folder(source_parquet_path, scratch_path, edited_parquet_path, merge_group):
+        """
+        Fusionne un groupe de dossiers dans son propre dossier de travail, puis renomme ce dossier vers le dossier
+        "Edited". Chaque groupe disposant d'un dossier de travail isolé, plusieurs groupes peuvent être fusionnés en
+        parallèle ; le renommage garantit qu'un dossier fusionné n'est jamais visible incomplet dans "Edited".
+        Le dossier de travail doit se trouver sur le même système de fichiers que le dossier "Edited".
+
+        :param source_parquet_path: chemin d'accès du dossier "Source" de parquet
+        :param scratch_path: chemin d'accès du dossier de travail de fusion
+        :param edited_parquet_path: chemin d'accès du dossier "Edited" de parquet
+        :param merge_group: liste des dossiers du groupe, dans l'ordre de la marche
+        :return: tuple: (nom du dossier fusionné, message d'erreur ou None si la fusion a réussi)
+        """
+
+        merge_folder_name = ParquetMerge.get_merge_folder_name(merge_group)
+        scratch_folder_path = os.path.join(scratch_path, merge_folder_name)
+        replaced_folder_path = os.path.join(scratch_path, merge_folder_name + ".replaced")
+        target_folder_path = os.path.join(edited_parquet_path, merge_folder_name)
+
+        try:
+            # Dossier de travail propre au groupe
+            shu.rmtree(scratch_folder_path, ignore_errors=True)
+            os.makedirs(scratch_folder_path)
+
+            ParquetMerge.merge_group(source_parquet_path, merge_group, scratch_folder_path)
+
+            # Un dossier fusionné lors d'une exécution précédente est mis de côté avant le renommage, puis supprimé
+            if os.path.isdir(target_folder_path):
+                shu.rmtree(replaced_folder_path, ignore_errors=True)
+                os.replace(target_folder_path, replaced_folder_path)
+            os.replace(scratch_folder_path, target_folder_path)
+            shu.rmtree(replaced_folder_path, ignore_errors=True)
+
+        except Exception as error:
+            shu.rmtree(scratch_folder_path, ignore_errors=True)
+            return merge_folder_name, str(error)
+
+        return merge_folder_name, None
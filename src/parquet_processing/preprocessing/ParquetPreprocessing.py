@@ -2,7 +2,7 @@
 # Nom du fichier : ParquetPreprocessing.py
 # Description du fichier : classe "Parquet". Effectue le traitement des fichiers .parquet
 # Date de création : 14/11/2022
-# Date de mise à jour : 15/11/2022
+# Date de mise à jour : 18/10/2026
 # Créé par : Rémy EVRARD
 # ----------------------------------------------------------------------------------------------------------------------
 
@@ -10,20 +10,23 @@
 # Imports des libraries
 import logging as log
 import os
-from os import listdir
-from os.path import isfile, join
-import shutil as shu
-import pandas as pd
 import sys
 from progress.bar import IncrementalBar
-import pyarrow.parquet as pq
+import pyarrow as pa
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 # ----------------------------------------------------------------------------------------------------------------------
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Imports des classes
 from core.paths.ProjectRootPath import ProjectRootPath
 from parquet_processing.preprocessing.ExclusionList import ExclusionList
+from parquet_processing.preprocessing.ParquetInspection import ParquetInspection
+from parquet_processing.preprocessing.InspectionManifest import InspectionManifest
+from parquet_processing.preprocessing.ParquetFolderIndex import ParquetFolderIndex
+from parquet_processing.preprocessing.ParquetMerge import ParquetMerge
+from parquet_processing.preprocessing.ParquetDataset import ParquetDataset
 from core.paths.Paths import Paths
 from core.Constants import Constants
 # ----------------------------------------------------------------------------------------------------------------------
@@ -34,7 +37,11 @@ class ParquetPreprocessing:
     Effectue le traitement des fichiers .parquet
     """
 
-    def __init__(self, check_files=True, merge_parquet=False):
+    def __init__(self, check_files=True, merge_parquet=False,
+                 inspection_workers=Constants.PARQUET_INSPECTION_WORKERS,
+                 merge_workers=Constants.PARQUET_MERGE_WORKERS, write_dataset=False,
+                 dataset_compression=Constants.PARQUET_DATASET_COMPRESSION,
+                 dataset_row_group_size=Constants.PARQUET_DATASET_ROW_GROUP_SIZE):
         # Logging
         self.__logger = log.getLogger("ParquetPreprocessing")
 
@@ -50,17 +57,23 @@ class ParquetPreprocessing:
         # Fichier de liste d'exclusion des dossiers parquet initiaux à ne pas retenir
         self.__parquet_exclusion_path = self.__paths.get_path(
             "parquet_exclusion")
-        # Dossiers des fichiers parquet cachés
-        self.__hidden_temp_merge_folder_path = self.__paths.get_path(
+        # Chemin d'accès du jeu de données parquet partitionné par rame et par date
+        self.__dataset_path = self.__paths.get_path("Dataset")
+        # Dossier de travail de fusion, sur le même système de fichiers que le dossier "Edited"
+        self.__temp_merge_folder_path = self.__paths.get_path(
             "Temp_parquet_merge")
-        self.__hidden_temp_merge_tt_folder_path = self.__paths.get_path(
-            "Temp_TT")
-        self.__hidden_temp_merge_ctxt_folder_path = self.__paths.get_path(
-            "Temp_CTXT")
 
         # Liste des dossiers parquet dans le dossier Source
         self.__parquet_folder_list = self.__paths.get_source_folder_list()
 
+        # Nombre de threads d'inspection des dossiers parquet (1 : inspection séquentielle)
+        self.__inspection_workers = max(1, int(inspection_workers))
+        # Nombre de processus de fusion des groupes de dossiers parquet (1 : fusion séquentielle)
+        self.__merge_workers = max(1, int(merge_workers))
+        # Codec de compression et taille des groupes de lignes du jeu de données partitionné
+        self.__dataset_compression = dataset_compression
+        self.__dataset_row_group_size = int(dataset_row_group_size)
+
         # Statut de vérification des fichiers
         check_files_executed = False
 
@@ -69,15 +82,19 @@ class ParquetPreprocessing:
             self.__check_files()
             check_files_executed = True
 
-        # FONCTIONNALITÉ DÉSACTIVÉE
         # Demande de fusion des dossiers parquets
-        """
         if merge_parquet:
-             # Une vérification des fichiers est nécessaire avant la fusion
+            # Une vérification des fichiers est nécessaire avant la fusion
             if not check_files_executed:
                 self.__check_files()
             self.__merge()
-        """
+
+        # Demande d'écriture du jeu de données partitionné par rame et par date
+        if write_dataset:
+            # Une vérification des fichiers est nécessaire avant l'écriture
+            if not check_files_executed:
+                self.__check_files()
+            self.__write_dataset()
 
     def __check_files(self):
         """
@@ -125,97 +142,65 @@ class ParquetPreprocessing:
 
         # Il existe des dossiers à analyser
         else:
-            # Barre de progression
-            progress_bar = IncrementalBar(
-                'Checking parquet files', max=len(self.__parquet_folder_list))
+            # Inspection des dossiers (fichiers présents, version, pied de page du fichier TT_IP.parquet).
+            # Les inspections sont indépendantes et peuvent être parallélisées ; les décisions d'exclusion, qui
+            # dépendent du dossier précédent (continuité), sont ensuite prises dans l'ordre de l'index des dossiers
+            # Les empreintes des dossiers sont enregistrées avec leurs exclusions
+            folder_inspections, folder_fingerprints = self.__inspect_folders(self.__parquet_folder_list)
 
-            # Lit les informations de chaque dossier de données parquet
-            for folder in self.__parquet_folder_list:
-                # Indice du dossier dans la liste
-                folder_index_in_list = self.__parquet_folder_list.index(folder)
+            # Index des dossiers, triés par (rame, date, heure, indice de séparation)
+            folder_index = ParquetFolderIndex(self.__parquet_folder_list)
+            indexed_folders = folder_index.get_folders()
 
-                # Raccourci de nommage des dossiers actuel et précédent
-                current_folder_parquet_list = self.__parquet_folder_list[folder_index_in_list]
-                previous_folder_parquet_list = self.__parquet_folder_list[folder_index_in_list - 1]
+            # Dossiers dont le nom ne respecte pas le format attendu
+            for folder in folder_index.get_invalid_folders():
+                exclusion_list.add_folder(folder, "folder name", fingerprint=folder_fingerprints[folder])
 
-                # Récupère les informations des dossiers actuel et précédent en décomposant leurs noms
+            # 1- continuité
+            # Calcul vectorisé des ruptures de continuité et des dossiers qui les prolongent
+            continuity_breaks, continuity_excluded = folder_index.get_continuity()
+            train_ids = folder_index.get_column("trainId")
+
+            # Barre de progression
+            progress_bar = IncrementalBar(
+                'Checking parquet files', max=len(indexed_folders))
+
+            # Lit les informations de chaque dossier de données parquet, dans l'ordre de l'index
+            for folder_index_in_list, folder in enumerate(indexed_folders):
+                # Récupère les informations du dossier actuel
                 # [trainId: value, date: value, time: value, splitId: value, file_name: value]
-                current_folder_description = self.__paths.get_parquet_folder_information(
-                    current_folder_parquet_list)
-                # Les informations du dossier précédent ne peuvent être traitées qu'à partir du second dossier
-                if folder_index_in_list > 0:
-                    previous_folder_description = self.__paths.get_parquet_folder_information(
-                        previous_folder_parquet_list)
-
-                # Vérification de la continuité du nommage des dossiers
-                # Si on est sur le premier dossier de la liste
-                if folder_index_in_list == 0:
-                    # Vérifie que le nom du dossier se termine par 0, permettant de relever une erreur de dossier
-                    # parquet manquant
-                    if current_folder_description["splitId"] == "0":
-                        # 2- présence des fichiers
-                        # Vérification du contenu du dossier
-                        if not self.__check_folder_content(current_folder_description["fileName"]):
-                            exclusion_list.add_folder(
-                                current_folder_description["fileName"], "missing file(s)")
+                current_folder_description = self.__paths.get_parquet_folder_information(folder)
+                # Informations relevées lors de l'inspection du dossier actuel
+                current_folder_inspection = folder_inspections[folder]
 
-                    # 1- continuité
-                    else:
-                        excepted_folder_name = current_folder_description["fileName"][:-1] + "0"
+                # 1- continuité
+                if continuity_excluded[folder_index_in_list]:
+                    # Rupture de continuité sur le premier dossier d'une rame
+                    if continuity_breaks[folder_index_in_list] and (
+                            folder_index_in_list == 0 or
+                            train_ids[folder_index_in_list] != train_ids[folder_index_in_list - 1]):
+                        excepted_folder_name = folder.rsplit("_", 1)[0] + "_0"
                         self.__logger.warning(
                             "The first Parquet data folder does not correspond to the first reading for the running "
                             "of the train. This folder should be named \'" + excepted_folder_name +
-                            "\' however it is named \'" + current_folder_description["fileName"] + "\'")
-                        exclusion_list.add_folder(
-                            current_folder_description["fileName"], "continuity")
-
-                # Sinon, on n'est pas sur le premier dossier de la liste
-                elif folder_index_in_list > 0:
-                    # Si le dossier suivant est une suite de relevée incrémentée du dossier précédent
-                    # ou que le dossier précédent a un identifiant de séparation >= 0 et que le dossier actuel a un
-                    # identifiant égal à zéro (suggérant une nouvelle série)
-                    if int(current_folder_description["splitId"]) == (int(previous_folder_description["splitId"]) + 1)\
-                            or (int(previous_folder_description["splitId"]) >= 0 and
-                                int(current_folder_description["splitId"])
-                                == 0):
-                        # On est sur une suite de dossier de la même marche
-                        if not self.__check_folder_content(current_folder_description["fileName"]):
-                            exclusion_list.add_folder(
-                                current_folder_description["fileName"], "missing file(s)")
+                            "\' however it is named \'" + folder + "\'")
 
-                    # 1- continuité
-                    else:
+                    # Rupture de continuité entre deux dossiers d'une même rame
+                    elif continuity_breaks[folder_index_in_list]:
                         self.__logger.warning(
                             "Error in continuity of parquet data folder names. Check the logical continuity of "
-                            "index between \'" + previous_folder_description["fileName"] + "\' and \'" +
-                            current_folder_description["fileName"] + "\'")
-
-                        # Ajout du dossier problématique et de ses potentiels suivants à la liste d'exclusion
-                        # Exemple : si on a A_1, suvi par B_1 et C_2 alors B_1 et C_2 seront ajoutés à la liste
-                        # d'exclusion
-                        # Pour ce faire, on ajoute le dossier problématique à la liste d'exclusion et lorsque
-                        # la boucle for passera au dossier suivant, elle vérifiera si le dossier précédent
-                        # de la liste a été exclu pour la raison d'exclusion de continuité
-                        exclusion_list.add_folder(
-                            current_folder_description["fileName"], "continuity")
+                            "index between \'" + indexed_folders[folder_index_in_list - 1] + "\' and \'" +
+                            folder + "\'")
 
-                # 1- continuité
-                # Si le dossier précédent a été exclu pour raison de continuité de nom et que le dossier
-                # actuel est une suite du dossier precedent (par son indice) alors il est ajouté à la liste d'exclusion
-                # Si le dossier précédent se trouve dans la liste d'exclusion (applicable à partir du deuxième dossier)
-                if folder_index_in_list > 0:
-                    if previous_folder_description["fileName"] in exclusion_list.get_excluded():
-                        # Chaîne symbolisant une exclusion du dossier précédent
-                        exclusion_previous_folder_continuity_str = previous_folder_description["fileName"] + ": " + \
-                            "continuity"
-
-                        # Si le dossier précédent a été exclu pour continuité et que l'indice du dossier actuel
-                        # est le suivant logique du dossier précédent exclu, alors on exclut le dossier actuel.
-                        if exclusion_previous_folder_continuity_str in exclusion_list.get_excluded() and (
-                                int(previous_folder_description["splitId"]) - 1) == \
-                                int(current_folder_description["splitId"]):
-                            exclusion_list.add_folder(
-                                current_folder_description["fileName"], "continuity")
+                    # Ajout du dossier problématique et de ses suivants à la liste d'exclusion
+                    # Exemple : si on a A_1, suivi par B_1 et C_2 alors B_1 et C_2 sont ajoutés à la liste
+                    # d'exclusion
+                    exclusion_list.add_folder(folder, "continuity", fingerprint=folder_fingerprints[folder])
+
+                # 2- présence des fichiers
+                # On est sur une suite de dossier de la même marche, ou sur le début d'une nouvelle marche
+                elif not self.__check_folder_content(current_folder_inspection):
+                    exclusion_list.add_folder(folder, "missing file(s)", fingerprint=folder_fingerprints[folder])
 
                 # 3- version
                 # Vérification de la version de configuration dans le fichier contextuel (ctxt_IP.parquet)
@@ -223,42 +208,39 @@ class ParquetPreprocessing:
                 # traite bien des données des WC.
                 # Si le dossier contient bien l'ensemble des fichiers parquet
                 if not exclusion_list.check_folder(current_folder_description["fileName"], "missing file(s)"):
-                    # Chemin d'accès du fichier de contexte
-                    ctxt_file_path = os.path.join(self.__source_parquet_path, current_folder_description["fileName"],
-                                                  "ctxt_IP.parquet")
-
-                    if os.path.exists(ctxt_file_path):
-                        # Extraction dans un dataframe pandas et lecture de ce dataframe
-                        conf_frame = pd.read_parquet(ctxt_file_path, columns=[
-                                                     "conf"], engine="auto")
-                        version = conf_frame._get_value(0, "conf")
-
-                        if version != "v1.0.0.91":
+                    if current_folder_inspection["ctxt_exists"]:
+                        if current_folder_inspection["version"] != "v1.0.0.91":
                             exclusion_list.add_folder(
-                                current_folder_description["fileName"], "version")
+                                current_folder_description["fileName"], "version",
+                                fingerprint=folder_fingerprints[folder])
 
                     else:
                         exclusion_list.add_folder(
-                            current_folder_description["fileName"], "missing file(s)")
+                            current_folder_description["fileName"], "missing file(s)",
+                            fingerprint=folder_fingerprints[folder])
                         self.__logger.warning(
                             "Missing file(s) in \'" + current_folder_description["fileName"] + "\'")
 
                 # 4- présence de toutes les colonnes requises pour l'étude
                 # Si le dossier contient bien l'ensemble des fichiers parquet
                 if not exclusion_list.check_folder(current_folder_description["fileName"], "missing file(s)"):
-                    # Chemin d'accès du fichier TT_IP.parquet
-                    tt_file_path = os.path.join(self.__source_parquet_path, current_folder_description["fileName"],
-                                                "TT_IP.parquet")
+                    if current_folder_inspection["tt_exists"]:
+                        # Le pied de page du fichier TT_IP.parquet est illisible ou corrompu
+                        if not current_folder_inspection["tt_footer_valid"]:
+                            exclusion_list.add_folder(
+                                current_folder_description["fileName"], "corrupted file",
+                                fingerprint=folder_fingerprints[folder])
 
-                    if os.path.exists(tt_file_path):
                         # Vérifie si toutes les colonnes requises sont présentes dans le fichier TT_IP.parquet
-                        if not self.__check_columns(tt_file_path, Constants.PARQUET_KEPT_COL):
+                        elif current_folder_inspection["missing_columns"]:
                             exclusion_list.add_folder(
-                                current_folder_description["fileName"], "missing column(s)")
+                                current_folder_description["fileName"], "missing column(s)",
+                                fingerprint=folder_fingerprints[folder])
 
                     else:
                         exclusion_list.add_folder(
-                            current_folder_description["fileName"], "missing file(s)")
+                            current_folder_description["fileName"], "missing file(s)",
+                            fingerprint=folder_fingerprints[folder])
                         self.__logger.warning(
                             "Missing file(s) in \'" + current_folder_description["fileName"] + "\'")
 
@@ -266,6 +248,9 @@ class ParquetPreprocessing:
                 progress_bar.next()
             # reset_progress_bar_position()
 
+        # Écriture de la liste d'exclusion et fermeture de la base des exclusions
+        exclusion_list.close()
+
         # Récupération du nombre de dossiers supprimés
         nb_excluded_folder = exclusion_list.get_nb_excluded_folder()
 
@@ -278,31 +263,80 @@ class ParquetPreprocessing:
         self.__logger.info("Parquet folders inspection completed in %s seconds. %s folders out of %s were excluded" %
                            (elapsed_time, nb_excluded_folder, len(self.__parquet_folder_list)))
 
-    def __check_folder_content(self, parquet_folder):
+    def __inspect_folders(self, parquet_folder_list):
+        """
+        Inspecte les dossiers parquet, en parallèle si plusieurs threads d'inspection sont configurés.
+        L'inspection est principalement constituée d'accès disque, pendant lesquels le GIL est relâché.
+        Seuls les dossiers nouveaux ou modifiés depuis la dernière exécution sont ouverts : les autres sont repris du
+        manifeste des inspections.
+
+        :param parquet_folder_list: liste des dossiers parquet à inspecter
+        :return: tuple: informations d'inspection (voir ParquetInspection.inspect_folder) et empreintes (voir
+        ParquetInspection.get_folder_fingerprint), par nom de dossier
+        """
+
+        # Manifeste des inspections précédentes
+        manifest = InspectionManifest(Constants.PARQUET_KEPT_COL)
+
+        # Fonctions d'empreinte et d'inspection d'un dossier
+        fingerprint = partial(ParquetInspection.get_folder_fingerprint, self.__source_parquet_path)
+        inspect = partial(ParquetInspection.inspect_folder, self.__source_parquet_path,
+                          required_columns=Constants.PARQUET_KEPT_COL)
+
+        # Inspection séquentielle
+        if self.__inspection_workers == 1:
+            executor = None
+            parallel_map = map
+
+        # Inspection parallèle ; map conserve l'ordre de la liste des dossiers
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.__inspection_workers)
+            parallel_map = executor.map
+
+        try:
+            # Empreinte de chaque dossier (tailles et dates de modification des fichiers)
+            folder_fingerprints = dict(zip(parquet_folder_list, parallel_map(fingerprint, parquet_folder_list)))
+
+            # Reprise des inspections des dossiers inchangés
+            folder_inspections = {folder: manifest.get_inspection(folder, folder_fingerprints[folder])
+                                  for folder in parquet_folder_list}
+
+            # Inspection des dossiers nouveaux ou modifiés
+            folders_to_inspect = [folder for folder in parquet_folder_list if folder_inspections[folder] is None]
+            for folder, inspection in zip(folders_to_inspect, parallel_map(inspect, folders_to_inspect)):
+                folder_inspections[folder] = inspection
+                manifest.set_inspection(folder, folder_fingerprints[folder], inspection)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Mise à jour du manifeste
+        manifest.prune(parquet_folder_list)
+        manifest.save()
+
+        self.__logger.info("%s parquet folders inspected, %s reused from the inspection manifest" %
+                           (len(folders_to_inspect), len(parquet_folder_list) - len(folders_to_inspect)))
+
+        return folder_inspections, folder_fingerprints
+
+    def __check_folder_content(self, folder_inspection):
         """
         Indique si le fichier "contextual" et "time table" sont bien présents dans un dossier de fichiers parquet
-        :param parquet_folder: chemin du dossier parquer dont le contenu est à analyser
+        :param folder_inspection: informations d'inspection du dossier parquet (voir ParquetInspection.inspect_folder)
         :return: bool: Vrai si tous les fichiers sont présents, Faux s'il manque un ou plusieurs fichiers
         """
 
-        # Définition des paths des fichiers à vérifier
-        tt_parquet_file_path = os.path.join(
-            self.__source_parquet_path, parquet_folder, "tt_IP.parquet")
-        ctxt_parquet_file_path = os.path.join(
-            self.__source_parquet_path, parquet_folder, "ctxt_IP.parquet")
+        # Nom du dossier
+        parquet_folder = folder_inspection["folder"]
 
         # L'ensemble des fichiers attendus sont présents
-        if os.path.isfile(tt_parquet_file_path) and os.path.isfile(ctxt_parquet_file_path):
+        if folder_inspection["has_tt"] and folder_inspection["has_ctxt"]:
             return True
 
         # Un ou plusieurs fichiers sont manquants
         else:
-            path_error_folder = os.path.join(
-                self.__source_parquet_path, parquet_folder)
-
-            # Récupération des fichiers dans le dossier
-            files_in_folder = [f for f in listdir(
-                path_error_folder) if isfile(join(path_error_folder, f))]
+            # Fichiers présents dans le dossier
+            files_in_folder = folder_inspection["files_in_folder"]
 
             # Dossier vide
             if not files_in_folder:
@@ -320,24 +354,6 @@ class ParquetPreprocessing:
                         "Missing \'ctxt_IP.parquet\' parquet file in \'" + parquet_folder + "\'")
                 return False
 
-    def __check_columns(self, tt_file_path, required_columns=Constants.PARQUET_KEPT_COL):
-        """
-        Vérifie si toutes les colonnes requises pour l'étude sont présentes dans le fichier TT_IP.parquet.
-
-        :param tt_file_path: Chemin du fichier TT_IP.parquet
-        :param required_columns: Liste des colonnes requises pour l'étude
-        :return: Booléen indiquant si toutes les colonnes requises sont présentes
-        """
-        # Extraction dans un dataframe pandas et lecture de ce dataframe
-        tt_frame = pd.read_parquet(tt_file_path, engine="auto")
-
-        # Vérifie si chaque colonne requise est présente dans le dataframe
-        for column in required_columns:
-            if column not in tt_frame.columns:
-                return False
-
-        return True
-
     def __merge(self):
         """
         Fusion des fichiers parquets pour lesquels il y a suite dans l'envoi des informations (soit pour une marche
@@ -347,57 +363,19 @@ class ParquetPreprocessing:
         # Début de mesure de temps écoulé
         start_time = time.time()
 
-        # Liste des dossiers à fusionner
-        merge_folder_list = []
-
         # Récupère le nom des dossiers exclus dans le dossier de données
         exclusion_list = ExclusionList(create_file=False)
 
-        # Création de la liste des dossiers non-exclus
-        parquet_folder_list = exclusion_list.get_not_excluded()
-
-        # Lit le nom/informations de chaque dossier de données parquet
-        for folder in parquet_folder_list:
-            # Indice du dossier dans la liste
-            folder_index_in_list = parquet_folder_list.index(folder)
-
-            # Raccourci de nommage des dossiers actuel et précédent
-            current_folder_parquet_list = parquet_folder_list[folder_index_in_list]
-            previous_folder_parquet_list = parquet_folder_list[folder_index_in_list - 1]
-
-            # Récupère les informations des dossiers actuel et précédent en décomposant leurs noms
-            current_folder_description = self.__paths.get_parquet_folder_information(
-                current_folder_parquet_list)
-            # Les informations du dossier précédent ne peuvent être traitées qu'à partir du second dossier
-            if folder_index_in_list > 0:
-                previous_folder_description = self.__paths.get_parquet_folder_information(
-                    previous_folder_parquet_list)
-
-            # Constitution des groupes de dossier à merger
-            if folder_index_in_list == 0:
-                # Le premier dossier de relevé est potentiellement à merger avec les suivants, on le met alors dans une
-                # liste
-                merge_folder_list.append([])
-                merge_folder_list[0].append(current_folder_parquet_list)
-
-            # Sinon, on n'est pas sur le premier dossier
-            else:
-                # Si le dossier suivant est une suite de relevée incrémentée du dossier précédent
-                if int(current_folder_description["splitId"]) == (int(previous_folder_description["splitId"]) + 1):
-                    # Rajoute le dossier à la sous-liste des parquets à merger
-                    merge_folder_list[len(
-                        merge_folder_list) - 1].append(current_folder_description["fileName"])
-
-                # Sinon si l'indice de relevé revient à 0 on est alors sur un nouveau relevé
-                elif int(current_folder_description["splitId"]) == 0:
-                    # Inscrit le nom du nouveau groupe à merger dans une nouvelle section à merger
-                    merge_folder_list.append([])
-                    # Ajoute le dossier dans sa liste à merger
-                    merge_folder_list[len(
-                        merge_folder_list) - 1].append(current_folder_description["fileName"])
-
-        # Initialisation des dossiers temporaires de fusion
-        self.__init_hidden_merge_folders()
+        # Index des dossiers, triés par (rame, date, heure, indice de séparation)
+        folder_index = ParquetFolderIndex(self.__paths.get_source_folder_list())
+
+        # Constitution des groupes de dossier à merger : chaque groupe commence par un dossier d'indice 0 et se poursuit
+        # par les dossiers non-exclus d'indices consécutifs
+        merge_folder_list = folder_index.get_merge_groups(exclusion_list.get_excluded())
+
+        # Dossier de travail de fusion : chaque groupe y dispose de son propre sous-dossier
+        self.__paths.delete_folder([self.__temp_merge_folder_path])
+        self.__paths.create_folder([self.__temp_merge_folder_path])
 
         # Barre de progression des opérations de fusion
         progress_bar = IncrementalBar(
@@ -406,153 +384,51 @@ class ParquetPreprocessing:
         # Nombre de dossiers après fusion
         nb_merged_folder = 0
 
-        # Opération de fusion
-        for merge_group in merge_folder_list:
-            # Indice d'accès des groupes à merger
-            merge_group_index = merge_folder_list.index(merge_group)
-            # Raccourci de nommage du dossier pointé par l'indice
-            merge_folder = merge_folder_list[merge_group_index]
-
-            # Détermination du chemin d'accès des fichiers à merger par groupe
-            for file in merge_folder:
-                # Indice du fichier dans le groupe à merger
-                file_index_in_group = merge_group.index(file)
-
-                # Chemin d'accès initial du fichier "time table" à merger
-                initial_tt_file_source_path = os.path.join(self.__source_parquet_path,
-                                                           merge_folder[file_index_in_group], "tt_IP.parquet")
-                # Chemin d'accès initial du fichier "contextual" à merger
-                initial_ctxt_file_source_path = os.path.join(self.__source_parquet_path,
-                                                             merge_folder[file_index_in_group], "ctxt_IP.parquet")
-
-                # Chemin d'accès de destination du fichier "time table" lors de sa copie vers le dossier de merge des
-                # fichiers "tt" On rajoute un identifiant unique "_i" à la fin du nom du fichier pour le
-                # différencier des autres et ne pas écraser le fichier tt "_i" lors de la copie du
-                # fichier tt "_i+1" Exemple :
-                # "./python_project/Data/Parquet/.Temp_parquet_merge/TT/tt_IP_1.parquet"
-                initial_tt_file_dest_path = os.path.join(self.__hidden_temp_merge_tt_folder_path,
-                                                         ("tt_IP_" + str(file_index_in_group) + ".parquet"))
-                # Idem pour les fichiers ctxt
-                initial_ctxt_file_dest_path = os.path.join(self.__hidden_temp_merge_ctxt_folder_path,
-                                                           ("ctxt_IP_" + str(file_index_in_group) + ".parquet"))
-
-                # Déplace les fichiers vers le répertoire caché de merge
-                shu.copy(initial_tt_file_source_path,
-                         initial_tt_file_dest_path)
-                shu.copy(initial_ctxt_file_source_path,
-                         initial_ctxt_file_dest_path)
-
-            # Liste des chemins d'accès des fichiers tt et ctxt à fusionner
-            input_merge_path = [
-                self.__hidden_temp_merge_tt_folder_path, self.__hidden_temp_merge_ctxt_folder_path]
-
-            # Concaténation du nom du dossier de destination. Nom du dossier contenant les deux parquets fusionnés sous
-            # forme "idTrain_dateDebut_heureDebut_0TnbFichiersFusionnés" où : idTrain : identifiant du train
-            # (ex : z5500503)
-            # dateDebut : date du premier dossier des relevés de parquet initial heureDebut : heure du premier dossier
-            # des relevés de parquet initial 0TnbFichiersFusionnés : à lire "0 To n", où n correspond au nombre
-            # de fichiers parquet fusionnés dans ce dossier On constitue ainsi le nom du dossier de fichiers fusionnés
-            merge_folder_dest = merge_folder[0][0:8] + "_" + merge_folder[0][9:17] + \
-                "_" + merge_folder[0][18:24] + \
-                "_0T" + str(len(merge_folder) - 1)
-
-            # On constitue alors le path de destination de ces fichiers
-            merge_folder_destPath = os.path.join(
-                self.__edited_parquet_path, merge_folder_dest)
-
-            # Création du dossier si celui-ci n'existe pas
-            self.__paths.create_folder([merge_folder_destPath])
-
-            # Chemin d'écriture des fichiers fusionnés
-            target_merge_path = [os.path.join(merge_folder_destPath, "tt_IP.parquet"),
-                                 os.path.join(merge_folder_destPath, "ctxt_IP.parquet")]
-
-            # Fusion des fichiers tt et ctxt depuis le dossier source vers le dossier de destination
-            # Si le groupe à fusionner contient au moins deux fichiers, la fusion doit s'opérer
-            if len(merge_folder) >= 2:
-                for parquet_file_type in range(len(input_merge_path)):
-                    try:
-                        files_to_merge = []
-
-                        # Raccourci du nom du chemin d'accès à fusionner
-                        input_path = input_merge_path[parquet_file_type]
-                        target_path = target_merge_path[parquet_file_type]
-
-                        # Fusion des fichiers
-                        for file_name in os.listdir(input_path):
-                            files_to_merge.append(pq.read_table(
-                                os.path.join(input_path, file_name)))
-
-                        with pq.ParquetWriter(target_path, files_to_merge[0].schema, version='2.6',
-                                              compression='gzip',
-                                              use_dictionary=True,
-                                              data_page_size=2097152, write_statistics=True) as writer:
-                            for f in files_to_merge:
-                                writer.write_table(f)
-
-                    except Exception as error:
-                        # Ajoute le dossier à la liste d'exclusion
-                        exclusion_list.add_folder(
-                            current_folder_description["fileName"], "schema")
+        # Fusion d'un groupe dans son dossier de travail, puis renommage vers le dossier "Edited"
+        merge = partial(ParquetMerge.merge_group_to_folder, self.__source_parquet_path,
+                        self.__temp_merge_folder_path, self.__edited_parquet_path)
 
-                        # Supprime le dossier de destination des parquets fusionnés s'il existe
-                        self.__paths.delete_folder([merge_folder_destPath])
+        # Fusion séquentielle
+        if self.__merge_workers == 1 or len(merge_folder_list) <= 1:
+            executor = None
+            parallel_map = map
 
-                        # Signale l'erreur
-                        self.__logger.error(
-                            "Failed to merge files to \'%s\'. Reason: %s" % (merge_folder_dest, error))
+        # Fusion parallèle : les groupes sont indépendants ; map conserve l'ordre des groupes
+        else:
+            executor = ProcessPoolExecutor(max_workers=min(self.__merge_workers, len(merge_folder_list)))
+            parallel_map = executor.map
 
-                        # Décrément du nombre de dossiers fusionnés, l'opération ayant échoué (pour ne pas compter avec
-                        # le "+1" ci-après)
-                        nb_merged_folder -= 1
+        try:
+            # Opération de fusion
+            for merge_folder, (merge_folder_dest, error) in zip(merge_folder_list,
+                                                                parallel_map(merge, merge_folder_list)):
+                # Incrément du nombre de dossiers fusionnés
+                if error is None:
+                    nb_merged_folder += 1
 
-            # Sinon, le groupe est constitué d'un element, dans ce cas une simple copie des fichiers est nécessaire
-            else:
-                for parquet_file_type in range(len(input_merge_path)):
-                    # Raccourci du nom du chemin d'accès à fusionner (pareil que précedemment)
-                    input_path = input_merge_path[parquet_file_type]
-                    target_path = target_merge_path[parquet_file_type]
-
-                    # Path exact du fichier parquet ctxt ou tt
-                    file_name = os.listdir(input_path)
-                    input_file_path = os.path.join(input_path, file_name[0])
-
-                    try:
-                        # Copie du fichier
-                        shu.copy(input_file_path, target_path)
-
-                    except Exception as error:
-                        self.__logger.error(
-                            "Failed to copy independant parquet file during merge operation from \'%s\' to \'%s\'. "
-                            "Reason: %s" % (
-                                input_file_path, target_path, error))
-
-            # Incrément du nombre de dossiers fusionnés
-            nb_merged_folder += 1
-
-            # Supprime le contenu des dossiers cachés pour ne pas fusionner des fichiers parasites avec
-            # les bonnes données
-            # Permet de basculer entre les fichiers tt et ctxt
-            for file_type_path in input_merge_path:
-                # Liste les fichiers dans les dossiers tt et ctxt et les supprime un à un
-                for file_name in os.listdir(file_type_path):
-                    # Création du path du fichier à supprimer
-                    file_path = os.path.join(file_type_path, file_name)
-                    try:
-                        # S'il existe bien le fichier à supprimer
-                        if os.path.isfile(file_path):
-                            os.unlink(file_path)
-
-                    except Exception as error:
-                        self.__logger.error("Failed to delete file \'%s\' in \'%s\' after merge operation. Reason: %s" % (
-                            file_name, file_type_path, error))
-
-            # Actualisation de la barre de progression
-            progress_bar.next()
-        reset_progress_bar_position
-
-        # Suppression du dossier temporaire de fusion
-        self.__paths.delete_folder([self.__hidden_temp_merge_folder_path])
+                else:
+                    # Ajoute les dossiers du groupe à la liste d'exclusion
+                    for folder in merge_folder:
+                        exclusion_list.add_folder(folder, "schema")
+
+                    # Supprime le dossier de destination des parquets fusionnés s'il existe (exécution précédente)
+                    self.__paths.delete_folder([os.path.join(self.__edited_parquet_path, merge_folder_dest)])
+
+                    # Signale l'erreur
+                    self.__logger.error(
+                        "Failed to merge files to \'%s\'. Reason: %s" % (merge_folder_dest, error))
+
+                # Actualisation de la barre de progression
+                progress_bar.next()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+            # Écriture de la liste d'exclusion et fermeture de la base des exclusions
+            exclusion_list.close()
+
+        # Suppression du dossier de travail de fusion
+        self.__paths.delete_folder([self.__temp_merge_folder_path])
 
         # Fin de mesure de temps écoulé
         stop_time = time.time()
@@ -563,24 +439,38 @@ class ParquetPreprocessing:
         self.__logger.info("Parquet merging completed in %s seconds. Merge of %s initial folders to %s folders" %
                            (elapsed_time, len(self.__parquet_folder_list), nb_merged_folder))
 
-    def __init_hidden_merge_folders(self):
+
+    def __write_dataset(self):
         """
-        Initialise les dossiers chachés de fusion des fichiers parquet
+        Écriture des dossiers parquet non-exclus dans un jeu de données partitionné par rame et par date
+        (exemple : "Dataset/rame=z5500503/date=2022-11-07/part-0.parquet"). Seules les colonnes requises pour l'étude
+        sont conservées
         """
 
-        # Force la suppression dans anciens fichiers parquet existants dans les dossiers cachés si ces dossiers existent
-        folder_to_delete_path = [
-            self.__hidden_temp_merge_tt_folder_path, self.__hidden_temp_merge_ctxt_folder_path]
-        self.__paths.delete_folder(folder_to_delete_path)
-
-        # Création des dossiers cachés
-        # Ces dossiers sont les suivants, dans l'ordre :
-        # Dossier parent de stockage des fichiers à merger
-        # Dossier "fils" contenant les fichiers tt à merger
-        # Dossier "fils" contenant les fichiers ctxt à merger
-        folder_to_create_path = [self.__hidden_temp_merge_folder_path, self.__hidden_temp_merge_tt_folder_path,
-                                 self.__hidden_temp_merge_ctxt_folder_path]
-        self.__paths.create_folder(folder_to_delete_path)
+        # Début de mesure de temps écoulé
+        start_time = time.time()
+
+        # Dossiers non-exclus
+        exclusion_list = ExclusionList(create_file=False)
+        folder_list = exclusion_list.get_not_excluded()
+        exclusion_list.close()
+
+        try:
+            nb_written_folder = ParquetDataset.write(self.__source_parquet_path, folder_list, self.__dataset_path,
+                                                     Constants.PARQUET_KEPT_COL, self.__dataset_compression,
+                                                     self.__dataset_row_group_size)
+        except (OSError, ValueError, pa.ArrowException) as error:
+            self.__logger.error("Failed to write parquet dataset to \'%s\'. Reason: %s" % (self.__dataset_path, error))
+            return
+
+        # Fin de mesure de temps écoulé
+        stop_time = time.time()
+        # Temps écoulé pour l'opération
+        elapsed_time = str(round((stop_time - start_time), 3))
+
+        self.__logger.info("Parquet dataset written in %s seconds. %s folders written to \'%s\' (%s compression)" %
+                           (elapsed_time, nb_written_folder, self.__dataset_path, self.__dataset_compression))
+
 
 def reset_progress_bar_position():
     """Remonte la sortie console de un niveau vers le haut
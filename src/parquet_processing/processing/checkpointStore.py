@@ -0,0 +1,118 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : checkpointStore.py
+# Description du fichier : points de reprise de l'analyse incrémentale de la consommation d'eau, un par rame : dernier
+#   dossier traité et état des calculs à reporter sur les dossiers suivants
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import logging as log
+import os
+import pickle
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class CheckpointStore:
+    """
+    Points de reprise des rames, un fichier par rame dans le dossier des points de reprise.
+
+    Un point de reprise est le dictionnaire d'état tenu à jour par WaterConsumptionAnalysis.stream_rame : dernier
+    dossier traité, horodatage de la dernière ligne, dernières lignes lues (fenêtre de la médiane roulante), dernière
+    ligne calculée non encore publiée, état des indicateurs et nombre de lignes numérotées.
+
+    Un point de reprise n'est valable que pour les paramètres du calcul avec lesquels il a été enregistré, et pour la
+    version courante de son contenu ; il est ignoré sinon.
+    """
+
+    # Version du contenu des points de reprise. À incrémenter si l'état reporté par stream_rame change
+    CHECKPOINT_VERSION = 3
+
+    # Extension des fichiers des points de reprise
+    FILE_EXTENSION = ".pickle"
+
+    def __init__(self, checkpoint_path, parameters):
+        """
+        :param checkpoint_path: chemin d'accès du dossier des points de reprise (créé s'il n'existe pas)
+        :param parameters: paramètres du calcul (les points de reprise enregistrés avec d'autres paramètres sont
+        ignorés)
+        """
+
+        # Logging
+        self.__logger = log.getLogger("CheckpointStore")
+
+        self.__checkpoint_path = str(checkpoint_path)
+        os.makedirs(self.__checkpoint_path, exist_ok=True)
+
+        self.__parameters = parameters
+
+    def __get_file_path(self, rame):
+        """Renvoie le chemin d'accès du fichier du point de reprise d'une rame"""
+        return os.path.join(self.__checkpoint_path, rame + CheckpointStore.FILE_EXTENSION)
+
+    def load(self, rame):
+        """
+        Lit le point de reprise d'une rame.
+
+        :param rame: nom de la rame
+        :return: dict: point de reprise, None s'il n'existe pas, est illisible ou a été enregistré avec d'autres
+        paramètres
+        """
+
+        file_path = self.__get_file_path(rame)
+        if not os.path.isfile(file_path):
+            return None
+
+        try:
+            with open(file_path, "rb") as checkpoint_file:
+                content = pickle.load(checkpoint_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as error:
+            self.__logger.warning("Unable to read the checkpoint \'%s\' of rame %s. Reason: %s" %
+                                  (file_path, rame, error))
+            return None
+
+        if content.get("version") != CheckpointStore.CHECKPOINT_VERSION or \
+                content.get("parameters") != self.__parameters:
+            self.__logger.info("Checkpoint of rame %s is outdated and will be ignored" % rame)
+            return None
+
+        return content["checkpoint"]
+
+    def save(self, rame, checkpoint):
+        """
+        Enregistre le point de reprise d'une rame. L'écriture passe par un fichier temporaire renommé, de sorte
+        qu'une interruption ne laisse jamais un point de reprise tronqué.
+
+        :param rame: nom de la rame
+        :param checkpoint: point de reprise (dictionnaire d'état, voir WaterConsumptionAnalysis.stream_rame)
+        """
+
+        file_path = self.__get_file_path(rame)
+        temp_file_path = file_path + ".tmp"
+        content = {"version": CheckpointStore.CHECKPOINT_VERSION, "parameters": self.__parameters,
+                   "checkpoint": checkpoint}
+        try:
+            with open(temp_file_path, "wb") as checkpoint_file:
+                pickle.dump(content, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file_path, file_path)
+        except OSError as error:
+            self.__logger.error("Unable to write the checkpoint \'%s\' of rame %s. Reason: %s" %
+                                (file_path, rame, error))
+
+    def clear(self):
+        """
+        Supprime tous les points de reprise (les tables sont reconstruites entièrement).
+
+        :return: int: nombre de points de reprise supprimés
+        """
+
+        nb_removed = 0
+        with os.scandir(self.__checkpoint_path) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(CheckpointStore.FILE_EXTENSION):
+                    os.remove(entry.path)
+                    nb_removed += 1
+
+        return nb_removed
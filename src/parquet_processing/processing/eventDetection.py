@@ -0,0 +1,178 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : eventDetection.py
+# Description du fichier : détection vectorisée d'événements à hystérésis (remplissages, vidanges) sur des séries de
+#   niveaux de réservoirs
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import operator
+import numpy as np
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class EventDetection:
+    """
+    Détecteur d'événements à hystérésis sur des tableaux NumPy.
+
+    Un événement est signalé au pas de temps t lorsque la condition de déclenchement est vraie et qu'aucun événement
+    n'est en cours ; l'événement reste en cours jusqu'au premier pas de temps où la condition de réarmement est vraie.
+    C'est l'équivalent de la boucle :
+
+        en_cours = 0
+        for t in range(0, n - 1):
+            if declenchement[t] and en_cours == 0:
+                evenement[t] = 1
+                en_cours = 1
+            if rearmement[t]:
+                en_cours = 0
+
+    Le calcul est sans boucle : un déclenchement en t donne lieu à un événement si et seulement si aucun
+    déclenchement n'a eu lieu depuis le dernier réarmement précédant t, ce qui se calcule par sommes cumulées.
+
+    Les séries peuvent être à une dimension (une série) ou à deux dimensions (pas de temps x séries, par exemple une
+    colonne par voiture de la rame) : toutes les colonnes sont alors traitées en un seul appel, indépendamment.
+    """
+
+    # Opérateurs de comparaison et leurs contraires (comparaisons fausses en cas de NaN dans les deux sens)
+    COMPARISONS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq}
+    OPPOSITES = {"<": ">=", "<=": ">", ">": "<=", ">=": "<", "==": "!="}
+
+    # Sens de variation entre t et t+1 : comparaison de x[t] à x[t+1]
+    DIRECTIONS = {"rising": "<", "falling": ">"}
+
+    @staticmethod
+    def __compare(left, comparison, right):
+        """
+        Compare deux tableaux (ou un tableau et un scalaire)
+        :param left: opérande de gauche
+        :param comparison: opérateur ("<", "<=", ">", ">=", "==" ou "!=")
+        :param right: opérande de droite
+        :return: numpy.ndarray: résultat booléen de la comparaison
+        """
+
+        if comparison == "!=":
+            return np.not_equal(left, right)
+
+        return EventDetection.COMPARISONS[comparison](left, right)
+
+    @staticmethod
+    def detect(trigger, rearm, active=False, return_state=False):
+        """
+        Détecte les événements à partir des conditions de déclenchement et de réarmement de chaque pas de temps.
+
+        :param trigger: numpy.ndarray booléen, condition de déclenchement aux pas de temps 0 à n-2 (1-D, ou 2-D avec
+        une colonne par série)
+        :param rearm: numpy.ndarray booléen, condition de réarmement aux pas de temps 0 à n-2, de même forme que trigger
+        :param active: événement en cours avant le pas de temps 0 (reprise d'une série découpée en plusieurs parties) ;
+        booléen, ou tableau d'un booléen par colonne
+        :param return_state: renvoie aussi l'état (événement en cours) après le pas de temps n-2
+        :return: numpy.ndarray: indicateurs d'événement (int64) aux pas de temps 0 à n-1, le dernier étant toujours 0 ;
+        et, si return_state est vrai, l'événement en cours après le dernier pas de temps (bool pour une série 1-D,
+        numpy.ndarray d'un booléen par colonne pour une série 2-D)
+        """
+
+        trigger = np.asarray(trigger, dtype=bool)
+        rearm = np.asarray(rearm, dtype=bool)
+        one_dimensional = trigger.ndim == 1
+        if one_dimensional:
+            trigger = trigger[:, np.newaxis]
+            rearm = rearm[:, np.newaxis]
+
+        nb_steps, nb_series = trigger.shape
+        active = np.broadcast_to(np.asarray(active, dtype=bool), (nb_series,))
+        events = np.zeros((nb_steps + 1, nb_series), dtype=np.int64)
+        if nb_steps == 0:
+            state = active.copy()
+        else:
+            # Nombre de déclenchements jusqu'à t inclus
+            trigger_count = np.cumsum(trigger, axis=0)
+
+            # Indice du dernier réarmement jusqu'à t inclus (-1 s'il n'y en a pas), puis strictement antérieur à t
+            step_index = np.arange(nb_steps)[:, np.newaxis]
+            rearm_index = np.maximum.accumulate(np.where(rearm, step_index, -1), axis=0)
+            last_rearm = np.empty((nb_steps, nb_series), dtype=np.int64)
+            last_rearm[0] = -1
+            last_rearm[1:] = rearm_index[:-1]
+
+            # Nombre de déclenchements entre le dernier réarmement (exclu) et t (exclu) ; un événement en cours avant
+            # le pas de temps 0 compte comme un déclenchement antérieur au premier réarmement
+            count_at_rearm = np.where(last_rearm >= 0,
+                                      np.take_along_axis(trigger_count, np.maximum(last_rearm, 0), axis=0), 0)
+            triggers_since_rearm = trigger_count - trigger - count_at_rearm + ((last_rearm < 0) & active)
+
+            events[:-1] = trigger & (triggers_since_rearm == 0)
+
+            # État final : déclenchement après le dernier réarmement (ou état initial s'il n'y a pas eu de réarmement)
+            final_rearm = rearm_index[-1]
+            final_count = trigger_count[-1]
+            state = np.where(final_rearm >= 0,
+                             final_count > trigger_count[np.maximum(final_rearm, 0), np.arange(nb_series)],
+                             active | (final_count > 0))
+
+        if one_dimensional:
+            events = events[:, 0]
+            state = bool(state[0])
+
+        return (events, state) if return_state else events
+
+    @staticmethod
+    def hysteresis(values, threshold, comparison, direction=None, threshold_on="current", rearm="direction",
+                   active=False, return_state=False):
+        """
+        Détecte les événements d'une série de niveaux.
+
+        Déclenchement en t : la variation entre t et t+1 est dans le sens demandé (si direction n'est pas None) et le
+        niveau en t (threshold_on="current") ou en t+1 (threshold_on="next") vérifie la comparaison au seuil.
+        Réarmement en t : la variation entre t et t+1 est de sens contraire ou nulle (rearm="direction"), ou le niveau
+        ne vérifie plus la comparaison au seuil (rearm="threshold").
+
+        Exemple : remplissage d'un réservoir depuis un niveau inférieur ou égal à 25 %
+            EventDetection.hysteresis(niveau, 25, "<=", direction="rising", threshold_on="current")
+
+        Une série découpée en parties successives est traitée partie par partie en reprenant, au début de chaque
+        partie, la dernière valeur de la partie précédente et l'état renvoyé pour celle-ci (return_state=True).
+
+        :param values: niveaux, de longueur n (1-D, ou 2-D avec une colonne par série)
+        :param threshold: seuil
+        :param comparison: comparaison du niveau au seuil ("<", "<=", ">", ">=" ou "==")
+        :param direction: sens de variation requis ("rising", "falling" ou None)
+        :param threshold_on: niveau comparé au seuil ("current" : x[t], "next" : x[t+1])
+        :param rearm: condition de réarmement ("direction" ou "threshold")
+        :param active: événement en cours avant le pas de temps 0 (booléen, ou tableau d'un booléen par colonne)
+        :param return_state: renvoie aussi l'état (événement en cours) après le pas de temps n-2
+        :return: numpy.ndarray: indicateurs d'événement (int64) de même forme que values, le dernier pas de temps
+        étant toujours 0 ; et, si return_state est vrai, l'événement en cours après le dernier pas de temps (voir
+        detect)
+        """
+
+        values = np.asarray(values)
+        if len(values) == 0:
+            events = np.zeros(values.shape, dtype=np.int64)
+            if not return_state:
+                return events
+            if values.ndim == 1:
+                return events, bool(active)
+            return events, np.broadcast_to(np.asarray(active, dtype=bool), values.shape[1:]).copy()
+
+        current_values = values[:-1]
+        next_values = values[1:]
+        level = current_values if threshold_on == "current" else next_values
+
+        # Condition de déclenchement
+        trigger = EventDetection.__compare(level, comparison, threshold)
+        if direction is not None:
+            trigger = trigger & EventDetection.__compare(current_values, EventDetection.DIRECTIONS[direction],
+                                                         next_values)
+
+        # Condition de réarmement
+        if rearm == "direction":
+            rearm_condition = EventDetection.__compare(
+                current_values, EventDetection.OPPOSITES[EventDetection.DIRECTIONS[direction]], next_values)
+        else:
+            rearm_condition = EventDetection.__compare(level, EventDetection.OPPOSITES[comparison], threshold)
+
+        return EventDetection.detect(trigger, rearm_condition, active, return_state)
@@ -0,0 +1,166 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : featureCache.py
+# Description du fichier : cache sur disque, adressé par contenu, des données lissées de chaque fichier TT_IP.parquet,
+#   pour ne recalculer que les dossiers parquet nouveaux ou modifiés
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import hashlib
+import json
+import logging as log
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class FeatureCache:
+    """
+    Cache des données calculées par fichier TT_IP.parquet, un fichier parquet par entrée.
+
+    Une entrée est adressée par son contenu : sa clef est l'empreinte SHA-256 de l'empreinte du fichier source
+    (chemin d'accès, taille et date de modification) et de l'empreinte des paramètres du calcul. Un fichier source
+    modifié, ou un paramètre changé, donne une autre clef : une entrée n'est jamais invalidée, elle n'est simplement
+    plus lue (voir prune). Aucune écriture ne modifie une entrée existante.
+
+    L'objet ne conserve que des chemins d'accès et des empreintes : il peut être transmis à un processus de calcul.
+    """
+
+    # Version du contenu des entrées. À incrémenter si le calcul des données mises en cache change
+    CACHE_VERSION = 3
+
+    # Extension et codec de compression des fichiers du cache
+    FILE_EXTENSION = ".parquet"
+    COMPRESSION = "zstd"
+
+    def __init__(self, cache_path, parameters):
+        """
+        :param cache_path: chemin d'accès du dossier du cache (créé s'il n'existe pas)
+        :param parameters: paramètres du calcul des données mises en cache (valeurs sérialisables en JSON)
+        """
+
+        self.__cache_path = str(cache_path)
+        os.makedirs(self.__cache_path, exist_ok=True)
+
+        self.__parameters_hash = FeatureCache.get_parameters_hash(parameters)
+
+    @staticmethod
+    def get_parameters_hash(parameters):
+        """
+        Renvoie l'empreinte des paramètres du calcul et de la version du cache.
+
+        :param parameters: paramètres du calcul (valeurs sérialisables en JSON)
+        :return: str: empreinte SHA-256 (hexadécimale)
+        """
+
+        content = json.dumps({"version": FeatureCache.CACHE_VERSION, "parameters": parameters}, sort_keys=True)
+
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get_key(self, file_path):
+        """
+        Renvoie la clef de l'entrée d'un fichier source.
+
+        :param file_path: chemin d'accès du fichier source
+        :return: str: clef de l'entrée (empreinte SHA-256 hexadécimale), None si le fichier source n'existe pas
+        """
+
+        try:
+            file_stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        content = json.dumps([os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns,
+                              self.__parameters_hash])
+
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def __get_entry_path(self, key):
+        """Renvoie le chemin d'accès du fichier d'une entrée"""
+        return os.path.join(self.__cache_path, key + FeatureCache.FILE_EXTENSION)
+
+    def contains(self, file_path):
+        """
+        Indique si les données d'un fichier source sont dans le cache.
+
+        :param file_path: chemin d'accès du fichier source
+        :return: bool: vrai si l'entrée du fichier, dans son état actuel, existe
+        """
+
+        key = self.get_key(file_path)
+
+        return key is not None and os.path.isfile(self.__get_entry_path(key))
+
+    def load(self, file_path):
+        """
+        Lit les données d'un fichier source dans le cache.
+
+        :param file_path: chemin d'accès du fichier source
+        :return: DataFrame: données mises en cache, None si l'entrée n'existe pas ou est illisible
+        """
+
+        key = self.get_key(file_path)
+        if key is None:
+            return None
+
+        entry_path = self.__get_entry_path(key)
+        if not os.path.isfile(entry_path):
+            return None
+
+        try:
+            return pq.read_table(entry_path).to_pandas()
+        except (OSError, pa.ArrowException) as error:
+            log.getLogger("FeatureCache").warning("Unable to read the feature cache entry \'%s\' of \'%s\'. Reason: %s"
+                                                  % (entry_path, file_path, error))
+            return None
+
+    def store(self, file_path, df):
+        """
+        Enregistre les données d'un fichier source dans le cache. L'écriture passe par un fichier temporaire renommé,
+        de sorte qu'une interruption (ou une écriture concurrente de la même entrée) ne laisse jamais une entrée
+        tronquée.
+
+        :param file_path: chemin d'accès du fichier source
+        :param df: DataFrame des données calculées (l'index est conservé)
+        """
+
+        key = self.get_key(file_path)
+        if key is None:
+            return
+
+        entry_path = self.__get_entry_path(key)
+        temp_file_path = "%s.%s.tmp" % (entry_path, os.getpid())
+        try:
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=True), temp_file_path,
+                           compression=FeatureCache.COMPRESSION)
+            os.replace(temp_file_path, entry_path)
+        except (OSError, pa.ArrowException) as error:
+            log.getLogger("FeatureCache").error("Unable to write the feature cache entry \'%s\' of \'%s\'. Reason: %s"
+                                                % (entry_path, file_path, error))
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+    def prune(self, file_paths):
+        """
+        Supprime du cache les entrées qui ne correspondent à aucun fichier source, dans son état actuel, de la liste
+        (fichiers supprimés ou modifiés, paramètres du calcul changés).
+
+        :param file_paths: chemins d'accès des fichiers sources dont les entrées sont conservées
+        :return: int: nombre d'entrées supprimées
+        """
+
+        kept_entries = {key + FeatureCache.FILE_EXTENSION for key in map(self.get_key, file_paths) if key is not None}
+
+        nb_removed = 0
+        with os.scandir(self.__cache_path) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(FeatureCache.FILE_EXTENSION) and \
+                        entry.name not in kept_entries:
+                    os.remove(entry.path)
+                    nb_removed += 1
+
+        return nb_removed
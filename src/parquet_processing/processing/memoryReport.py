@@ -0,0 +1,83 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : memoryReport.py
+# Description du fichier : relevé de la mémoire occupée par les DataFrames à chaque étape de l'analyse de la
+#   consommation d'eau (lecture, lissage, indicateurs)
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class MemoryReport:
+    """
+    Relevé de la mémoire occupée par les DataFrames de chaque étape du calcul : nombre de DataFrames relevés, mémoire
+    cumulée et plus grand DataFrame (mémoire de ses colonnes et de son index, contenu des objets compris).
+
+    L'objet ne conserve que ses statistiques : il peut être renvoyé par un processus de calcul et cumulé à d'autres
+    (voir add).
+    """
+
+    # Unités d'affichage des tailles
+    UNITS = ["o", "Ko", "Mo", "Go", "To"]
+
+    def __init__(self):
+        # Statistiques par étape, dans l'ordre des étapes : {étape: [nombre de DataFrames, mémoire cumulée, plus grand
+        # DataFrame]} (en octets)
+        self.stages = {}
+
+    def record(self, stage, df):
+        """
+        Relève la mémoire occupée par un DataFrame.
+
+        :param stage: nom de l'étape du calcul
+        :param df: DataFrame de l'étape
+        """
+
+        nb_bytes = int(df.memory_usage(index=True, deep=True).sum())
+        statistics = self.stages.setdefault(stage, [0, 0, 0])
+        statistics[0] += 1
+        statistics[1] += nb_bytes
+        statistics[2] = max(statistics[2], nb_bytes)
+
+    def add(self, other):
+        """
+        Cumule les statistiques d'un autre relevé (par exemple celui d'un processus de calcul).
+
+        :param other: MemoryReport dont les statistiques sont ajoutées
+        """
+
+        for stage, (nb_frames, nb_bytes, largest) in other.stages.items():
+            statistics = self.stages.setdefault(stage, [0, 0, 0])
+            statistics[0] += nb_frames
+            statistics[1] += nb_bytes
+            statistics[2] = max(statistics[2], largest)
+
+    @staticmethod
+    def format_size(nb_bytes):
+        """
+        Met en forme une taille mémoire.
+
+        :param nb_bytes: taille en octets
+        :return: str: taille dans l'unité la plus adaptée (ex : "1.5 Go")
+        """
+
+        size = float(nb_bytes)
+        for unit in MemoryReport.UNITS[:-1]:
+            if size < 1024:
+                return "%.1f %s" % (size, unit)
+            size /= 1024
+
+        return "%.1f %s" % (size, MemoryReport.UNITS[-1])
+
+    def report(self):
+        """
+        Renvoie le compte rendu du relevé.
+
+        :return: str: mémoire cumulée et plus grand DataFrame de chaque étape
+        """
+
+        stages = ", ".join("%s %s (%s DataFrames, le plus grand %s)" %
+                           (stage, MemoryReport.format_size(nb_bytes), nb_frames, MemoryReport.format_size(largest))
+                           for stage, (nb_frames, nb_bytes, largest) in self.stages.items())
+
+        return "Mémoire des DataFrames par étape : " + (stages if stages else "aucune donnée")
@@ -0,0 +1,221 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : parquetPrefetch.py
+# Description du fichier : lecture anticipée des fichiers parquet (producteur/consommateur) : les lectures suivantes
+#   sont effectuées par des threads pendant le calcul des données déjà lues, avec mesure du recouvrement obtenu
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class ParquetPrefetch:
+    """
+    Lecture anticipée : pendant que le consommateur calcule les données d'une lecture, les depth lectures suivantes
+    sont effectuées par des threads (la lecture et le décodage des fichiers parquet par pyarrow libèrent le GIL).
+    Les résultats sont rendus dans l'ordre des lectures ; au plus depth résultats d'avance sont conservés en mémoire.
+
+    Deux modes :
+    - map : une lecture par élément (par exemple un fichier), effectuées par un groupe de threads ;
+    - iterate : éléments d'un itérateur (par exemple les lots de lignes successifs des fichiers d'une rame), produits
+      dans l'ordre par un seul thread dans une file d'attente bornée.
+
+    Une profondeur de 0 désactive la lecture anticipée : les lectures sont effectuées par le consommateur.
+
+    Les statistiques des lectures sont cumulées d'un appel à l'autre : durée des lectures et durée d'attente du
+    consommateur. La part de la durée des lectures qui n'a pas été attendue par le consommateur est le recouvrement
+    obtenu entre lectures et calculs.
+
+    L'objet ne conserve que ses paramètres et ses statistiques (les threads ne vivent que le temps d'un appel) : il
+    peut être renvoyé par un processus de calcul et cumulé à d'autres (voir add).
+    """
+
+    # Marqueur de fin de l'itérateur lu en mode iterate
+    __END = object()
+
+    # Délai (en secondes) entre deux vérifications de l'arrêt du consommateur par le thread de lecture bloqué sur la
+    # file d'attente pleine
+    PUT_TIMEOUT = 0.1
+
+    def __init__(self, depth=0, workers=1):
+        """
+        Args:
+            depth (int): Nombre de lectures effectuées d'avance (0 : pas de lecture anticipée).
+            workers (int): Nombre de threads de lecture du mode map.
+        """
+        self.depth = max(0, depth)
+        self.workers = max(1, workers)
+
+        # Statistiques : nombre de lectures, durée cumulée des lectures et de l'attente du consommateur (en secondes)
+        self.nb_loads = 0
+        self.load_time = 0.0
+        self.wait_time = 0.0
+
+    @staticmethod
+    def __timed(function, item):
+        """
+        Effectue une lecture et mesure sa durée.
+
+        :param function: fonction de lecture
+        :param item: élément lu
+        :return: tuple: résultat de la lecture et durée de la lecture (en secondes)
+        """
+
+        start_time = time.perf_counter()
+        result = function(item)
+
+        return result, time.perf_counter() - start_time
+
+    def __record(self, load_time, wait_time):
+        """Ajoute une lecture aux statistiques"""
+        self.nb_loads += 1
+        self.load_time += load_time
+        self.wait_time += wait_time
+
+    def map(self, function, items):
+        """
+        Applique la fonction de lecture à chaque élément, les depth éléments suivants étant lus pendant le calcul du
+        résultat courant.
+
+        :param function: fonction de lecture, exécutée dans un thread
+        :param items: éléments à lire
+        :return: generator: résultats des lectures, dans l'ordre des éléments
+        """
+
+        # Sans lecture anticipée : le consommateur attend toute la durée de chaque lecture
+        if self.depth == 0:
+            for item in items:
+                result, load_time = ParquetPrefetch.__timed(function, item)
+                self.__record(load_time, load_time)
+                yield result
+            return
+
+        items = iter(items)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # Lectures en cours ou terminées, non encore rendues (file d'attente bornée à depth lectures)
+            pending = deque(executor.submit(ParquetPrefetch.__timed, function, item)
+                            for item in islice(items, self.depth))
+            try:
+                while pending:
+                    start_time = time.perf_counter()
+                    result, load_time = pending.popleft().result()
+                    self.__record(load_time, time.perf_counter() - start_time)
+
+                    # Lecture suivante lancée avant le calcul du résultat courant
+                    for item in islice(items, 1):
+                        pending.append(executor.submit(ParquetPrefetch.__timed, function, item))
+
+                    yield result
+            finally:
+                # Arrêt anticipé du consommateur : les lectures non commencées sont abandonnées
+                for future in pending:
+                    future.cancel()
+
+    def iterate(self, iterable):
+        """
+        Parcourt un itérateur, ses depth éléments suivants étant produits par un thread pendant le calcul de l'élément
+        courant.
+
+        :param iterable: itérable à parcourir, parcouru dans un thread
+        :return: generator: éléments de l'itérable, dans l'ordre. Une exception levée par l'itérable est levée de
+        nouveau dans le consommateur
+        """
+
+        iterator = iter(iterable)
+
+        # Sans lecture anticipée : le consommateur attend toute la durée de production de chaque élément
+        if self.depth == 0:
+            while True:
+                start_time = time.perf_counter()
+                item = next(iterator, ParquetPrefetch.__END)
+                if item is ParquetPrefetch.__END:
+                    return
+                load_time = time.perf_counter() - start_time
+                self.__record(load_time, load_time)
+                yield item
+
+        # File d'attente bornée des éléments produits : (élément, durée de production, exception)
+        buffer = queue.Queue(maxsize=self.depth)
+        stop = threading.Event()
+
+        def put(entry):
+            # Ajout à la file d'attente, abandonné si le consommateur s'est arrêté
+            while not stop.is_set():
+                try:
+                    buffer.put(entry, timeout=ParquetPrefetch.PUT_TIMEOUT)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce():
+            try:
+                while not stop.is_set():
+                    start_time = time.perf_counter()
+                    item = next(iterator, ParquetPrefetch.__END)
+                    if item is ParquetPrefetch.__END:
+                        break
+                    put((item, time.perf_counter() - start_time, None))
+            except BaseException as error:
+                put((None, 0.0, error))
+                return
+            put((ParquetPrefetch.__END, 0.0, None))
+
+        producer = threading.Thread(target=produce, name="ParquetPrefetch", daemon=True)
+        producer.start()
+        try:
+            while True:
+                start_time = time.perf_counter()
+                item, load_time, error = buffer.get()
+                wait_time = time.perf_counter() - start_time
+                if error is not None:
+                    raise error
+                if item is ParquetPrefetch.__END:
+                    return
+                self.__record(load_time, wait_time)
+                yield item
+        finally:
+            stop.set()
+            producer.join()
+
+    def add(self, other):
+        """
+        Cumule les statistiques d'une autre lecture anticipée (par exemple celle d'un processus de calcul).
+
+        :param other: ParquetPrefetch dont les statistiques sont ajoutées
+        """
+
+        self.nb_loads += other.nb_loads
+        self.load_time += other.load_time
+        self.wait_time += other.wait_time
+
+    def get_overlap(self):
+        """
+        Renvoie le recouvrement obtenu entre lectures et calculs.
+
+        :return: float: part (entre 0 et 1) de la durée des lectures pendant laquelle le consommateur n'a pas attendu
+        """
+
+        if self.load_time <= 0:
+            return 0.0
+
+        return min(1.0, max(0.0, 1 - self.wait_time / self.load_time))
+
+    def report(self):
+        """
+        Renvoie le compte rendu des lectures.
+
+        :return: str: nombre et durée des lectures, attente du consommateur et recouvrement obtenu
+        """
+
+        return ("Lecture anticipée (profondeur %s) : %s lectures, %.2f s de lecture, %.2f s d'attente, "
+                "recouvrement %.0f %%" % (self.depth, self.nb_loads, self.load_time, self.wait_time,
+                                          100 * self.get_overlap()))
@@ -0,0 +1,166 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# Nom du fichier : rollingMedian.py
+# Description du fichier : médiane roulante de toutes les colonnes d'un tableau 2-D en une seule passe, par blocs de
+#   lignes, pour le lissage des signaux des capteurs
+# Date de création : 18/10/2026
+# Date de mise à jour : 18/10/2026
+# Créé par : Rémy EVRARD
+# ----------------------------------------------------------------------------------------------------------------------
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Imports des libraries
+from functools import lru_cache
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+class RollingMedian:
+    """
+    Médiane roulante d'un tableau 2-D (lignes = pas de temps, colonnes = signaux), équivalente à
+    DataFrame.rolling(window).median() de pandas :
+    - la valeur de la ligne t est la médiane des lignes t - window + 1 à t ;
+    - les window - 1 premières lignes valent NaN ;
+    - une fenêtre contenant une valeur manquante (NaN) donne NaN.
+
+    Toutes les colonnes sont traitées ensemble, par blocs de lignes tenant en mémoire cache :
+    - petite fenêtre (jusqu'à NETWORK_MAX_WINDOW lignes) : réseau de sélection de la médiane. La fenêtre de chaque
+      ligne du bloc est formée de window vues décalées du tableau (sans copie), et le réseau de comparateurs (minimum
+      et maximum élément par élément) calcule la médiane de toutes les fenêtres du bloc à la fois ;
+    - grande fenêtre : sélection partielle (np.partition) sur la vue glissante des fenêtres du bloc, de coût
+      linéaire en la taille de la fenêtre.
+    """
+
+    # Taille maximale de fenêtre traitée par réseau de sélection (au-delà, le nombre de comparateurs rend la
+    # sélection partielle plus rapide)
+    NETWORK_MAX_WINDOW = 48
+
+    # Nombre de valeurs par bloc (lignes x colonnes) : réseau de sélection, sélection partielle
+    NETWORK_BLOCK_SIZE = 16384
+    PARTITION_BLOCK_SIZE = 393216
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def __sorting_network(size):
+        """
+        Construit le réseau de tri pair-impair de Batcher pour size valeurs.
+
+        Le réseau est construit pour la puissance de 2 supérieure ; les comparateurs impliquant une position au-delà
+        de size sont retirés (ces positions recevraient +inf et ne seraient jamais échangées).
+
+        :param size: nombre de valeurs à trier
+        :return: list: comparateurs (i, j), i < j : après le comparateur, la position i contient le minimum et la
+        position j le maximum
+        """
+
+        padded_size = 1
+        while padded_size < size:
+            padded_size *= 2
+
+        comparators = []
+        merge_size = 1
+        while merge_size < padded_size:
+            step = merge_size
+            while step >= 1:
+                for j in range(step % merge_size, padded_size - step, 2 * step):
+                    for i in range(min(step, padded_size - j - step)):
+                        if (i + j) // (merge_size * 2) == (i + j + step) // (merge_size * 2):
+                            comparators.append((i + j, i + j + step))
+                step //= 2
+            merge_size *= 2
+
+        return [(i, j) for i, j in comparators if j < size]
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def __selection_network(size, ranks):
+        """
+        Extrait du réseau de tri les seuls comparateurs nécessaires aux valeurs de rangs donnés.
+
+        :param size: nombre de valeurs
+        :param ranks: tuple des rangs recherchés (positions dans les valeurs triées)
+        :return: list: comparateurs (i, j, minimum_utile, maximum_utile), dans l'ordre d'exécution
+        """
+
+        # Parcours du réseau à rebours : un comparateur est conservé si l'une de ses sorties est utilisée ensuite
+        needed_positions = set(ranks)
+        network = []
+        for i, j in reversed(RollingMedian.__sorting_network(size)):
+            if i in needed_positions or j in needed_positions:
+                network.append((i, j, i in needed_positions, j in needed_positions))
+                needed_positions.update((i, j))
+
+        return network[::-1]
+
+    @staticmethod
+    def median(values, window):
+        """
+        Calcule la médiane roulante de chaque colonne d'un tableau.
+
+        :param values: tableau 2-D (lignes x colonnes) ou 1-D, de valeurs numériques
+        :param window: taille de la fenêtre (en nombre de lignes)
+        :return: numpy.ndarray: médianes roulantes (float64), de même forme que values
+        """
+
+        if window < 1:
+            raise ValueError("The rolling window must be at least 1, got %s" % window)
+
+        values = np.asarray(values, dtype=np.float64)
+        one_dimensional = values.ndim == 1
+        if one_dimensional:
+            values = values[:, np.newaxis]
+
+        nb_rows, nb_columns = values.shape
+        medians = np.full(values.shape, np.nan)
+        nb_windows = nb_rows - window + 1
+        if nb_windows <= 0 or nb_columns == 0:
+            return medians[:, 0] if one_dimensional else medians
+
+        # Rang(s) de la médiane dans une fenêtre triée : élément central, ou moyenne des deux éléments centraux
+        if window % 2 == 1:
+            ranks = (window // 2,)
+        else:
+            ranks = (window // 2 - 1, window // 2)
+
+        # Médianes des fenêtres, la fenêtre d'indice i couvrant les lignes i à i + window - 1
+        window_medians = medians[window - 1:]
+        if window <= RollingMedian.NETWORK_MAX_WINDOW:
+            network = RollingMedian.__selection_network(window, ranks)
+            block_rows = max(1, RollingMedian.NETWORK_BLOCK_SIZE // nb_columns)
+            for block_start in range(0, nb_windows, block_rows):
+                block_end = min(block_start + block_rows, nb_windows)
+
+                # Position r des fenêtres du bloc : vue des lignes décalées de r
+                positions = [values[block_start + offset:block_end + offset] for offset in range(window)]
+                for i, j, keep_minimum, keep_maximum in network:
+                    lower, upper = positions[i], positions[j]
+                    if keep_minimum:
+                        positions[i] = np.minimum(lower, upper)
+                    if keep_maximum:
+                        positions[j] = np.maximum(lower, upper)
+
+                if len(ranks) == 1:
+                    window_medians[block_start:block_end] = positions[ranks[0]]
+                else:
+                    window_medians[block_start:block_end] = (positions[ranks[0]] + positions[ranks[1]]) / 2
+
+        else:
+            # Vue des fenêtres : windows[i, colonne] = values[i:i + window, colonne]
+            windows = sliding_window_view(values, window, axis=0)
+            block_rows = max(1, RollingMedian.PARTITION_BLOCK_SIZE // (nb_columns * window))
+            for block_start in range(0, nb_windows, block_rows):
+                block_end = min(block_start + block_rows, nb_windows)
+                block = np.partition(windows[block_start:block_end], list(ranks), axis=-1)
+                if len(ranks) == 1:
+                    window_medians[block_start:block_end] = block[..., ranks[0]]
+                else:
+                    window_medians[block_start:block_end] = (block[..., ranks[0]] + block[..., ranks[1]]) / 2
+
+        # Fenêtres contenant une valeur manquante, d'après le nombre cumulé de NaN des colonnes qui en contiennent
+        is_nan = np.isnan(values)
+        for column in np.flatnonzero(is_nan.any(axis=0)):
+            nan_count = np.zeros(nb_rows + 1, dtype=np.int64)
+            np.cumsum(is_nan[:, column], out=nan_count[1:])
+            window_medians[(nan_count[window:] - nan_count[:-window]) > 0, column] = np.nan
+
+        return medians[:, 0] if one_dimensional else medians
@@ -3,7 +3,7 @@
 # Description du fichier : Analyse de la consommation d'eau, du remplissage et de la vidange des réservoirs d'eaux
 #   usées pour différentes missions de train
 # Date de création : 23/04/2023
-# Date de mise à jour : 25/04/2023
+# Date de mise à jour : 18/10/2026
 # Créé par : Flavie CALIGARIS
 # Mis à jour par : Rémy EVRARD
 # ----------------------------------------------------------------------------------------------------------------------
@@ -12,12 +12,16 @@
 # Imports des libraries
 # Libraries par défaut
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import snappy
 import os
 from itertools import groupby
 import pickle
 import numpy as np
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from progress.bar import IncrementalBar
 
@@ -26,11 +30,40 @@ from database.pgsql_database import Database
 from core.Constants import Constants
 from core.paths.Paths import Paths
 from parquet_processing.preprocessing.ExclusionList import ExclusionList
+from parquet_processing.preprocessing.InspectionManifest import InspectionManifest
+from parquet_processing.preprocessing.ParquetInspection import ParquetInspection
+from parquet_processing.processing.checkpointStore import CheckpointStore
+from parquet_processing.processing.eventDetection import EventDetection
+from parquet_processing.processing.featureCache import FeatureCache
+from parquet_processing.processing.memoryReport import MemoryReport
+from parquet_processing.processing.parquetPrefetch import ParquetPrefetch
+from parquet_processing.processing.rollingMedian import RollingMedian
 # ----------------------------------------------------------------------------------------------------------------------
 
 
 class WaterConsumptionAnalysis():
-    def __init__(self):
+    def __init__(self, workers=Constants.WATER_ANALYSIS_WORKERS, memory_map=Constants.PARQUET_MEMORY_MAP,
+                 rolling_window=Constants.ROLLING_MEDIAN_WINDOW, streaming=Constants.WATER_ANALYSIS_STREAMING,
+                 batch_size=Constants.PARQUET_READ_BATCH_SIZE, prefetch_depth=Constants.PARQUET_PREFETCH_DEPTH,
+                 feature_cache=Constants.FEATURE_CACHE_ENABLED, incremental=Constants.WATER_ANALYSIS_INCREMENTAL):
+        """
+        Args:
+            workers (int): Nombre de processus de calcul des rames (1 : calcul séquentiel).
+            memory_map (bool): Lecture des fichiers parquet par projection en mémoire.
+            rolling_window (int): Taille de la fenêtre de la médiane roulante (en secondes, soit en nombre de lignes).
+            streaming (bool): Calcul des rames par lots de lignes, avec report de l'état des calculs d'un lot au
+                suivant (voir stream_rame). Les rames sont alors traitées séquentiellement.
+            batch_size (int): Nombre maximal de lignes lues par lot en calcul en flux.
+            prefetch_depth (int): Nombre de fichiers (ou de lots de lignes en calcul en flux) lus d'avance pendant le
+                calcul des données déjà lues (0 : pas de lecture anticipée, voir ParquetPrefetch).
+            feature_cache (bool): Lecture des données lissées des fichiers inchangés depuis le cache sur disque (voir
+                FeatureCache). Sans effet en calcul en flux, où le lissage se poursuit d'un fichier au suivant.
+            incremental (bool): Analyse incrémentale : seuls les dossiers postérieurs au point de reprise de chaque
+                rame sont calculés (en flux), en reprenant l'état des calculs enregistré, et leurs lignes sont
+                ajoutées à la table existante (voir CheckpointStore). Une rame sans point de reprise valable est
+                calculée depuis son premier dossier, ses lignes déjà publiées étant supprimées.
+        """
+
         # Création de l'objet de base de données PostgreSQL.
         pg_db = Database()
 
@@ -40,6 +73,9 @@ class WaterConsumptionAnalysis():
         # Liste d'exclusion
         exclusion_list = ExclusionList(create_file=False)
 
+        # Manifeste des inspections de dossiers parquet (colonnes présentes dans les fichiers TT_IP.parquet)
+        inspection_manifest = InspectionManifest(consts.get_parquet_kept_col())
+
         # Chemins d'accès
         paths = Paths()
         # Chemin d'accès du dossier "Source" de parquet
@@ -55,6 +91,7 @@ class WaterConsumptionAnalysis():
 
         # Liste des répertoires de données contenant les fichiers parquet.
         content_list = exclusion_list.get_not_excluded()
+        exclusion_list.close()
         # print(content_list)
         # print("\n\n\n")
         # print(type(content_list))
@@ -66,6 +103,39 @@ class WaterConsumptionAnalysis():
         for racine, group_rep in groupby(content_list, lambda nom: nom.split('_')[0]):
             racine_dict[racine] = list(group_rep)
 
+        """POINTS DE REPRISE DE L'ANALYSE INCRÉMENTALE"""
+        # Points de reprise des rames, valables pour les paramètres du calcul en flux
+        checkpoint_store = CheckpointStore(paths.get_path("Checkpoints"),
+                                           {"rolling_window": rolling_window, "columns": col,
+                                            "read_types": Constants.PARQUET_READ_TYPES})
+        checkpoints = {}
+        if incremental:
+            for rac in racine_dict:
+                checkpoint = checkpoint_store.load(rac)
+                if checkpoint is not None:
+                    checkpoints[rac] = checkpoint
+
+        # Tables reconstruites entièrement : les points de reprise ne décrivent plus leur contenu
+        recreate_tables = not checkpoints
+        if recreate_tables:
+            checkpoint_store.clear()
+
+        """CRÉATION DES TABLES SUR LA BDD"""
+        # La table est recréée une seule fois (sauf en analyse incrémentale reprise depuis des points de reprise),
+        # puis les données de chaque rame y sont ajoutées dès qu'elles sont calculées : le coût de la publication est
+        # proportionnel au nombre de rames
+        # Les données ne sont stockées que dans la table 'global_data' ; 'rames' et 'missions' en sont des vues
+        progress_bar = IncrementalBar(
+            'Creating PostgreSQL tables', max=1 + len(Constants.GLOBAL_DATA_PG_VIEWS), width=25)
+        pg_db.create_table(
+            "global_data", Constants.GLOBAL_DATA_PG_TABLE, recreate=recreate_tables)
+        progress_bar.next()
+        for view_name in Constants.GLOBAL_DATA_PG_VIEWS:
+            pg_db.create_view(view_name, "global_data")
+            progress_bar.next()
+        progress_bar.finish()
+        reset_progress_bar_position()
+
         """CALCUL DES VALEURS INSTANTANÉES DES INDICATEURS"""
         # Création d'un dictionnaire de DataFrames pour chaque rame :
         # clé = rame, valeur = DataFrame contenant les données associées à cette rame
@@ -74,7 +144,7 @@ class WaterConsumptionAnalysis():
         # 2. Gestion des erreurs en cas de colonnes manquantes dans un fichier
         # 3. Conversion du code mission en entier pour afficher les 16 chiffres
         # 4. Calcul de la médiane roulante pour toutes les colonnes sauf celles contenant des temps
-        # 5. Suppression des 15 premières lignes (correspondant à 15 secondes) pour éliminer les valeurs NaN générées par la médiane roulante
+        # 5. Suppression des premières lignes (taille de la fenêtre, 15 secondes par défaut) pour éliminer les valeurs NaN générées par la médiane roulante
         # 6. Suppression des lignes dont les codes missions sont à 0
         # 7. Ajout des colonnes d'indicateurs :
         #    - compte des missions
@@ -88,191 +158,749 @@ class WaterConsumptionAnalysis():
         #    - consommation d'eau claire pour la rame entière
         #    - remplissage du réservoir d'eaux usées pour la rame entière
 
-        progress_bar = IncrementalBar(
-            'Processing rame DataFrames', max=len(racine_dict), width=25)
-
-        # Création d'un dictionnaire de DataFrames en fonction des rames
-        # clé = rame, valeur = DataFrame de données
-        dict_df = {}
-
+        # Fichiers TT_IP.parquet à lire pour chaque rame
+        # clé = rame, valeur = liste des chemins d'accès des fichiers
+        # Traitement des erreurs s'il n'y a pas toutes les colonnes nécessaires dans le fichier
+        rame_files = {}
         for rac, reps in racine_dict.items():
-            df_list = []
+            rame_files[rac] = []
 
-            # Lecture de tous les fichiers qui se rapportent à la même rame
-            # Traitement des erreurs s'il n'y a pas toutes les colonnes nécessaires dans le fichier
+            # Analyse incrémentale : seuls les dossiers qui suivent le dernier dossier traité, dans l'ordre de
+            # traitement (alphabétique), sont lus
+            if rac in checkpoints:
+                reps = [rep for rep in reps if rep > checkpoints[rac]['folder']]
 
             for rep in reps:
                 # Convertissez l'objet WindowsPath en str en utilisant la méthode as_posix()
                 file_path = Path(REP_DATA, rep, 'TT_IP.parquet').as_posix()
-                df_temp = pd.read_parquet(file_path)
 
-                # Vérifie si toutes les colonnes sont présentes dans df_temp
-                missing_columns = [c for c in col if c not in df_temp.columns]
+                # Vérifie si toutes les colonnes sont présentes dans le fichier, d'après le manifeste des inspections
+                # (ou le seul pied de page du fichier si le dossier a changé depuis son inspection)
+                missing_columns = inspection_manifest.get_missing_columns(rep)
+
+                # Fichier illisible : affiche un message d'erreur et continue avec le prochain fichier
+                if missing_columns is None:
+                    print(f"Erreur : {rep} - Fichier TT_IP.parquet illisible")
+                    continue
 
                 # S'il y a des colonnes manquantes, affiche un message d'erreur et continue avec le prochain fichier
                 if missing_columns:
                     print(
                         f"Erreur : {rep} - Colonnes manquantes : {', '.join(missing_columns)}")
                     continue
-                else:
-                    df_temp = df_temp.loc[:, col].iloc[:-1]
 
-                # Conversion du code mission en int pour que les 16 chiffres s'affichent
-                df_temp.x__IMISSIONTRAINNUMBER = df_temp.x__IMISSIONTRAINNUMBER.astype(
-                    np.int64)
+                rame_files[rac].append(file_path)
 
-                # Renommage de la colonne 'time'
-                df_temp = df_temp.rename(columns={"time": 'x_time'})
+        progress_bar = IncrementalBar(
+            'Processing rame DataFrames', max=len(racine_dict), width=25)
 
-                # Calcul de la médiane roulante sur toutes les colonnes sauf celles avec des temps
-                df_temp.iloc[:, 6:] = df_temp.iloc[:, 6:].rolling(15).median()
+        # Statistiques de la lecture anticipée des fichiers, cumulées sur toutes les rames
+        prefetch = ParquetPrefetch(prefetch_depth, Constants.PARQUET_PREFETCH_WORKERS)
+
+        # Mémoire occupée par les DataFrames de chaque étape du calcul, cumulée sur toutes les rames
+        memory_report = MemoryReport()
+
+        # Calcul en flux : les données de chaque lot de lignes sont publiées dès qu'elles sont calculées, la mémoire
+        # utilisée est celle d'un lot. L'analyse incrémentale est un calcul en flux qui reprend au point de reprise de
+        # chaque rame
+        if streaming or incremental:
+            for rac, file_paths in rame_files.items():
+                # Point de reprise de la rame, mis à jour par stream_rame (point de reprise vide : rame calculée
+                # depuis son premier dossier)
+                checkpoint = checkpoints.get(rac, {}) if incremental else None
+
+                # Analyse incrémentale sur les tables existantes : suppression des lignes de la rame qui vont être
+                # calculées de nouveau, publiées par une exécution interrompue avant l'enregistrement du point de
+                # reprise (toutes les lignes de la rame sans point de reprise valable, celles qui suivent le point de
+                # reprise sinon)
+                if incremental and not recreate_tables:
+                    if 'time' in checkpoint:
+                        pg_db.delete_rows("global_data", "rame = %s AND x_time >= %s", (rac, checkpoint['time']))
+                    else:
+                        pg_db.delete_rows("global_data", "rame = %s", (rac,))
+
+                nb_parts = 0
+                for df_part in WaterConsumptionAnalysis.stream_rame(rac, file_paths, col, memory_map, rolling_window,
+                                                                    batch_size, prefetch, checkpoint,
+                                                                    memory_report):
+                    self.publish_rame(pg_db, df_part)
+                    nb_parts += 1
+
+                # Point de reprise enregistré une fois les lignes de la rame publiées
+                if incremental and file_paths:
+                    checkpoint_store.save(rac, checkpoint)
+
+                # Aucune donnée pour la rame (en analyse incrémentale : aucun nouveau dossier)
+                if nb_parts == 0 and not incremental:
+                    print("Aucun DataFrame à concaténer. Vérifiez vos données d'entrée.")
 
-                # Suppression des 15 premières lignes (équivalent de 15sec) pour enlever les NaN créés par la médiane roulante
-                df_temp.dropna(inplace=True)
+                progress_bar.next()
 
-                df_list.append(df_temp)
+            progress_bar.finish()
+            reset_progress_bar_position()
+            print(prefetch.report())
+            print(memory_report.report())
+            if incremental:
+                print("Analyse incrémentale : %s nouveaux dossiers, %s rames reprises depuis leur point de reprise" %
+                      (sum(map(len, rame_files.values())), len(checkpoints)))
+            return
+
+        # Cache des données lissées de chaque fichier, adressé par l'empreinte du fichier et des paramètres du lissage
+        cache = None
+        if feature_cache:
+            cache = FeatureCache(paths.get_path("Feature_cache"),
+                                 {"rolling_window": rolling_window, "columns": col,
+                                  "read_types": Constants.PARQUET_READ_TYPES})
+            all_file_paths = [file_path for file_paths in rame_files.values() for file_path in file_paths]
+            nb_cached_files = sum(map(cache.contains, all_file_paths))
+
+        # Calcul des données d'une rame (voir process_rame)
+        process = partial(WaterConsumptionAnalysis.process_rame, col=col, memory_map=memory_map,
+                          rolling_window=rolling_window, prefetch_depth=prefetch_depth, feature_cache=cache)
+
+        # Calcul séquentiel
+        if workers == 1 or len(rame_files) <= 1:
+            executor = None
+            parallel_map = map
+
+        # Calcul parallèle : les rames sont indépendantes, chaque processus traite une rame à la fois ;
+        # map renvoie les résultats dans l'ordre des rames
+        else:
+            executor = ProcessPoolExecutor(max_workers=min(workers, len(rame_files)))
+            parallel_map = executor.map
+
+        try:
+            for rac, result in zip(rame_files, parallel_map(process, rame_files.keys(), rame_files.values())):
+                df_concat, rame_prefetch, rame_memory_report = result
+                prefetch.add(rame_prefetch)
+                memory_report.add(rame_memory_report)
+
+                # Aucune donnée pour la rame : rien n'est calculé ni publié pour celle-ci
+                if df_concat is None:
+                    print("Aucun DataFrame à concaténer. Vérifiez vos données d'entrée.")
+                    progress_bar.next()
+                    continue
 
-            # Concaténation des DataFrames de la liste
-            if not df_list:
-                print("Aucun DataFrame à concaténer. Vérifiez vos données d'entrée.")
-            else:
-                df_concat = pd.concat(df_list, ignore_index=True)
+                # Publication des données de la rame sur la BDD, à la suite de celles des rames précédentes. Les
+                # données de la rame ne sont pas conservées : seule une rame à la fois est en mémoire dans le processus
+                # principal
+                self.publish_rame(pg_db, df_concat)
+                del df_concat, result
 
-            # Suppression des lignes où les codes missions sont à 0
-            df_concat.drop(
-                df_concat.loc[df_concat['x__IMISSIONTRAINNUMBER'] == 0].index, inplace=True)
-
-            # Réinitialisation de l'index
-            df_concat = df_concat.reset_index()
-
-            # Ajout des colonnes avec les indicateurs
-            df_concat = self.cnt_missions(df_concat)
-            self.is_remplissage_WSU(df_concat)
-            self.is_vidange_WSU(df_concat)
-            self.consommation_FWT(df_concat)
-            self.remplissage_WWT(df_concat)
-            self.is_vidange_WWT(df_concat)
-            self.is_remplissage_FWT(df_concat)
-
-            # Ajout des colonnes 'jour', 'rame', 'conso_FWT_rame' et 'rempl_WWT_rame'
-            df_concat['jour'] = df_concat.x_time.dt.date
-            df_concat['rame'] = rac
-            df_concat['conso_FWT_rame'] = df_concat.WC_CAR01_LCST_consommation_FWT + df_concat.WC_CAR03_LCST_consommation_FWT + \
-                df_concat.WC_CAR05_LCST_consommation_FWT + \
-                df_concat.WC_CAR07_LCST_consommation_FWT
-            df_concat['rempl_WWT_rame'] = df_concat.WC_CAR01_LCST_remplissage_WWT + df_concat.WC_CAR03_LCST_remplissage_WWT + \
-                df_concat.WC_CAR05_LCST_remplissage_WWT + \
-                df_concat.WC_CAR07_LCST_remplissage_WWT
-
-            # Ajout du DataFrame concaténé au dictionnaire dict_df
-            dict_df[rac] = df_concat
-
-            # Création d'un dictionnaire de DataFrames en fonction des missions de chaque rame
-            # clé : rame, valeur : dictionnaire(clé = mission, valeur = DataFrame de données)
-            dict_missions = {}
-
-            # Lecture de toutes les missions possibles d'une rame
-            for rame, datas in dict_df.items():
-                dict_mission_rame = {}
-                missions = datas.x__IMISSIONTRAINNUMBER.unique()
-
-                # Création d'un DataFrame pour chaque mission
-                for mission in missions:
-                    df_temp = datas.query(
-                        'x__IMISSIONTRAINNUMBER == @mission')
-                    dict_mission_rame[mission] = df_temp
-
-                # Ajout dFu dictionnaire des missions au dictionnaire dict_missions
-                dict_missions[rame] = dict_mission_rame
-
-            """PUBLICATION DES DONNÉES SUR LA BDD"""
-            """Dataframe des rames"""
-            # Conversion du dictionnaire de dataframe en un dataframe unique
-            frames = []
-
-            progress_bar = IncrementalBar(
-                'Processing DataFrames', max=len(dict_df), width=25)
-            for rame, df in dict_df.items():
-                # Ajoute une colonne 'rame' avec la clé rame correspondante
-                df['rame'] = rame
-                frames.append(df)
                 progress_bar.next()
-            progress_bar.finish()
-            reset_progress_bar_position()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        progress_bar.finish()
+        reset_progress_bar_position()
+        print(prefetch.report())
+        print(memory_report.report())
+
+        # Suppression des entrées du cache des fichiers supprimés ou modifiés, ou calculées avec d'autres paramètres
+        if cache is not None:
+            nb_removed = cache.prune(all_file_paths)
+            print("Cache des données lissées : %s fichiers sur %s lus depuis le cache, %s entrées obsolètes supprimées"
+                  % (nb_cached_files, len(all_file_paths), nb_removed))
+
+    """CALCUL DES DONNÉES D'UNE RAME"""
+
+    @staticmethod
+    def process_rame(rame, file_paths, col, memory_map=False, rolling_window=Constants.ROLLING_MEDIAN_WINDOW,
+                     prefetch_depth=0, feature_cache=None):
+        """
+        Calcule les données d'une rame : lecture de ses fichiers, médiane roulante et indicateurs.
 
-            # Concaténer tous les DataFrames individuels en un seul DataFrame
-            df_rames = pd.concat(frames, ignore_index=True)
-            df_missions = pd.concat(frames, ignore_index=True)
-            df_complet = pd.concat(dict_df.values())
+        Le calcul ne dépend que des fichiers de la rame : la méthode est statique et peut être exécutée dans un
+        processus distinct, seul son résultat étant renvoyé au processus principal.
 
-            # Concaténer les dataframes individuels en un grand DataFrame pour obtenir un DataFrame "plat"
-            # et non pas hiérarchique, qui plus adapté pour PostgreSQL
-            frames = []
-            for rame, missions in dict_missions.items():
-                for mission, df in missions.items():
-                    df.loc[:, 'rame'] = rame
-                    df.loc[:, 'mission'] = mission
+        Les signaux lissés, les indicateurs et les compteurs sont stockés dans les types compacts de
+        Constants.ANALYSIS_TYPES (voir compact_columns), la mémoire occupée à chaque étape étant relevée (voir
+        MemoryReport).
 
-                    frames.append(df)
+        Les fichiers suivants sont lus et décodés par des threads pendant le calcul des données du fichier courant
+        (voir ParquetPrefetch). Les données lissées d'un fichier inchangé sont lues depuis le cache (voir load_file) ;
+        celles d'un fichier nouveau ou modifié y sont enregistrées. Les indicateurs, qui dépendent des fichiers
+        précédents de la rame (compte des missions, événements en cours), sont toujours calculés.
 
-            # Récupération des colonnes et types du dataframe
-            # print(df_missions.info(max_cols=500))
+        Args:
+            rame (str): Le nom de la rame.
+            file_paths (list): Les chemins d'accès des fichiers TT_IP.parquet de la rame, dans l'ordre chronologique.
+            col (list): Les colonnes à lire.
+            memory_map (bool): Lecture des fichiers par projection en mémoire.
+            rolling_window (int): Taille de la fenêtre de la médiane roulante.
+            prefetch_depth (int): Nombre de fichiers lus d'avance (0 : pas de lecture anticipée).
+            feature_cache (FeatureCache): Le cache des données lissées, None pour ne pas l'utiliser.
 
-            # Création des tables
-            progress_bar = IncrementalBar(
-                'Creating PostgreSQL tables', max=3, width=25)
-            pg_db.create_table("rames", consts.RAMES_PG_TABLE, recreate=True)
-            progress_bar.next()
-            pg_db.create_table(
-                "missions", consts.MISSIONS_PG_TABLE, recreate=True)
-            progress_bar.next()
-            pg_db.create_table(
-                "global_data", Constants.GLOBAL_DATA_PG_TABLE, recreate=True)
-            progress_bar.next()
-            progress_bar.finish()
-            reset_progress_bar_position()
+        Returns:
+            tuple: Le DataFrame des données de la rame, None si aucune donnée n'a pu être lue pour la rame ; la
+            lecture anticipée des fichiers de la rame (ParquetPrefetch), pour ses statistiques ; et le relevé de la
+            mémoire occupée à chaque étape du calcul (MemoryReport).
+        """
+        df_list = []
 
-            # Sauvegarde du dataframe des rames sur la BDD
-            progress_bar = IncrementalBar(
-                'Publishing DataFrames to database', max=3, width=25)
-            pg_db.publish_dataframe(df_rames, "rames", truncate_table=True)
-            progress_bar.next()
-            pg_db.publish_dataframe(
-                df_missions, "missions", truncate_table=True)
-            progress_bar.next()
-            pg_db.publish_dataframe(
-                df_complet, "global_data", truncate_table=True)
-            progress_bar.next()
-            progress_bar.finish()
-            reset_progress_bar_position()
+        prefetch = ParquetPrefetch(prefetch_depth, Constants.PARQUET_PREFETCH_WORKERS)
+        memory_report = MemoryReport()
+        load_file = partial(WaterConsumptionAnalysis.load_file, col=col, memory_map=memory_map,
+                            rolling_window=rolling_window, feature_cache=feature_cache)
+
+        # Nombre de lignes lissées des fichiers précédents, groupes de lignes sautés compris : les lignes sont
+        # numérotées (colonne 'index') comme si tous les groupes de lignes avaient été lus
+        row_offset = 0
+
+        # Lecture de tous les fichiers qui se rapportent à la même rame
+        for file_path, (file_data, cached, nb_file_rows) in zip(file_paths, prefetch.map(load_file, file_paths)):
+            file_row_offset = row_offset
+            row_offset += max(0, nb_file_rows - rolling_window)
+
+            if not cached:
+                for df_run in file_data:
+                    memory_report.record("lecture", df_run)
+                file_data = WaterConsumptionAnalysis.smooth_runs(file_data, rolling_window)
+                if feature_cache is not None:
+                    feature_cache.store(file_path, file_data)
+
+            # Aucune mission dans le fichier (train stationné)
+            if file_data.empty:
+                continue
+
+            file_data.index = file_data.index + file_row_offset
+            memory_report.record("lissage", file_data)
+            df_list.append(file_data)
+
+        # Concaténation des DataFrames de la liste
+        if not df_list:
+            return None, prefetch, memory_report
+
+        df_concat = pd.concat(df_list)
+
+        # Suppression des lignes où les codes missions sont à 0
+        df_concat.drop(
+            df_concat.loc[df_concat['x__IMISSIONTRAINNUMBER'] == 0].index, inplace=True)
+
+        # Réinitialisation de l'index
+        df_concat = df_concat.reset_index()
+
+        # Ajout des colonnes avec les indicateurs et des colonnes 'jour', 'rame', 'conso_FWT_rame' et 'rempl_WWT_rame'
+        WaterConsumptionAnalysis.add_indicators(df_concat, rame)
+        memory_report.record("indicateurs", df_concat)
+
+        return df_concat, prefetch, memory_report
+
+    @staticmethod
+    def stream_rame(rame, file_paths, col, memory_map=False, rolling_window=Constants.ROLLING_MEDIAN_WINDOW,
+                    batch_size=Constants.PARQUET_READ_BATCH_SIZE, prefetch=None, checkpoint=None, memory_report=None):
+        """
+        Calcule les données d'une rame par lots de lignes, fichier par fichier dans l'ordre chronologique, sans
+        conserver l'historique de la rame : seul un lot de lignes est en mémoire à la fois, quelle que soit la taille
+        des fichiers.
+
+        L'état des calculs est reporté d'un lot au suivant, le résultat est donc celui d'un calcul sur la suite
+        continue des fichiers :
+        - les window - 1 dernières lignes lues d'un lot prolongent la fenêtre de la médiane roulante au début du lot
+          suivant, y compris d'un fichier au suivant : les premières lignes d'un fichier ne sont plus perdues (seules
+          celles du premier fichier de la rame le sont) ;
+        - la dernière ligne calculée d'un lot, dont les indicateurs dépendent de la ligne suivante, est calculée
+          de nouveau avec les lignes du lot suivant ;
+        - l'état des indicateurs (mission et compteur de missions, événements en cours) est repris (voir
+          add_indicators), ainsi que la numérotation des lignes (colonne 'index').
+
+        Les lots suivants sont lus et décodés par un thread pendant le calcul du lot courant (voir
+        ParquetPrefetch.iterate) : la mémoire utilisée est celle de prefetch.depth + 2 lots au plus.
+
+        Avec un point de reprise (analyse incrémentale), le calcul reprend l'état enregistré à la fin du calcul
+        précédent, les fichiers étant ceux des dossiers suivants : le résultat est celui d'un calcul en flux sur tous
+        les dossiers de la rame. La dernière ligne calculée, dont les indicateurs dépendent de la ligne suivante,
+        n'est pas renvoyée mais conservée dans le point de reprise, pour être calculée avec les lignes des dossiers
+        suivants.
+
+        Args:
+            rame (str): Le nom de la rame.
+            file_paths (list): Les chemins d'accès des fichiers TT_IP.parquet de la rame, dans l'ordre chronologique.
+            col (list): Les colonnes à lire.
+            memory_map (bool): Lecture des fichiers par projection en mémoire.
+            rolling_window (int): Taille de la fenêtre de la médiane roulante.
+            batch_size (int): Nombre maximal de lignes lues par lot (voir iter_mission_batches).
+            prefetch (ParquetPrefetch): La lecture anticipée des lots, dont les statistiques sont mises à jour ; None
+                pour une lecture sans anticipation.
+            checkpoint (dict): Le point de reprise de la rame, mis à jour à la fin du calcul (dictionnaire vide pour
+                une rame sans point de reprise) ; None hors analyse incrémentale. Clés : 'folder' (dernier dossier
+                traité), 'time' (horodatage de la dernière ligne calculée), 'rolling_tail', 'pending_row', 'state' et
+                'nb_rows' (état des calculs ci-dessous).
+            memory_report (MemoryReport): Le relevé de la mémoire occupée à chaque étape du calcul, mis à jour ; None
+                pour ne pas relever la mémoire.
+
+        Yields:
+            DataFrame: Les données de la rame, par parties successives (une partie par lot contenant des missions,
+            puis la dernière ligne de la rame).
+        """
+        if checkpoint is None:
+            resumed_state = {}
+        else:
+            resumed_state = checkpoint
+
+        # Dernières lignes lues (non lissées) du lot précédent
+        rolling_tail = resumed_state.get('rolling_tail')
+        # Dernière ligne calculée, en attente des lignes du lot suivant
+        pending_row = resumed_state.get('pending_row')
+        # État des indicateurs avant la ligne en attente
+        state = resumed_state.get('state')
+        # Nombre de lignes des fichiers précédents (dernière ligne de chaque fichier retirée), groupes de lignes sautés
+        # compris : les lignes sont numérotées (colonne 'index') comme si tous les groupes de lignes avaient été lus
+        row_offset = resumed_state.get('nb_rows', 0)
+        # Fichier du lot précédent, et position dans ce fichier de la ligne qui suit les dernières lignes conservées
+        current_file = None
+        next_row = 0
+
+        if prefetch is None:
+            prefetch = ParquetPrefetch()
+
+        # Lecture des groupes de lignes contenant des missions et des dernières lignes de chaque fichier (window - 1
+        # lignes, plus la dernière ligne du fichier qui est retirée)
+        batches = ((file_path, df_batch) for file_path in file_paths
+                   for df_batch in WaterConsumptionAnalysis.iter_mission_batches(file_path, col, memory_map,
+                                                                                 rolling_window,
+                                                                                 tail_rows=rolling_window,
+                                                                                 batch_size=batch_size))
+
+        for file_path, df_batch in prefetch.iterate(batches):
+            # Premier lot d'un fichier : le début du fichier prolonge la fin du fichier précédent. Les dernières lignes
+            # d'un fichier étant toujours lues, la position qui suit ses dernières lignes lues est son nombre de lignes
+            if file_path != current_file:
+                row_offset += next_row
+                current_file = file_path
+                next_row = 0
+
+            # Lot réduit à la dernière ligne du fichier
+            if df_batch.empty:
+                continue
+
+            if memory_report is not None:
+                memory_report.record("lecture", df_batch)
+
+            # Renommage de la colonne 'time'
+            df_batch = df_batch.rename(columns={"time": 'x_time'})
+
+            # Lot qui suit directement les lignes conservées : la fenêtre de la médiane roulante est prolongée par
+            # celles-ci (des groupes de lignes sautés séparent sinon les deux lots)
+            nb_carried_rows = 0
+            if rolling_tail is not None and df_batch.index[0] == next_row:
+                nb_carried_rows = len(rolling_tail)
+                df_batch = pd.concat([rolling_tail, df_batch])
+
+            # Dernières lignes conservées pour le lot suivant
+            rolling_tail = df_batch.iloc[max(0, len(df_batch) - rolling_window + 1):]
+            next_row = df_batch.index[-1] + 1
+
+            # Calcul de la médiane roulante sur toutes les colonnes sauf celles avec des temps, puis suppression
+            # des lignes du lot précédent et des NaN créés par la médiane roulante
+            df_batch = WaterConsumptionAnalysis.smooth(df_batch, rolling_window).iloc[nb_carried_rows:]
+            df_batch = df_batch.dropna()
+            WaterConsumptionAnalysis.compact_columns(df_batch)
+            if memory_report is not None:
+                memory_report.record("lissage", df_batch)
+
+            # Numérotation des lignes d'après leur position dans la suite des fichiers (les window - 1 premières
+            # lignes de la rame, sans médiane roulante, ne sont pas numérotées)
+            df_batch.index = df_batch.index + (row_offset - (rolling_window - 1))
+
+            # Suppression des lignes où les codes missions sont à 0
+            df_batch = df_batch.loc[df_batch['x__IMISSIONTRAINNUMBER'] != 0].reset_index()
+            if df_batch.empty:
+                continue
+
+            # Calcul de la ligne en attente avec les lignes du lot, la dernière ligne devenant la ligne en attente
+            if pending_row is not None:
+                df_batch = pd.concat([pending_row, df_batch], ignore_index=True)
+            pending_row = df_batch.iloc[-1:].reset_index(drop=True)
+
+            state = WaterConsumptionAnalysis.add_indicators(df_batch, rame, state)
+            if memory_report is not None:
+                memory_report.record("indicateurs", df_batch)
+
+            if len(df_batch) > 1:
+                yield df_batch.iloc[:-1]
+
+        # Analyse incrémentale : enregistrement de l'état des calculs, la dernière ligne restant en attente
+        if checkpoint is not None:
+            if file_paths:
+                checkpoint['folder'] = os.path.basename(os.path.dirname(file_paths[-1]))
+            if pending_row is not None:
+                checkpoint['time'] = pending_row.x_time.iat[0]
+            checkpoint.update({'rolling_tail': rolling_tail, 'pending_row': pending_row, 'state': state,
+                               'nb_rows': row_offset + next_row})
+            return
+
+        # Dernière ligne de la rame
+        if pending_row is not None:
+            WaterConsumptionAnalysis.add_indicators(pending_row, rame, state)
+            yield pending_row
+
+    @staticmethod
+    def add_indicators(df, rame, state=None):
+        """
+        Ajoute au DataFrame les colonnes d'indicateurs (compte des missions, remplissages, vidanges et consommations),
+        ainsi que les colonnes 'jour', 'rame', 'conso_FWT_rame' et 'rempl_WWT_rame'.
+
+        Les indicateurs d'événements et les compteurs de missions ont les types compacts de Constants.ANALYSIS_TYPES,
+        les volumes restent en float64. La colonne 'jour' est la date à minuit (datetime64, convertie en date à la
+        publication, voir publish_rame) et la colonne 'rame' est catégorielle.
+
+        Une rame peut être traitée en parties successives : chaque partie commence par la dernière ligne de la partie
+        précédente (dont les indicateurs dépendent de la ligne suivante) et reprend l'état renvoyé pour celle-ci.
+
+        Args:
+            df (DataFrame): Les données (lissées, sans code mission à 0) de la rame, ou d'une partie de la rame.
+            rame (str): Le nom de la rame.
+            state (dict): L'état des indicateurs avant la première ligne, None au début de la rame. Les événements en
+                cours sont des tableaux d'un booléen par voiture (voir Constants.RAME_CARS).
+
+        Returns:
+            dict: L'état des indicateurs avant la dernière ligne.
+        """
+        if state is None:
+            state = {}
+
+        # Compte des missions, à la suite de la mission de la ligne précédente
+        previous_mission, previous_count = state.get('missions', (None, 0))
+        WaterConsumptionAnalysis.cnt_missions(df, previous_mission, previous_count)
+        if len(df) >= 2:
+            mission_state = (df.x__IMISSIONTRAINNUMBER.iat[-2], df.cpt_mission.iat[-2])
+        else:
+            mission_state = (previous_mission, previous_count)
+
+        # Indicateurs calculés pour toutes les voitures à la fois, sur des tableaux pas de temps x voiture
+        indicators = {}
+        new_state = {'missions': mission_state}
+        niveau_WSU = WaterConsumptionAnalysis.car_signal(df, 'IWSUTANKLEVEL')
+        indicators['remplissage_WSU'], new_state['remplissage_WSU'] = WaterConsumptionAnalysis.is_remplissage_WSU(
+            niveau_WSU, state.get('remplissage_WSU'))
+        indicators['vidange_WSU'], new_state['vidange_WSU'] = WaterConsumptionAnalysis.is_vidange_WSU(
+            niveau_WSU, state.get('vidange_WSU'))
+        indicators['consommation_FWT'] = WaterConsumptionAnalysis.consommation_FWT(
+            WaterConsumptionAnalysis.car_signal(df, 'IWATERTAPCNT'), indicators['remplissage_WSU'])
+        indicators['remplissage_WWT'] = WaterConsumptionAnalysis.remplissage_WWT(
+            WaterConsumptionAnalysis.car_signal(df, 'IFLUSHCYCCNT'), indicators['vidange_WSU'])
+        indicators['vidange_WWT'], new_state['vidange_WWT'] = WaterConsumptionAnalysis.is_vidange_WWT(
+            WaterConsumptionAnalysis.car_signal(df, 'IWWTANKCONTENT'), state.get('vidange_WWT'))
+        indicators['remplissage_FWT'], new_state['remplissage_FWT'] = WaterConsumptionAnalysis.is_remplissage_FWT(
+            WaterConsumptionAnalysis.car_signal(df, 'IFWTANKCONTENT'), state.get('remplissage_FWT'))
+
+        # Export des indicateurs au format des tables : une colonne par voiture
+        for indicator, values in indicators.items():
+            compact_type = Constants.ANALYSIS_TYPES.get(indicator)
+            df[WaterConsumptionAnalysis.car_columns(indicator)] = \
+                values if compact_type is None else values.astype(compact_type)
+
+        # Ajout des colonnes 'jour', 'rame', 'conso_FWT_rame' et 'rempl_WWT_rame' (totaux de la rame : somme sur
+        # les voitures)
+        df['jour'] = df.x_time.dt.normalize()
+        df['rame'] = pd.Series(rame, index=df.index, dtype="category")
+        df['conso_FWT_rame'] = indicators['consommation_FWT'].sum(axis=1)
+        df['rempl_WWT_rame'] = indicators['remplissage_WWT'].sum(axis=1)
+
+        return new_state
+
+    """PUBLICATION DES DONNÉES SUR LA BDD"""
+
+    @staticmethod
+    def publish_rame(pg_db, df):
+        """
+        Ajoute les données d'une rame à la table 'global_data' (présentée aussi par les vues 'rames' et 'missions',
+        voir Constants.GLOBAL_DATA_PG_VIEWS).
+
+        La table doit avoir été créée au préalable. Les lignes sont insérées à la suite de celles des rames déjà
+        publiées, sans relecture ni réécriture du contenu de la table.
+
+        Les lignes sont publiées par parties de Constants.DATABASE_PUBLISH_CHUNK_ROWS lignes : seule une partie des
+        données est convertie à la fois en objets Python, et la colonne 'jour' y est convertie en date.
+
+        Args:
+            pg_db (Database): La base de données PostgreSQL.
+            df (DataFrame): Les données de la rame (avec la colonne 'rame').
+        """
+        for start in range(0, len(df), Constants.DATABASE_PUBLISH_CHUNK_ROWS):
+            df_chunk = df.iloc[start:start + Constants.DATABASE_PUBLISH_CHUNK_ROWS]
+            df_chunk = df_chunk.assign(jour=df_chunk.jour.dt.date)
+            pg_db.publish_dataframe(df_chunk, "global_data", truncate_table=False)
+
+    """LECTURE DES DONNÉES"""
+
+    @staticmethod
+    def load_file(file_path, col, memory_map=False, rolling_window=Constants.ROLLING_MEDIAN_WINDOW,
+                  feature_cache=None):
+        """
+        Lit les données lissées d'un fichier TT_IP.parquet depuis le cache, ou à défaut les données du fichier.
+
+        Args:
+            file_path (str): Chemin d'accès du fichier TT_IP.parquet.
+            col (list): Colonnes à lire.
+            memory_map (bool): Lecture du fichier par projection en mémoire.
+            rolling_window (int): Taille de la fenêtre de la médiane roulante.
+            feature_cache (FeatureCache): Le cache des données lissées, None pour ne pas l'utiliser.
+
+        Returns:
+            tuple: Les données, un booléen vrai si elles proviennent du cache et le nombre de lignes du fichier (lu
+            dans le pied de page). Données du cache : DataFrame des données lissées du fichier (voir smooth_runs) ;
+            données du fichier : liste des DataFrames lus (voir read_mission_row_groups).
+        """
+        nb_file_rows = pq.read_metadata(file_path, memory_map=memory_map).num_rows
+
+        if feature_cache is not None:
+            df_cached = feature_cache.load(file_path)
+            if df_cached is not None:
+                return df_cached, True, nb_file_rows
+
+        return (WaterConsumptionAnalysis.read_mission_row_groups(file_path, col, memory_map, rolling_window), False,
+                nb_file_rows)
+
+    @staticmethod
+    def read_mission_row_groups(file_path, col, memory_map=False, rolling_window=Constants.ROLLING_MEDIAN_WINDOW,
+                                tail_rows=0):
+        """
+        Lit un fichier TT_IP.parquet en sautant les groupes de lignes sans mission (voir iter_mission_batches).
+
+        Returns:
+            list: Un DataFrame par suite de groupes de lignes consécutifs lus, indexé par la position des lignes
+            dans le fichier. Liste vide si le fichier ne contient aucune mission. La dernière ligne du fichier est
+            retirée, comme lors d'une lecture complète.
+        """
+        return list(WaterConsumptionAnalysis.iter_mission_batches(file_path, col, memory_map, rolling_window,
+                                                                  tail_rows))
+
+    @staticmethod
+    def iter_mission_batches(file_path, col, memory_map=False, rolling_window=Constants.ROLLING_MEDIAN_WINDOW,
+                             tail_rows=0, batch_size=None):
+        """
+        Lit un fichier TT_IP.parquet en sautant les groupes de lignes sans mission, par lots de lignes.
+
+        Seules les colonnes col sont décodées, avec les types de Constants.PARQUET_READ_TYPES (voir
+        cast_columns) : le code mission est lu en entier (16 chiffres), les niveaux des réservoirs en float32 et
+        les compteurs en entiers.
+
+        Les statistiques (minimum et maximum) du numéro de mission de chaque groupe de lignes sont lues dans le pied
+        de page : un groupe dont le numéro de mission est toujours 0 (train stationné) n'est pas décodé, sauf s'il
+        contient les lignes précédant une mission nécessaires à la médiane roulante. Les lignes écartées sont
+        exactement celles qui seraient supprimées après lecture (code mission à 0), le résultat est donc inchangé.
+
+        Args:
+            file_path (str): Chemin d'accès du fichier TT_IP.parquet.
+            col (list): Colonnes à lire.
+            memory_map (bool): Lecture du fichier par projection en mémoire.
+            rolling_window (int): Taille de la fenêtre de la médiane roulante.
+            tail_rows (int): Nombre de lignes de fin de fichier à lire dans tous les cas.
+            batch_size (int): Nombre maximal de lignes par lot, None pour lire chaque suite de groupes de lignes
+                consécutifs d'un seul tenant. La mémoire utilisée est bornée par la taille d'un lot.
+
+        Yields:
+            DataFrame: Les lots de lignes lus, dans l'ordre du fichier, indexés par la position des lignes dans le
+            fichier (deux lots consécutifs dans le fichier ont des positions qui se suivent). La dernière ligne du
+            fichier est retirée, comme lors d'une lecture complète.
+        """
+        with pq.ParquetFile(file_path, memory_map=memory_map) as tt_file:
+            runs = ParquetInspection.get_row_group_runs(tt_file.metadata, 'x__IMISSIONTRAINNUMBER',
+                                                        context_rows=rolling_window - 1, tail_rows=tail_rows)
+
+            # Position de la première ligne de chaque groupe de lignes dans le fichier
+            run_start_rows = np.cumsum([0] + [tt_file.metadata.row_group(row_group).num_rows
+                                              for row_group in range(tt_file.num_row_groups)]).tolist()
+
+            for run in runs:
+                if batch_size is None:
+                    tables = [tt_file.read_row_groups(run, columns=col)]
+                else:
+                    tables = (pa.Table.from_batches([record_batch]) for record_batch in
+                              tt_file.iter_batches(batch_size=batch_size, row_groups=run, columns=col))
+
+                first_row = run_start_rows[run[0]]
+                for tt_table in tables:
+                    tt_table = WaterConsumptionAnalysis.cast_columns(tt_table)
+
+                    # Conversion sans copie supplémentaire : la mémoire de la table arrow est libérée colonne par
+                    # colonne
+                    df_batch = tt_table.to_pandas(split_blocks=True, self_destruct=True)
+                    del tt_table
+                    df_batch = df_batch.loc[:, col]
+                    df_batch.index = pd.RangeIndex(first_row, first_row + len(df_batch))
+                    first_row += len(df_batch)
+
+                    # Suppression de la dernière ligne du fichier
+                    if first_row == tt_file.metadata.num_rows:
+                        df_batch = df_batch.iloc[:-1]
+
+                    yield df_batch
+
+    @staticmethod
+    def cast_columns(table):
+        """
+        Applique aux colonnes d'une table arrow les types de lecture de Constants.PARQUET_READ_TYPES.
+
+        La conversion est vérifiée (valeurs tronquées ou hors limites) : une colonne dont les valeurs ne sont pas
+        représentables dans le type de lecture conserve le type du fichier.
+
+        Args:
+            table (pyarrow.Table): Table lue dans un fichier TT_IP.parquet.
+
+        Returns:
+            pyarrow.Table: La table avec les colonnes converties.
+        """
+        columns = []
+        for name, column in zip(table.column_names, table.columns):
+            read_type = Constants.PARQUET_READ_TYPES.get(name.split("_LCST_")[-1])
+            if read_type is not None and column.type != pa.type_for_alias(read_type):
+                try:
+                    column = column.cast(pa.type_for_alias(read_type), safe=True)
+                except pa.ArrowInvalid:
+                    pass
+            columns.append(column)
+
+        return pa.table(columns, names=table.column_names)
+
+    """LISSAGE DES SIGNAUX"""
+
+    @staticmethod
+    def smooth(df, window):
+        """
+        Lisse les signaux des capteurs par médiane roulante, toutes les colonnes ensemble (voir RollingMedian).
+
+        Les 6 premières colonnes (temps, code mission et temps de fonctionnement) ne sont pas lissées. Les colonnes
+        lissées (float64) remplacent les colonnes lues, sans écriture dans leur type de lecture.
+
+        Args:
+            df (DataFrame): Les données lues d'un fichier TT_IP.parquet.
+            window (int): La taille de la fenêtre (en nombre de lignes).
+
+        Returns:
+            DataFrame: Les données lissées. Les window - 1 premières lignes des signaux lissés valent NaN.
+        """
+        smoothed = RollingMedian.median(df.iloc[:, 6:].to_numpy(dtype=np.float64), window)
+
+        return pd.concat([df.iloc[:, :6], pd.DataFrame(smoothed, index=df.index, columns=df.columns[6:])], axis=1)
+
+    @staticmethod
+    def smooth_runs(run_frames, window):
+        """
+        Lisse les suites de groupes de lignes lues d'un fichier TT_IP.parquet (voir read_mission_row_groups).
+
+        Args:
+            run_frames (list): Les DataFrames lus du fichier.
+            window (int): La taille de la fenêtre (en nombre de lignes).
+
+        Returns:
+            DataFrame: Les données lissées du fichier, la colonne 'time' étant renommée 'x_time', sans les premières
+            lignes de chaque suite (NaN créés par la médiane roulante), les signaux ayant leurs types compacts (voir
+            compact_columns). Les lignes sont indexées par leur rang parmi les lignes lissées d'une lecture complète
+            du fichier (position dans le fichier moins window - 1). DataFrame vide et sans colonne si le fichier
+            ne contient aucune mission.
+        """
+        df_list = []
+        for df_temp in run_frames:
+            # Renommage de la colonne 'time'
+            df_temp = df_temp.rename(columns={"time": 'x_time'})
+
+            # Calcul de la médiane roulante sur toutes les colonnes sauf celles avec des temps
+            df_temp = WaterConsumptionAnalysis.smooth(df_temp, window)
+
+            # Suppression des premières lignes (taille de la fenêtre, 15sec par défaut) pour enlever les NaN
+            # créés par la médiane roulante
+            df_temp.dropna(inplace=True)
+
+            # Conversion des signaux lissés dans leurs types compacts
+            WaterConsumptionAnalysis.compact_columns(df_temp)
+
+            df_list.append(df_temp)
+
+        # Aucune mission dans le fichier (train stationné) : le fichier n'a pas été décodé
+        if not df_list:
+            return pd.DataFrame()
+
+        df_smoothed = pd.concat(df_list)
+        df_smoothed.index = df_smoothed.index - (window - 1)
+
+        return df_smoothed
+
+    @staticmethod
+    def compact_columns(df):
+        """
+        Applique aux colonnes d'un DataFrame les types compacts de Constants.ANALYSIS_TYPES. Les colonnes sont
+        converties sans copie du DataFrame.
+
+        La conversion est vérifiée : une colonne dont une valeur serait modifiée (valeur lissée non entière ou non
+        représentable en float32, NaN dans une colonne entière) conserve son type.
+
+        Args:
+            df (DataFrame): Les données lissées.
+        """
+        for name in df.columns:
+            compact_type = Constants.ANALYSIS_TYPES.get(name.split("_LCST_")[-1])
+            if compact_type is None or df[name].dtype == compact_type:
+                continue
+
+            values = df[name].to_numpy()
+            with np.errstate(invalid="ignore", over="ignore"):
+                compact_values = values.astype(compact_type)
+            if np.array_equal(compact_values, values, equal_nan=np.issubdtype(values.dtype, np.floating)):
+                df[name] = compact_values
 
     """CRÉATIONS DES INDICATEURS"""
 
-    def cnt_missions(self, df):
+    @staticmethod
+    def cnt_missions(df, previous_mission=None, previous_count=0):
         """
         Compte le nombre de missions effectuées par la rame.
 
+        Un changement de mission est repéré par comparaison du code mission de chaque ligne à celui de la ligne
+        précédente ; le compteur de missions est la somme cumulée des changements. Les colonnes sont ajoutées au
+        DataFrame sans copie de celui-ci.
+
         Args:
             df (DataFrame): Un DataFrame contenant les données de la rame.
+            previous_mission (int): Le code mission de la ligne précédant la première ligne (rame traitée en
+                plusieurs parties), None au début de la rame.
+            previous_count (int): Le compteur de missions de la ligne précédant la première ligne.
+        """
+        missions = df.x__IMISSIONTRAINNUMBER.to_numpy()
+
+        # Changement de mission par rapport à la ligne précédente (la première ligne de la rame n'est pas un
+        # changement)
+        nombre_mission = np.zeros(len(missions), dtype=Constants.ANALYSIS_TYPES['nombre_mission'])
+        nombre_mission[1:] = missions[1:] != missions[:-1]
+        if previous_mission is not None and len(missions) > 0:
+            nombre_mission[0] = missions[0] != previous_mission
+
+        df['nombre_mission'] = nombre_mission
+        df['cpt_mission'] = (previous_count + np.cumsum(nombre_mission, dtype=np.int64)).astype(
+            Constants.ANALYSIS_TYPES['cpt_mission'])
+
+    @staticmethod
+    def car_columns(signal):
+        """
+        Renvoie les noms des colonnes d'un signal ou d'un indicateur, une par voiture de la rame.
+
+        Args:
+            signal (str): Le nom du signal, sans le préfixe de la voiture (ex : 'IWSUTANKLEVEL').
 
         Returns:
-            dg (DataFrame): Un DataFrame avec les colonnes 'nombre_mission' et 'cpt_mission' ajoutées.
+            list: Les noms des colonnes, dans l'ordre de Constants.RAME_CARS.
         """
-        dg = df.copy()
-        dg['nombre_mission'] = 0
-        dg['cpt_mission'] = 0
-        mission = 0
+        return ['WC_' + voiture + '_LCST_' + signal for voiture in Constants.RAME_CARS]
 
-        # Parcours du DataFrame pour compter les missions
-        for t in range(1, len(df)):
-            if df.x__IMISSIONTRAINNUMBER[t] != df.x__IMISSIONTRAINNUMBER[t-1]:
-                dg['nombre_mission'][t] = 1
-                mission += 1
-            dg['cpt_mission'][t] = mission
+    @staticmethod
+    def car_signal(df, signal):
+        """
+        Extrait un signal de toutes les voitures de la rame sous forme de tableau 2-D.
 
-        return dg
+        Args:
+            df (DataFrame): Les données de la rame.
+            signal (str): Le nom du signal, sans le préfixe de la voiture (ex : 'IWSUTANKLEVEL').
 
-    def is_remplissage_WSU(self, df):
+        Returns:
+            ndarray: Les valeurs du signal (pas de temps x voiture, dans l'ordre de Constants.RAME_CARS).
+        """
+        return df[WaterConsumptionAnalysis.car_columns(signal)].to_numpy()
+
+    @staticmethod
+    def is_remplissage_WSU(niveau, states=None):
         """
         Calcule le nombre de remplissages automatiques du réservoir d'eaux grises.
 
@@ -282,22 +910,20 @@ class WaterConsumptionAnalysis():
         - Le niveau du réservoir est inférieur à 25%.
 
         Args:
-            df (DataFrame): Un DataFrame contenant les données des réservoirs d'eaux grises.
-        """
-        for voiture in ['CAR01', 'CAR03', 'CAR05', 'CAR07']:
-            df['WC_'+voiture+'_LCST_remplissage_WSU'] = 0
-            remplissage_en_cours = 0
+            niveau (ndarray): Les niveaux des réservoirs d'eaux grises (pas de temps x voiture).
+            states (ndarray): Événements en cours par voiture avant la première ligne (rame traitée en plusieurs
+                parties), None au début de la rame.
 
-            # Parcours du DataFrame pour détecter les remplissages
-            for t in range(0, len(df)-1):
-                if (df['WC_'+voiture+'_LCST_IWSUTANKLEVEL'][t] < df['WC_'+voiture+'_LCST_IWSUTANKLEVEL'][t+1]) and (remplissage_en_cours == 0) and (df['WC_'+voiture+'_LCST_IWSUTANKLEVEL'][t] <= 25):
-                    df.loc[t, 'WC_'+voiture+'_LCST_remplissage_WSU'] += 1
-
-                    remplissage_en_cours = 1
-                if (df['WC_'+voiture+'_LCST_IWSUTANKLEVEL'][t] >= df['WC_'+voiture+'_LCST_IWSUTANKLEVEL'][t+1]):
-                    remplissage_en_cours = 0
+        Returns:
+            tuple: Les indicateurs de remplissage (pas de temps x voiture) et les événements en cours par voiture
+            avant la dernière ligne.
+        """
+        return EventDetection.hysteresis(niveau, 25, "<=", direction="rising", threshold_on="current",
+                                         rearm="direction", active=False if states is None else states,
+                                         return_state=True)
 
-    def is_vidange_WSU(self, df):
+    @staticmethod
+    def is_vidange_WSU(niveau, states=None):
         """
         Calcule le nombre de vidanges automatiques du réservoir d'eaux grises.
 
@@ -306,23 +932,20 @@ class WaterConsumptionAnalysis():
         - Il n'y a pas de vidange en cours (pour éviter de compter une nouvelle vidange tout le temps de la vidange).
 
         Args:
-            df (DataFrame): Un DataFrame contenant les données des réservoirs d'eaux grises.
-        """
-        for voiture in ['CAR01', 'CAR03', 'CAR05', 'CAR07']:
-            df['WC_'+voiture+'_LCST_vidange_WSU'] = 0
-            vid_en_cours = 0
-
-            # Parcours du DataFrame pour détecter les vidanges
-            for t in range(0, len(df)-1):
-                if (df['WC_'+voiture+'_LCST_IWSUTANKLEVEL'][t] >= 95) and (vid_en_cours == 0):
-                    # df['WC_'+voiture+'_LCST_vidange_WSU'][t] += 1
-                    df.at[t, 'WC_'+voiture+'_LCST_vidange_WSU'] += 1
+            niveau (ndarray): Les niveaux des réservoirs d'eaux grises (pas de temps x voiture).
+            states (ndarray): Événements en cours par voiture avant la première ligne (rame traitée en plusieurs
+                parties), None au début de la rame.
 
-                    vid_en_cours = 1
-                if (df['WC_'+voiture+'_LCST_IWSUTANKLEVEL'][t] < 95):
-                    vid_en_cours = 0
+        Returns:
+            tuple: Les indicateurs de vidange (pas de temps x voiture) et les événements en cours par voiture avant la
+            dernière ligne.
+        """
+        return EventDetection.hysteresis(niveau, 95, ">=", direction=None, threshold_on="current",
+                                         rearm="threshold", active=False if states is None else states,
+                                         return_state=True)
 
-    def consommation_FWT(self, df):
+    @staticmethod
+    def consommation_FWT(compteur_robinet, remplissage_WSU):
         """
         Calcule la vidange (en L) du réservoir d'eau claire (automatique).
 
@@ -331,13 +954,17 @@ class WaterConsumptionAnalysis():
         - le remplissage du réservoir d'eaux grises jusqu'à 60% si son niveau passe en dessous de 25% : 0.665 L
 
         Args:
-            df (DataFrame): Un DataFrame contenant les données des réservoirs d'eau claire.
+            compteur_robinet (ndarray): Les compteurs d'utilisation du robinet (pas de temps x voiture).
+            remplissage_WSU (ndarray): Les indicateurs de remplissage du réservoir d'eaux grises (pas de temps x
+                voiture).
+
+        Returns:
+            ndarray: La consommation d'eau claire (pas de temps x voiture).
         """
-        for voiture in ['CAR01', 'CAR03', 'CAR05', 'CAR07']:
-            df['WC_'+voiture+'_LCST_consommation_FWT'] = df['WC_'+voiture +
-                                                            '_LCST_IWATERTAPCNT']*0.4 + 0.665*df['WC_'+voiture+'_LCST_remplissage_WSU']
+        return compteur_robinet*0.4 + 0.665*remplissage_WSU
 
-    def remplissage_WWT(self, df):
+    @staticmethod
+    def remplissage_WWT(compteur_chasse, vidange_WSU):
         """
         Calcule le remplissage (en L) du réservoir d'eaux usées (automatique).
 
@@ -346,13 +973,16 @@ class WaterConsumptionAnalysis():
         - les vidanges du réservoir d'eaux grises jusqu'à 70% si son niveau de remplissage exède 95%
 
         Args:
-            df (DataFrame): Un DataFrame contenant les données des réservoirs d'eaux usées.
+            compteur_chasse (ndarray): Les compteurs de chasses d'eau (pas de temps x voiture).
+            vidange_WSU (ndarray): Les indicateurs de vidange du réservoir d'eaux grises (pas de temps x voiture).
+
+        Returns:
+            ndarray: Le remplissage du réservoir d'eaux usées (pas de temps x voiture).
         """
-        for voiture in ['CAR01', 'CAR03', 'CAR05', 'CAR07']:
-            df['WC_'+voiture+'_LCST_remplissage_WWT'] = df['WC_'+voiture +
-                                                           '_LCST_IFLUSHCYCCNT']*(0.4+0.3) + df['WC_'+voiture+'_LCST_vidange_WSU']*0.475
+        return compteur_chasse*(0.4+0.3) + vidange_WSU*0.475
 
-    def is_vidange_WWT(self, df):
+    @staticmethod
+    def is_vidange_WWT(niveau, states=None):
         """
         Repère les vidanges du réservoir d'eaux usées (maintenance).
 
@@ -362,21 +992,20 @@ class WaterConsumptionAnalysis():
         - le niveau du réservoir descend en dessous de 5%
 
         Args:
-            df (DataFrame): Un DataFrame contenant les données des réservoirs d'eaux usées.
-        """
-        for voiture in ['CAR01', 'CAR03', 'CAR05', 'CAR07']:
-            df['WC_'+voiture+'_LCST_vidange_WWT'] = 0
-            vidange_en_cours = 0
+            niveau (ndarray): Les niveaux des réservoirs d'eaux usées (pas de temps x voiture).
+            states (ndarray): Événements en cours par voiture avant la première ligne (rame traitée en plusieurs
+                parties), None au début de la rame.
 
-            # Parcours du DataFrame pour détecter les vidanges
-            for t in range(0, len(df)-1):
-                if (df['WC_'+voiture+'_LCST_IWWTANKCONTENT'][t] > df['WC_'+voiture+'_LCST_IWWTANKCONTENT'][t+1]) and (vidange_en_cours == 0) and (df['WC_'+voiture+'_LCST_IWWTANKCONTENT'][t+1] <= 5):
-                    df['WC_'+voiture+'_LCST_vidange_WWT'][t] = 1
-                    vidange_en_cours = 1
-                if (df['WC_' + voiture + '_LCST_IWWTANKCONTENT'][t] <= df['WC_' + voiture + '_LCST_IWWTANKCONTENT'][t+1]):
-                    vidange_en_cours = 0
+        Returns:
+            tuple: Les indicateurs de vidange (pas de temps x voiture) et les événements en cours par voiture avant la
+            dernière ligne.
+        """
+        return EventDetection.hysteresis(niveau, 5, "<=", direction="falling", threshold_on="next",
+                                         rearm="direction", active=False if states is None else states,
+                                         return_state=True)
 
-    def is_remplissage_FWT(self, df):
+    @staticmethod
+    def is_remplissage_FWT(niveau, states=None):
         """
         Repère les remplissages du réservoir d'eau claire (maintenance).
 
@@ -386,19 +1015,17 @@ class WaterConsumptionAnalysis():
         - le niveau du réservoir atteint le maximum
 
         Args:
-            df (DataFrame): Un DataFrame contenant les données des réservoirs d'eau claire.
-        """
-        for voiture in ['CAR01', 'CAR03', 'CAR05', 'CAR07']:
-            df['WC_'+voiture+'_LCST_remplissage_FWT'] = 0
-            rempli_en_cours = 0
-
-            # Parcours du DataFrame pour détecter les remplissages
-            for t in range(0, len(df)-1):
-                if (df['WC_'+voiture+'_LCST_IFWTANKCONTENT'][t] < df['WC_'+voiture+'_LCST_IFWTANKCONTENT'][t+1]) and (rempli_en_cours == 0) and (df['WC_'+voiture+'_LCST_IFWTANKCONTENT'][t+1] == 5):
-                    df['WC_'+voiture+'_LCST_remplissage_FWT'][t] = 1
-                    rempli_en_cours = 1
-                if (df['WC_'+voiture+'_LCST_IFWTANKCONTENT'][t] >= df['WC_'+voiture+'_LCST_IFWTANKCONTENT'][t+1]):
-                    rempli_en_cours = 0
+            niveau (ndarray): Les niveaux des réservoirs d'eau claire (pas de temps x voiture).
+            states (ndarray): Événements en cours par voiture avant la première ligne (rame traitée en plusieurs
+                parties), None au début de la rame.
+
+        Returns:
+            tuple: Les indicateurs de remplissage (pas de temps x voiture) et les événements en cours par voiture
+            avant la dernière ligne.
+        """
+        return EventDetection.hysteresis(niveau, 5, "==", direction="rising", threshold_on="next",
+                                         rearm="direction", active=False if states is None else states,
+                                         return_state=True)
 
 
 def reset_progress_bar_position():